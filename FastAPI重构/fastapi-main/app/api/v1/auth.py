@@ -1,27 +1,84 @@
+import math
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.models.database import get_db
 from app.models.models import User
 from app.schemas.auth import UserLogin, TokenResponse, UserRegister, AuthResponse
+from app.core.config import get_config_value
 from app.utils.auth_verify_util import generate_auth_token
-from app.utils.response_util import resp_ok, resp_bad_request, resp_server_error
+from app.utils.password_util import get_password_hasher, PasswordHasherBusy
+from app.utils.response_util import (
+    resp_ok, resp_bad_request, resp_server_error, resp_too_many_requests, resp_service_unavailable
+)
+from app.utils.throttle_util import AttemptThrottle
 
 router = APIRouter(tags=["认证"])
 
+# 登录尝试限流：窗口期内同一 IP、同一用户名的尝试次数（用户名在登录成功后清零）
+login_ip_throttle = AttemptThrottle(get_config_value('LOGIN_IP_MAX_ATTEMPTS', 30),
+                                    get_config_value('LOGIN_THROTTLE_WINDOW', 300))
+login_user_throttle = AttemptThrottle(get_config_value('LOGIN_USER_MAX_ATTEMPTS', 5),
+                                      get_config_value('LOGIN_THROTTLE_WINDOW', 300))
+
+
+def find_user(db: Session, name: str) -> Optional[User]:
+    """按用户名查询用户"""
+    return db.query(User).filter(User.name == name).first()
+
+
+def update_password_hash(db: Session, user_id: int, password_hash: str) -> None:
+    """保存重新生成的密码哈希"""
+    db.query(User).filter(User.id == user_id).update({User.password_hash: password_hash},
+                                                     synchronize_session=False)
+    db.commit()
+
+
+def add_user(db: Session, name: str, password_hash: str) -> None:
+    """写入新用户"""
+    db.add(User(name=name, password_hash=password_hash))
+    db.commit()
+
+
+def client_ip(request: Request) -> str:
+    """请求方 IP"""
+    return request.client.host if request.client else 'unknown'
+
+
+def throttled(*checks) -> Optional[dict]:
+    """
+    检查限流
+
+    Args:
+        checks: (AttemptThrottle, 键) 元组
+
+    Returns:
+        被限流时返回 429 响应，否则返回 None
+    """
+    wait = max(throttle.retry_after(key) for throttle, key in checks)
+    if wait > 0:
+        return resp_too_many_requests("尝试次数过多, 请稍后再试", {"retry_after": math.ceil(wait)})
+    return None
+
 
 @router.post("/auth/login", response_model=dict)
-def login(
+async def login(
     credentials: UserLogin,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
     用户登录
 
+    密码校验在独立的哈希进程池中执行；同一 IP、同一用户名在窗口期内的尝试次数受限，
+    哈希参数变化后登录成功时重新生成哈希
+
     Args:
         credentials: 登录凭证（用户名和密码）
+        request: 请求对象（读取客户端 IP）
         db: 数据库会话
 
     Returns:
@@ -33,20 +90,41 @@ def login(
     if not name or not password:
         return resp_bad_request("请输入账户和密码")
 
-    user = db.query(User).filter(User.name == name).first()
+    ip = client_ip(request)
+    limited = throttled((login_ip_throttle, ip), (login_user_throttle, name))
+    if limited:
+        return limited
+    login_ip_throttle.record(ip)
+    login_user_throttle.record(name)
+
+    user = await run_in_threadpool(find_user, db, name)
     if not user:
         return resp_bad_request("登录失败, 账户或密码不正确")
+    user_id, password_hash = user.id, user.password_hash
 
-    if not user.validate_password(password):
-        return resp_bad_request("登录失败, 账户或密码不正确")
+    hasher = get_password_hasher()
+    try:
+        if not await hasher.verify(password_hash, password):
+            return resp_bad_request("登录失败, 账户或密码不正确")
+    except PasswordHasherBusy:
+        return resp_service_unavailable("登录人数过多, 请稍后重试")
+    login_user_throttle.reset(name)
+
+    if hasher.needs_rehash(password_hash):
+        try:
+            await run_in_threadpool(update_password_hash, db, user_id, await hasher.hash(password))
+        except PasswordHasherBusy:
+            pass  # 下次登录时再重新生成
+        except Exception:
+            await run_in_threadpool(db.rollback)
 
     try:
-        token = generate_auth_token(user_id=user.id, name=name, effective_time=30)
+        token = generate_auth_token(user_id=user_id, name=name, effective_time=30)
         return resp_ok({
             "token": "jwt " + token,
             "user": {
-                "id": user.id,
-                "name": user.name
+                "id": user_id,
+                "name": name
             }
         }, "Login successfully")
     except Exception as e:
@@ -54,8 +132,9 @@ def login(
 
 
 @router.post("/auth/register", response_model=dict)
-def register(
+async def register(
     credentials: UserRegister,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
@@ -63,6 +142,7 @@ def register(
 
     Args:
         credentials: 注册信息（用户名和密码）
+        request: 请求对象（读取客户端 IP）
         db: 数据库会话
 
     Returns:
@@ -74,18 +154,26 @@ def register(
     if not name or not password:
         return resp_bad_request("请输入账户和密码")
 
-    existing_user = db.query(User).filter(User.name == name).first()
+    ip = client_ip(request)
+    limited = throttled((login_ip_throttle, ip))
+    if limited:
+        return limited
+    login_ip_throttle.record(ip)
+
+    existing_user = await run_in_threadpool(find_user, db, name)
     if existing_user:
         return resp_bad_request("注册失败, 当前用户名已被注册, 请更换用户名")
 
     try:
-        user = User(name=name)
-        user.set_password(password)
-        db.add(user)
-        db.commit()
+        password_hash = await get_password_hasher().hash(password)
+    except PasswordHasherBusy:
+        return resp_service_unavailable("注册人数过多, 请稍后重试")
+
+    try:
+        await run_in_threadpool(add_user, db, name, password_hash)
         return resp_ok(None, "注册成功, 请重新登录")
     except Exception as e:
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         return resp_server_error("注册失败，请稍后重试")
 
 
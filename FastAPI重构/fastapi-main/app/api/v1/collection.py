@@ -1,12 +1,17 @@
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.models.database import get_db
-from app.models.models import UserCollection, MovDetail
+from app.models.database import get_db, get_async_db
+from app.models.models import UserCollectionItem, MovDetail
+from app.models.projections import vod_list_query, to_vod_list_items
 from app.core.security import require_auth
-from app.utils.response_util import resp_ok
+from app.utils.response_util import resp_ok, resp_bad_request, resp_page
+from app.utils.pagination_util import keyset_page, InvalidCursor
+from app.utils.collection_util import is_collected, are_collected, add_collection, remove_collection
 from pydantic import BaseModel
 
 router = APIRouter(tags=["收藏"])
@@ -17,11 +22,35 @@ class CollectionAction(BaseModel):
     vod_id: int
 
 
+def query_collected_page(db: Session, user_id: int, page: int, cursor: Optional[str]):
+    """
+    查询一页用户收藏的视频（同步，异步接口通过 AsyncSession.run_sync 调用）
+
+    Args:
+        db: 数据库会话
+        user_id: 用户ID
+        page: 页码
+        cursor: 分页游标
+
+    Returns:
+        (视频列表, next_cursor)
+
+    Raises:
+        InvalidCursor: 游标格式不正确
+    """
+    query = (vod_list_query(db)
+             .join(UserCollectionItem, UserCollectionItem.movdetail_id == MovDetail.id)
+             .filter(UserCollectionItem.user_id == user_id))
+    collect_movs, next_cursor = keyset_page(query, MovDetail.vod_time, MovDetail.id, cursor=cursor, page=page)
+    return to_vod_list_items(collect_movs), next_cursor
+
+
 @router.get("/collection/show", response_model=dict, dependencies=[Depends(require_auth)])
-def show_collect_video(
+async def show_collect_video(
     user_id: int = Query(..., description="用户ID"),
     page: int = Query(1, ge=1, description="页码"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="分页游标, 传空字符串表示游标分页的第一页"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取用户的收藏视频列表
@@ -29,44 +58,25 @@ def show_collect_video(
     Args:
         user_id: 用户ID
         page: 页码
-        db: 数据库会话
+        cursor: 上一页返回的 next_cursor, 传入后使用游标分页代替 page
+        db: 异步数据库会话
 
     Returns:
         收藏视频列表
     """
-    user_collection = db.query(UserCollection).filter(UserCollection.user_id == user_id).first()
-    collect_vod_list = []
-
-    if user_collection:
-        # 分割收藏的视频ID列表
-        store_vod_list = user_collection.movdetail_id_list.split(';')[:-1] if user_collection.movdetail_id_list else []
-
-        if store_vod_list:
-            # 分页查询
-            per_page = 12
-            collect_movs = (db.query(MovDetail)
-                           .filter(MovDetail.id.in_(store_vod_list))
-                           .order_by(MovDetail.vod_time.desc())
-                           .offset((page - 1) * per_page)
-                           .limit(per_page)
-                           .all())
-
-            for mov in collect_movs:
-                collect_vod_list.append({
-                    "vod_id": mov.id,
-                    "vod_pic": mov.vod_pic,
-                    "vod_name": mov.vod_name,
-                    "vod_remarks": mov.vod_remarks
-                })
-
-    return resp_ok(collect_vod_list, "收藏的视频信息")
+    try:
+        items, next_cursor = await db.run_sync(query_collected_page, user_id, page, cursor)
+    except InvalidCursor:
+        return resp_bad_request("无效的分页游标")
+
+    return resp_page(items, "收藏的视频信息", next_cursor=next_cursor)
 
 
 @router.get("/collection/is_collection", response_model=dict, dependencies=[Depends(require_auth)])
-def show_is_collect_video(
+async def show_is_collect_video(
     user_id: int = Query(..., description="用户ID"),
-    vod_id: str = Query(..., description="视频ID"),
-    db: Session = Depends(get_db)
+    vod_id: int = Query(..., description="视频ID"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     检查视频是否已被收藏
@@ -74,23 +84,42 @@ def show_is_collect_video(
     Args:
         user_id: 用户ID
         vod_id: 视频ID
-        db: 数据库会话
+        db: 异步数据库会话
 
     Returns:
         收藏状态
     """
-    user_collection = db.query(UserCollection).filter(UserCollection.user_id == user_id).first()
-
-    if user_collection and vod_id + ';' in (user_collection.movdetail_id_list or ''):
+    if await db.run_sync(is_collected, user_id, vod_id):
         return resp_ok(1, "该视频已被收藏")
 
     return resp_ok(0, "该视频未被收藏")
 
 
+@router.get("/collection/is_collection/batch", response_model=dict, dependencies=[Depends(require_auth)])
+async def show_is_collect_video_batch(
+    user_id: int = Query(..., description="用户ID"),
+    vod_ids: List[int] = Query(..., max_length=100, description="视频ID列表, 可重复传入多个 vod_ids"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    批量检查视频是否已被收藏，一个页面的全部卡片只需一次请求
+
+    Args:
+        user_id: 用户ID
+        vod_ids: 视频ID列表
+        db: 异步数据库会话
+
+    Returns:
+        {视频ID: 1 已收藏 / 0 未收藏}
+    """
+    result = await db.run_sync(are_collected, user_id, vod_ids)
+    return resp_ok({str(vod_id): int(collected) for vod_id, collected in result.items()}, "收藏状态")
+
+
 @router.get("/collection/add", response_model=dict, dependencies=[Depends(require_auth)])
 def add_collect_video(
     user_id: int = Query(..., description="用户ID"),
-    vod_id: str = Query(..., description="视频ID"),
+    vod_id: int = Query(..., description="视频ID"),
     db: Session = Depends(get_db)
 ):
     """
@@ -102,42 +131,26 @@ def add_collect_video(
         db: 数据库会话
 
     Returns:
-        收藏结果
+        收藏结果, data 为收藏状态 1（与 /collection/is_collection 一致）
     """
     if not user_id or not vod_id:
         return {"code": 400, "message": "没有要收藏的视频信息"}
 
-    user_collection = db.query(UserCollection).filter(UserCollection.user_id == user_id).first()
-
     try:
-        # 如果有收藏信息则更新，没有则添加
-        if user_collection:
-            # 检查是否已收藏
-            if vod_id + ';' not in (user_collection.movdetail_id_list or ''):
-                user_collection.movdetail_id_list = (user_collection.movdetail_id_list or '') + vod_id + ';'
-        else:
-            user_collection = UserCollection(user_id=user_id, movdetail_id_list=vod_id + ';')
-            db.add(user_collection)
-
-        db.commit()
-
-        # 返回更新后的收藏列表
-        updated_collection = db.query(UserCollection).filter(UserCollection.user_id == user_id).first()
-        if updated_collection and updated_collection.movdetail_id_list:
-            store_vod_list = updated_collection.movdetail_id_list.split(';')[:-1]
-            return resp_ok(list(set(store_vod_list)), "视频收藏成功")
-
-        return resp_ok([], "视频收藏成功")
-
+        added = add_collection(db, user_id, vod_id)
+    except IntegrityError:
+        return resp_bad_request("用户或视频不存在")
     except Exception as e:
         db.rollback()
         raise e
 
+    return resp_ok(1, "视频收藏成功" if added else "该视频已被收藏")
+
 
 @router.get("/collection/remove", response_model=dict, dependencies=[Depends(require_auth)])
 def remove_collect_video(
     user_id: int = Query(..., description="用户ID"),
-    vod_id: str = Query(..., description="视频ID"),
+    vod_id: int = Query(..., description="视频ID"),
     db: Session = Depends(get_db)
 ):
     """
@@ -149,27 +162,15 @@ def remove_collect_video(
         db: 数据库会话
 
     Returns:
-        移除结果
+        移除结果, data 为收藏状态 0（与 /collection/is_collection 一致）
     """
     if not user_id or not vod_id:
         return {"code": 400, "message": "没有要删除收藏的视频信息"}
 
-    user_collection = db.query(UserCollection).filter(UserCollection.user_id == user_id).first()
-
-    if user_collection:
-        try:
-            # 移除指定的视频ID
-            if user_collection.movdetail_id_list:
-                user_collection.movdetail_id_list = user_collection.movdetail_id_list.replace(vod_id + ';', '')
-                db.commit()
-
-                # 返回更新后的收藏列表
-                if user_collection.movdetail_id_list:
-                    store_vod_list = user_collection.movdetail_id_list.split(';')[:-1]
-                    return resp_ok(list(set(store_vod_list)), "视频删除收藏成功")
-
-        except Exception as e:
-            db.rollback()
-            raise e
+    try:
+        removed = remove_collection(db, user_id, vod_id)
+    except Exception as e:
+        db.rollback()
+        raise e
 
-    return resp_ok([], "视频删除收藏成功")
+    return resp_ok(0, "视频删除收藏成功" if removed else "该视频未被收藏")
@@ -1,12 +1,19 @@
-from typing import List, Optional
+import json
+from collections import defaultdict
+from typing import Iterator, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, selectinload
+from sqlalchemy.sql import or_
 
-from app.models.database import get_db
+from app.models.database import get_db, get_async_db, ReadSessionLocal
 from app.models.models import Comment, User
 from app.core.security import require_auth, get_current_user
-from app.utils.response_util import resp_ok
+from app.utils.pagination_util import keyset_page, InvalidCursor
+from app.utils.response_util import resp_ok, resp_bad_request, resp_page
 from pydantic import BaseModel
 
 router = APIRouter(tags=["评论"])
@@ -24,58 +31,252 @@ class CommentReply(BaseModel):
     user_id: int
 
 
-def get_all_replies(reply_comments: List[Comment], result: List[dict]):
+def load_comment_tree(db: Session, vod_id: int) -> List[Comment]:
     """
-    递归获取所有回复
+    一次查询取出视频的全部顶层评论及其回复，用户信息通过 selectinload 批量加载
 
     Args:
-        reply_comments: 评论列表
-        result: 结果列表
+        db: 数据库会话
+        vod_id: 视频ID
+
+    Returns:
+        评论列表（顶层评论和回复混合）
     """
-    for comment in reply_comments:
-        reply = {
-            "user_name": comment.user.name,
-            "id": comment.id,
-            "reply_user_name": comment.replied.user.name if comment.replied and comment.replied.user else "",
+    root_ids = db.query(Comment.id).filter(Comment.movdetail_id == vod_id)
+    return (db.query(Comment)
+            .options(selectinload(Comment.user))
+            .filter(or_(Comment.movdetail_id == vod_id, Comment.root_id.in_(root_ids)))
+            .all())
+
+
+def build_comment_tree(comments: List[Comment]) -> List[dict]:
+    """
+    在内存中组装评论树，不触发任何延迟加载
+
+    Args:
+        comments: load_comment_tree 的结果
+
+    Returns:
+        按时间倒序的顶层评论列表，每条评论的 reply_list 为其全部回复（深度优先）
+    """
+    by_id = {comment.id: comment for comment in comments}
+    children = defaultdict(list)
+    top_level = []
+    for comment in comments:
+        if comment.replied_id is None:
+            top_level.append(comment)
+        else:
+            children[comment.replied_id].append(comment)
+
+    def user_name(comment: Optional[Comment]) -> str:
+        return comment.user.name if comment is not None and comment.user else ""
+
+    def collect_replies(comment_id: int, result: List[dict]):
+        for reply in sorted(children.get(comment_id, ()), key=lambda c: c.id):
+            result.append({
+                "user_name": user_name(reply),
+                "id": reply.id,
+                "reply_user_name": user_name(by_id.get(reply.replied_id)),
+                "body": reply.body,
+                "time": reply.timestamp.strftime('%Y-%m-%d')
+            })
+            collect_replies(reply.id, result)
+
+    comment_list = []
+    for comment in sorted(top_level, key=lambda c: (c.timestamp, c.id), reverse=True):
+        reply_list = []
+        collect_replies(comment.id, reply_list)
+        comment_list.append({
+            "user_name": user_name(comment),
             "body": comment.body,
-            "time": comment.timestamp.strftime('%Y-%m-%d')
-        }
-        result.append(reply)
-        if comment.replies:
-            get_all_replies(comment.replies, result)
+            "time": comment.timestamp.strftime('%Y-%m-%d'),
+            "id": comment.id,
+            "reply_list": reply_list
+        })
+    return comment_list
 
 
 @router.get("/show/comment/{vod_id}", response_model=dict)
-def show_comments(
+async def show_comments(
     vod_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取视频的评论列表
 
     Args:
         vod_id: 视频ID
-        db: 数据库会话
+        db: 异步数据库会话
 
     Returns:
         评论列表
     """
-    comments = db.query(Comment).filter(Comment.movdetail_id == vod_id).order_by(Comment.timestamp.desc()).all()
+    comment_list = await db.run_sync(lambda session: build_comment_tree(load_comment_tree(session, vod_id)))
+    return resp_ok(comment_list, "评论获取成功")
+
+
+def load_reply_preview(db: Session, root_ids: List[int], reply_limit: int) -> dict:
+    """
+    按楼层取每条顶层评论最早的 reply_limit 条回复及回复总数（窗口函数，一次查询）
+
+    Args:
+        db: 数据库会话
+        root_ids: 顶层评论ID列表
+        reply_limit: 每条顶层评论最多返回的回复数
+
+    Returns:
+        {顶层评论ID: (回复列表, 回复总数)}
+    """
+    preview = {root_id: ([], 0) for root_id in root_ids}
+    if not root_ids:
+        return preview
+
+    ranked = (db.query(Comment.id, Comment.root_id, Comment.replied_id, Comment.user_id, Comment.body,
+                       Comment.timestamp,
+                       func.row_number().over(partition_by=Comment.root_id, order_by=Comment.id).label('rn'),
+                       func.count(Comment.id).over(partition_by=Comment.root_id).label('total'))
+              .filter(Comment.root_id.in_(root_ids))
+              .subquery())
+    parent = aliased(Comment)
+    reply_user = aliased(User)
+    parent_user = aliased(User)
+    rows = (db.query(ranked, reply_user.name.label('user_name'), parent_user.name.label('reply_user_name'))
+            .outerjoin(reply_user, reply_user.id == ranked.c.user_id)
+            .outerjoin(parent, parent.id == ranked.c.replied_id)
+            .outerjoin(parent_user, parent_user.id == parent.user_id)
+            .filter(ranked.c.rn <= reply_limit)
+            .order_by(ranked.c.root_id, ranked.c.id)
+            .all())
+
+    for row in rows:
+        replies, _ = preview[row.root_id]
+        replies.append({
+            "user_name": row.user_name or "",
+            "id": row.id,
+            "reply_user_name": row.reply_user_name or "",
+            "body": row.body,
+            "time": row.timestamp.strftime('%Y-%m-%d')
+        })
+        preview[row.root_id] = (replies, row.total)
+    return preview
+
+
+def query_comments_page(db: Session, vod_id: int, cursor: Optional[str], limit: int,
+                        reply_limit: int) -> Tuple[List[dict], Optional[str]]:
+    """
+    查询一页顶层评论及其回复预览（同步，异步接口通过 AsyncSession.run_sync 调用）
+
+    Args:
+        db: 数据库会话
+        vod_id: 视频ID
+        cursor: 上一页返回的 next_cursor
+        limit: 每页顶层评论数
+        reply_limit: 每条评论预览的回复数
+
+    Returns:
+        (评论列表, next_cursor)
+
+    Raises:
+        InvalidCursor: 游标格式不正确
+    """
+    query = (db.query(Comment.id, Comment.body, Comment.timestamp, User.name.label('user_name'))
+             .outerjoin(User, User.id == Comment.user_id)
+             .filter(Comment.movdetail_id == vod_id))
+    threads, next_cursor = keyset_page(query, Comment.timestamp, Comment.id, cursor=cursor or '',
+                                       per_page=limit)
 
+    preview = load_reply_preview(db, [thread.id for thread in threads], reply_limit)
     comment_list = []
-    for comment in comments:
-        c = {
-            "user_name": comment.user.name,
-            "body": comment.body,
-            "time": comment.timestamp.strftime('%Y-%m-%d'),
-            "id": comment.id
-        }
-        reply_list = []
-        get_all_replies(comment.replies, reply_list)
-        c['reply_list'] = reply_list
-        comment_list.append(c)
+    for thread in threads:
+        reply_list, reply_count = preview[thread.id]
+        comment_list.append({
+            "user_name": thread.user_name or "",
+            "body": thread.body,
+            "time": thread.timestamp.strftime('%Y-%m-%d'),
+            "id": thread.id,
+            "reply_list": reply_list,
+            "reply_count": reply_count
+        })
+    return comment_list, next_cursor
 
-    return resp_ok(comment_list, "评论获取成功")
+
+@router.get("/show/comment/{vod_id}/page", response_model=dict)
+async def show_comments_page(
+    vod_id: int,
+    cursor: Optional[str] = Query(None, description="分页游标, 不传表示第一页"),
+    limit: int = Query(20, ge=1, le=100, description="每页顶层评论数"),
+    reply_limit: int = Query(3, ge=0, le=50, description="每条评论预览的回复数"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    分页获取视频的评论，每条顶层评论只附带少量回复预览
+
+    Args:
+        vod_id: 视频ID
+        cursor: 上一页返回的 next_cursor
+        limit: 每页顶层评论数
+        reply_limit: 每条评论预览的回复数
+        db: 异步数据库会话
+
+    Returns:
+        评论列表及 next_cursor，每条评论包含 reply_list（预览）和 reply_count（回复总数）
+    """
+    try:
+        comment_list, next_cursor = await db.run_sync(query_comments_page, vod_id, cursor, limit, reply_limit)
+    except InvalidCursor:
+        return resp_bad_request("无效的分页游标")
+
+    return resp_page(comment_list, "评论获取成功", next_cursor=next_cursor)
+
+
+def iter_comment_export(vod_id: int, batch_size: int = 200, session_factory=ReadSessionLocal) -> Iterator[str]:
+    """
+    按批次流式导出视频的全部评论树，每行一条顶层评论（NDJSON），内存占用只与批次大小有关
+
+    使用独立的数据库会话，响应流结束时关闭
+
+    Args:
+        vod_id: 视频ID
+        batch_size: 每批顶层评论数
+        session_factory: 会话工厂
+
+    Yields:
+        JSON 行
+    """
+    db = session_factory()
+    try:
+        cursor = ''
+        while cursor is not None:
+            query = (db.query(Comment)
+                     .options(selectinload(Comment.user))
+                     .filter(Comment.movdetail_id == vod_id))
+            threads, cursor = keyset_page(query, Comment.timestamp, Comment.id, cursor=cursor,
+                                          per_page=batch_size)
+            if not threads:
+                break
+            replies = (db.query(Comment)
+                       .options(selectinload(Comment.user))
+                       .filter(Comment.root_id.in_([thread.id for thread in threads]))
+                       .all())
+            for item in build_comment_tree(threads + replies):
+                yield json.dumps(item, ensure_ascii=False) + '\n'
+            db.expunge_all()
+    finally:
+        db.close()
+
+
+@router.get("/show/comment/{vod_id}/export")
+def export_comments(vod_id: int):
+    """
+    以 NDJSON 流的形式导出视频的全部评论及回复
+
+    Args:
+        vod_id: 视频ID
+
+    Returns:
+        application/x-ndjson 流式响应
+    """
+    return StreamingResponse(iter_comment_export(vod_id), media_type="application/x-ndjson")
 
 
 @router.post("/publish/comment/{vod_id}", response_model=dict, dependencies=[Depends(require_auth)])
@@ -137,7 +338,8 @@ def reply_comment(
     user_id = reply_data.user_id
 
     try:
-        r_comment = Comment(body=body, user_id=user_id, replied_id=comment_id)
+        r_comment = Comment(body=body, user_id=user_id, replied_id=comment_id,
+                            root_id=comment.root_id or comment.id)
         db.add(r_comment)
         db.commit()
         return resp_ok(None, "评论回复成功")
@@ -1,13 +1,21 @@
-import os
+import json
 from typing import List, Optional, Dict, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy.sql import or_
 
-from app.models.database import get_db
+from app.models.database import get_async_db
 from app.models.models import MovDetail
-from app.utils.response_util import resp_ok, resp_bad_request
+from app.models.projections import vod_list_query, to_vod_list_items
+from app.search import get_search_index
+from app.schemas.video import VodDetailOut, VodDetailResponse, VodListResponse
+from app.utils.response_util import resp_bad_request, resp_page, resp_json
+from app.utils.cache_util import LRUCache
+from app.utils.pagination_util import keyset_page, count_cache, InvalidCursor
+from app.utils.response_cache_util import get_response_cache
+from app.utils.vod_util import clean_vod_content, parse_play_url, play_list_to_dict
 
 router = APIRouter(tags=["视频"])
 
@@ -21,133 +29,271 @@ mov_type_dict = {
     0: [1, 2, 3, 4, 5]
 }
 
+# 筛选项"更多"排除的常用地区、年份
+COMMON_AREAS = ["中国", "内地", "美国", "日本", "韩国", "英国", "法国", "香港", "泰国"]
+COMMON_YEARS = [
+    "2023", "2022", "2021", "2020", "2019", "2018", "2017",
+    "2016", "2015", "2014", "2013", "2012", "2011", "2010"
+]
 
-@router.get("/vod_list", response_model=dict)
-def get_vod_list(
-    page: int = Query(1, ge=1, description="页码"),
-    movtype: int = Query(0, description="视频类型"),
-    vod_area: Optional[str] = Query(None, description="视频地区"),
-    vod_class: Optional[str] = Query(None, description="视频二级类型"),
-    vod_year: Optional[str] = Query(None, description="视频年份"),
-    keyword: Optional[str] = Query(None, description="搜索关键词"),
-    db: Session = Depends(get_db)
+# 列的去重取值缓存，新入库的取值最多 5 分钟后出现在"更多"里
+filter_values_cache = LRUCache(max_size=16, ttl=300)
+
+
+def other_values(db: Session, column, common: List[str]) -> List[str]:
+    """
+    列中不属于常用取值的全部取值
+
+    "更多"筛选写成 NOT IN 时无法走索引，只能沿 vod_time 索引逐行过滤，命中少时几乎扫全表；
+    换成对剩余取值的 IN 后可以按 (vod_area, vod_year, vod_time) 索引定位
+
+    Args:
+        db: 数据库会话
+        column: MovDetail 的列
+        common: 常用取值
+
+    Returns:
+        取值列表（不含 NULL，与 NOT IN 一致）
+    """
+    def load() -> List[str]:
+        excluded = set(common)
+        return sorted(value for (value,) in db.query(column).distinct() if value is not None and value not in excluded)
+
+    return filter_values_cache.get_or_set(column.key, load)
+
+
+def build_vod_list_query(
+    db: Session,
+    movtype: int = 0,
+    vod_area: Optional[str] = None,
+    vod_class: Optional[str] = None,
+    vod_year: Optional[str] = None,
+    keyword: Optional[str] = None
 ):
     """
-    获取视频列表，支持多种筛选条件
+    构建视频列表的筛选查询（未排序、未分页）
 
     Args:
-        page: 页码
+        db: 数据库会话
         movtype: 视频类型 (一级类型)
         vod_area: 视频地区
         vod_class: 视频二级类型
         vod_year: 视频年份
         keyword: 搜索关键词
-        db: 数据库会话
 
     Returns:
-        视频列表
+        Query 对象
     """
     # 获取二级类型列表
     mov_type_list = mov_type_dict.get(movtype, [])
 
-    # 基础查询
+    # 基础查询（只查询列表字段）
     if vod_class:
-        query = db.query(MovDetail).filter(MovDetail.type_name == vod_class)
+        query = vod_list_query(db).filter(MovDetail.type_name == vod_class)
     else:
-        query = db.query(MovDetail).filter(MovDetail.type_id.in_(mov_type_list))
+        query = vod_list_query(db).filter(MovDetail.type_id.in_(mov_type_list))
 
     # 地区筛选
     if vod_area:
         if vod_area != 'more':
             query = query.filter(MovDetail.vod_area == vod_area)
         else:
-            query = query.filter(
-                MovDetail.vod_area.notin_(["中国", "内地", "美国", "日本", "韩国", "英国", "法国", "香港", "泰国"])
-            )
+            query = query.filter(MovDetail.vod_area.in_(other_values(db, MovDetail.vod_area, COMMON_AREAS)))
 
     # 年份筛选
     if vod_year:
         if vod_year != 'more':
             query = query.filter(MovDetail.vod_year == vod_year)
         else:
-            query = query.filter(
-                MovDetail.vod_year.notin_([
-                    "2023", "2022", "2021", "2020", "2019", "2018", "2017",
-                    "2016", "2015", "2014", "2013", "2012", "2011", "2010"
-                ])
-            )
-
-    # 关键词搜索
+            query = query.filter(MovDetail.vod_year.in_(other_values(db, MovDetail.vod_year, COMMON_YEARS)))
+
+    # 关键词搜索: 结果由 LIKE 条件决定（按 vod_time 排序、total 与深分页都与 LIKE 一致），
+    # 倒排索引能找全命中文档时先用候选 vod_id 缩小范围
     if keyword:
-        query = query.filter(
-            or_(
-                MovDetail.vod_name.like(f"%{keyword}%"),
-                MovDetail.vod_content.like(f"%{keyword}%"),
-                MovDetail.vod_director.like(f"%{keyword}%"),
-                MovDetail.vod_actor.like(f"%{keyword}%")
-            )
-        )
+        candidates = get_search_index().candidates(keyword)
+        if candidates is not None:
+            query = query.filter(MovDetail.vod_id.in_(candidates))
+        query = query.filter(keyword_condition(keyword))
+
+    return query
+
+
+def keyword_condition(keyword: str):
+    """
+    关键词 LIKE 条件：片名、简介、导演、演员任一包含关键词
+
+    Args:
+        keyword: 搜索关键词
+
+    Returns:
+        SQLAlchemy 条件
+    """
+    return or_(
+        MovDetail.vod_name.like(f"%{keyword}%"),
+        MovDetail.vod_content.like(f"%{keyword}%"),
+        MovDetail.vod_director.like(f"%{keyword}%"),
+        MovDetail.vod_actor.like(f"%{keyword}%")
+    )
+
+
+def query_vod_list(
+    db: Session,
+    page: int = 1,
+    movtype: int = 0,
+    vod_area: Optional[str] = None,
+    vod_class: Optional[str] = None,
+    vod_year: Optional[str] = None,
+    keyword: Optional[str] = None,
+    cursor: Optional[str] = None,
+    with_total: bool = False
+) -> Dict[str, Any]:
+    """
+    查询一页视频列表（同步，异步接口通过 AsyncSession.run_sync 调用）
+
+    Args:
+        db: 数据库会话
+        page: 页码
+        movtype: 视频类型 (一级类型)
+        vod_area: 视频地区
+        vod_class: 视频二级类型
+        vod_year: 视频年份
+        keyword: 搜索关键词
+        cursor: 分页游标
+        with_total: 是否返回总数
+
+    Returns:
+        分页响应
+
+    Raises:
+        InvalidCursor: 游标格式不正确
+    """
+    query = build_vod_list_query(db, movtype, vod_area, vod_class, vod_year, keyword)
 
     # 分页查询
-    per_page = 12
-    total = query.count()
-    movs = query.order_by(MovDetail.vod_time.desc()).offset((page - 1) * per_page).limit(per_page).all()
+    movs, next_cursor = keyset_page(query, MovDetail.vod_time, MovDetail.id, cursor=cursor, page=page)
+
+    total = None
+    if with_total:
+        count_key = ('vod_list', movtype, vod_area, vod_class, vod_year, keyword)
+        total = count_cache.get_or_set(count_key, query.count)
+
+    return resp_page(to_vod_list_items(movs), "success", next_cursor=next_cursor, total=total)
 
-    # 构建响应数据
-    vod_list = []
-    for mov in movs:
-        vod_list.append({
-            "vod_id": mov.id,
-            "vod_pic": mov.vod_pic,
-            "vod_name": mov.vod_name,
-            "vod_remarks": mov.vod_remarks
-        })
 
-    return resp_ok(vod_list, "success")
+@router.get("/vod_list", response_model=VodListResponse)
+async def get_vod_list(
+    page: int = Query(1, ge=1, description="页码"),
+    movtype: int = Query(0, description="视频类型"),
+    vod_area: Optional[str] = Query(None, description="视频地区"),
+    vod_class: Optional[str] = Query(None, description="视频二级类型"),
+    vod_year: Optional[str] = Query(None, description="视频年份"),
+    keyword: Optional[str] = Query(None, description="搜索关键词"),
+    cursor: Optional[str] = Query(None, description="分页游标, 传空字符串表示游标分页的第一页"),
+    with_total: bool = Query(False, description="是否返回总数（缓存值）"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    获取视频列表，支持多种筛选条件
 
+    Args:
+        page: 页码
+        movtype: 视频类型 (一级类型)
+        vod_area: 视频地区
+        vod_class: 视频二级类型
+        vod_year: 视频年份
+        keyword: 搜索关键词
+        cursor: 上一页返回的 next_cursor, 传入后使用游标分页代替 page
+        with_total: 是否返回总数
+        db: 异步数据库会话
 
-@router.get("/vod_detail", response_model=dict)
-def get_vod_detail(
+    Returns:
+        视频列表
+    """
+    response_cache = get_response_cache()
+    # 空字符串与未传参的筛选结果相同，归一为同一个缓存键；游标分页时 page 不参与查询
+    cache_key = response_cache.make_key(
+        'vod_list', page=page if cursor is None else None, movtype=movtype, vod_area=vod_area or None,
+        vod_class=vod_class or None, vod_year=vod_year or None, keyword=keyword or None,
+        cursor=cursor, with_total=with_total
+    )
+    cached = await response_cache.aget(cache_key)
+    if cached.value is not None:
+        return resp_json(cached.value)
+
+    try:
+        result = await db.run_sync(query_vod_list, page, movtype, vod_area, vod_class, vod_year, keyword,
+                                   cursor, with_total)
+    except InvalidCursor:
+        return resp_json(resp_bad_request("无效的分页游标"))
+
+    # 接口直接返回 ORJSONResponse，FastAPI 不会再按 response_model 处理，在这里校验并按模型字段输出
+    result = VodListResponse.model_validate(result).model_dump()
+    # 写入读取时解析的版本号下, 查询期间数据更新时不会以新版本缓存旧数据
+    await response_cache.aset(cached.key, result)
+    return resp_json(result)
+
+
+def query_vod_detail(db: Session, vod_id: int) -> Optional[Dict[str, Any]]:
+    """
+    查询视频详情（同步，异步接口通过 AsyncSession.run_sync 调用）
+
+    Args:
+        db: 数据库会话
+        vod_id: 视频ID
+
+    Returns:
+        详情字典（VodDetailOut 的字段），视频不存在时返回 None
+    """
+    columns = [getattr(MovDetail, name) for name in VodDetailOut.model_fields]
+    mov = db.query(MovDetail).options(
+        load_only(*columns, MovDetail.vod_content_clean, MovDetail.vod_play_list)
+    ).filter(MovDetail.id == vod_id).first()
+
+    if not mov:
+        return None
+
+    # 简介与播放列表在入库时已处理（app/utils/vod_util.py），只取 VodDetailOut 声明的列构造响应字典，不修改 ORM 对象
+    result = {name: getattr(mov, name) for name in VodDetailOut.model_fields}
+    if mov.vod_play_list is not None:
+        play_list = json.loads(mov.vod_play_list)
+        result['vod_content'] = mov.vod_content_clean
+    else:
+        # 未经入库处理的旧数据
+        play_list = parse_play_url(mov.vod_play_url, mov.vod_play_from)
+        result['vod_content'] = clean_vod_content(mov.vod_content)
+    result['vod_play_url'] = play_list_to_dict(play_list)
+    result['vod_play_list'] = play_list
+    if mov.vod_time:
+        result['vod_time'] = mov.vod_time.strftime("%Y-%m-%d %H:%M:%S")
+    return result
+
+
+@router.get("/vod_detail", response_model=VodDetailResponse)
+async def get_vod_detail(
     vod_id: int = Query(..., description="视频ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     获取视频详情
 
     Args:
         vod_id: 视频ID
-        db: 数据库会话
+        db: 异步数据库会话
 
     Returns:
         视频详情
     """
-    mov = db.query(MovDetail).filter(MovDetail.id == vod_id).first()
+    response_cache = get_response_cache()
+    cache_key = response_cache.make_key('vod_detail', vod_id=vod_id)
+    cached = await response_cache.aget(cache_key)
+    if cached.value is not None:
+        return resp_json(cached.value)
 
-    if not mov:
-        return {"code": 400, "msg": "failed no this mov", "data": None}
-
-    # 处理内容中的 HTML 标签
-    if mov.vod_content:
-        mov.vod_content = (mov.vod_content.replace('<p>', '')
-                          .replace('</p>', '')
-                          .replace('<span>', '')
-                          .replace('</span>', ''))
-
-    # 处理播放URL
-    if mov.vod_play_url:
-        pay_url_dict = {}
-        if mov.vod_play_url:
-            for play_url_set in mov.vod_play_url.split('#'):
-                if '$' in play_url_set:
-                    k, v = play_url_set.split('$')
-                    pay_url_dict[k] = v
-        mov.vod_play_url = pay_url_dict
-
-    # 格式化时间
-    if mov.vod_time:
-        mov.vod_time = mov.vod_time.strftime("%Y-%m-%d %H:%M:%S")
+    result = await db.run_sync(query_vod_detail, vod_id)
 
-    # 转换为字典
-    result = {c.name: getattr(mov, c.name) for c in mov.__table__.columns}
+    if result is None:
+        return resp_json({"code": 400, "msg": "failed no this mov", "data": None})
 
-    return {"code": 200, "data": result, "msg": "success"}
+    response = VodDetailResponse(code=200, data=result, msg="success").model_dump()
+    await response_cache.aset(cached.key, response)
+    return resp_json(response)
@@ -6,10 +6,12 @@ CREATE TABLE `sakura_comment` (
 	`timestamp` DATETIME NULL DEFAULT NULL,
 	`user_id` INT(11) NULL DEFAULT NULL,
 	`replied_id` INT(11) NULL DEFAULT NULL,
+	`root_id` INT(11) NULL DEFAULT NULL,
 	`movdetail_id` INT(11) NULL DEFAULT NULL,
 	PRIMARY KEY (`id`) USING BTREE,
 	INDEX `user_id` (`user_id`) USING BTREE,
 	INDEX `replied_id` (`replied_id`) USING BTREE,
+	INDEX `ix_sakura_comment_root_id` (`root_id`) USING BTREE,
 	INDEX `movdetail_id` (`movdetail_id`) USING BTREE,
 	INDEX `ix_sakura_comment_timestamp` (`timestamp`) USING BTREE,
 	CONSTRAINT `sakura_comment_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `movie`.`sakura_user` (`id`) ON UPDATE RESTRICT ON DELETE RESTRICT,
@@ -25,18 +27,20 @@ AUTO_INCREMENT=86
 --------------------------视频详情信息----------------------------
 CREATE TABLE `sakura_movdetail` (
 	`id` INT(11) NOT NULL AUTO_INCREMENT,
+	`content_hash` VARCHAR(64) NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`group_id` INT(11) NULL DEFAULT NULL,
 	`type_id` INT(11) NULL DEFAULT NULL,
 	`type_id_1` INT(11) NULL DEFAULT NULL,
 	`type_name` VARCHAR(20) NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`vod_actor` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
-	`vod_area` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
+	`vod_area` VARCHAR(32) NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`vod_author` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`vod_behind` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`vod_blurb` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`vod_class` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`vod_color` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`vod_content` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
+	`vod_content_clean` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`vod_copyright` INT(11) NULL DEFAULT NULL,
 	`vod_director` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`vod_douban_id` INT(11) NULL DEFAULT NULL,
@@ -68,6 +72,7 @@ CREATE TABLE `sakura_movdetail` (
 	`vod_play_note` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`vod_play_server` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`vod_play_url` LONGTEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
+	`vod_play_list` LONGTEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`vod_plot` INT(11) NULL DEFAULT NULL,
 	`vod_plot_detail` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`vod_plot_name` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
@@ -107,9 +112,16 @@ CREATE TABLE `sakura_movdetail` (
 	`vod_version` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`vod_weekday` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	`vod_writer` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
-	`vod_year` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
+	`vod_year` VARCHAR(16) NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
 	PRIMARY KEY (`id`, `vod_id`) USING BTREE,
 	INDEX `type_id` (`type_id`) USING BTREE,
+	INDEX `ix_sakura_movdetail_type_id_vod_time` (`type_id`, `vod_time`) USING BTREE,
+	INDEX `ix_sakura_movdetail_type_id_vod_year_vod_time` (`type_id`, `vod_year`, `vod_time`) USING BTREE,
+	INDEX `ix_sakura_movdetail_type_name_vod_time` (`type_name`, `vod_time`) USING BTREE,
+	INDEX `ix_sakura_movdetail_vod_area_vod_year_vod_time` (`vod_area`, `vod_year`, `vod_time`) USING BTREE,
+	INDEX `ix_sakura_movdetail_vod_year_vod_time` (`vod_year`, `vod_time`) USING BTREE,
+	INDEX `ix_sakura_movdetail_vod_time` (`vod_time`) USING BTREE,
+	INDEX `ix_sakura_movdetail_vod_id` (`vod_id`) USING BTREE,
 	CONSTRAINT `sakura_movdetail_ibfk_1` FOREIGN KEY (`type_id`) REFERENCES `movie`.`sakura_movtype` (`type_id`) ON UPDATE RESTRICT ON DELETE RESTRICT
 )
 COLLATE='utf8mb4_general_ci'
@@ -173,4 +185,38 @@ CREATE TABLE `sakura_user_collection` (
 COLLATE='utf8mb4_general_ci'
 ENGINE=InnoDB
 AUTO_INCREMENT=11
-;
\ No newline at end of file
+;
+
+----------------------------------用户收藏视频表（规范化, 取代 sakura_user_collection）------------------------------
+CREATE TABLE `sakura_user_collection_item` (
+	`id` INT(11) NOT NULL AUTO_INCREMENT,
+	`user_id` INT(11) NOT NULL,
+	`movdetail_id` INT(11) NOT NULL,
+	`created_at` DATETIME NULL DEFAULT NULL,
+	PRIMARY KEY (`id`) USING BTREE,
+	UNIQUE INDEX `uq_sakura_user_collection_item_user_id_movdetail_id` (`user_id`, `movdetail_id`) USING BTREE,
+	INDEX `movdetail_id` (`movdetail_id`) USING BTREE,
+	CONSTRAINT `sakura_user_collection_item_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `movie`.`sakura_user` (`id`) ON UPDATE RESTRICT ON DELETE RESTRICT,
+	CONSTRAINT `sakura_user_collection_item_ibfk_2` FOREIGN KEY (`movdetail_id`) REFERENCES `movie`.`sakura_movdetail` (`id`) ON UPDATE RESTRICT ON DELETE RESTRICT
+)
+COLLATE='utf8mb4_general_ci'
+ENGINE=InnoDB
+;
+
+----------------------------------全量抓取分页检查点表----------------------------------------------------------------
+CREATE TABLE `sakura_crawl_page` (
+	`id` INT(11) NOT NULL AUTO_INCREMENT,
+	`crawl` VARCHAR(32) NOT NULL COLLATE 'utf8mb4_general_ci',
+	`page` INT(11) NOT NULL,
+	`status` VARCHAR(16) NOT NULL COLLATE 'utf8mb4_general_ci',
+	`content_hash` VARCHAR(64) NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
+	`etag` VARCHAR(255) NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
+	`attempts` INT(11) NOT NULL DEFAULT 0,
+	`error` TEXT NULL DEFAULT NULL COLLATE 'utf8mb4_general_ci',
+	`updated_at` DATETIME NULL DEFAULT NULL,
+	PRIMARY KEY (`id`) USING BTREE,
+	UNIQUE INDEX `uq_sakura_crawl_page_crawl_page` (`crawl`, `page`) USING BTREE
+)
+COLLATE='utf8mb4_general_ci'
+ENGINE=InnoDB
+;
@@ -9,13 +9,18 @@ import logging
 import logging.config
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from apscheduler.schedulers.background import BackgroundScheduler
 
-from app.core.config import load_config
-from app.models.database import engine
+from app.core.config import load_config, get_config_value
+from app.models.database import engine, dispose_async_engine, pool_stats
 from app.models.base import Base
+from app.utils.metrics_util import MetricsMiddleware, metrics_response_body
+from app.utils.password_util import shutdown_password_hasher
+from app.utils.profiling_util import QueryProfilingMiddleware, profiling_enabled
+from app.utils.response_cache_util import get_response_cache
 
 
 # APScheduler 实例
@@ -122,6 +127,8 @@ async def lifespan(app: FastAPI):
     if scheduler.running:
         scheduler.shutdown()
         print("Scheduler shutdown")
+    await dispose_async_engine()
+    shutdown_password_hasher()
     print("FastAPI application shutdown")
 
 
@@ -134,11 +141,12 @@ def create_app() -> FastAPI:
     """
     config = load_config()
 
-    # 创建 FastAPI 应用
+    # 创建 FastAPI 应用，默认用 orjson 序列化响应
     app = FastAPI(
         title="Sakura Comic API",
         description="樱花动漫网站 API",
         version="1.0.0",
+        default_response_class=ORJSONResponse,
         lifespan=lifespan
     )
 
@@ -151,6 +159,14 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # 路由级延迟、SQL 数、数据库耗时等指标（/metrics），慢请求日志
+    if get_config_value('METRICS_ENABLED', True):
+        app.add_middleware(MetricsMiddleware)
+
+    # 开发模式：按请求统计 SQL，N+1 与慢语句写日志，响应头返回 Server-Timing
+    if profiling_enabled():
+        app.add_middleware(QueryProfilingMiddleware)
+
     # 注册路由
     register_routes(app)
 
@@ -190,3 +206,20 @@ def register_event_handlers(app: FastAPI):
     @app.get("/health")
     async def health():
         return {"status": "healthy"}
+
+    # 运行状态接口不鉴权，由配置项 STATS_ENDPOINTS_ENABLED 显式开启
+    if get_config_value('STATS_ENDPOINTS_ENABLED', False):
+        @app.get("/cache/stats")
+        async def cache_stats():
+            return get_response_cache().stats()
+
+        @app.get("/db/pool")
+        async def db_pool_stats():
+            return pool_stats()
+
+    # 与 MetricsMiddleware 同一开关，关闭时不暴露 /metrics
+    if get_config_value('METRICS_ENABLED', True):
+        @app.get("/metrics", include_in_schema=False)
+        def metrics():
+            body, content_type = metrics_response_body()
+            return Response(content=body, media_type=content_type)
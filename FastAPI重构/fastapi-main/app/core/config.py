@@ -1,15 +1,109 @@
 """
 配置加载模块
 从 YAML 配置文件中加载应用配置
+
+配置在首次使用时解析一次并缓存为类型化的 Settings 对象；同名环境变量优先于 config.yaml
+（如 SECRET_KEY、SQLALCHEMY_DATABASE_URI，字典类型的配置项使用 JSON）。环境变量 ENV 只用于选择配置段，
+不覆盖 ENV 配置项。
+修改配置文件或环境变量后调用 reload_settings() 重新加载
 """
 import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
 import yaml
-from typing import Dict, Any
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')
 
-def load_config(env: str = None) -> Dict[str, Any]:
+
+class Settings(BaseSettings):
     """
-    加载配置文件
+    应用配置，字段与 config.yaml 中的配置项同名；未声明的配置项同样可以读取（类型不做转换）
+    """
+    model_config = SettingsConfigDict(case_sensitive=True, extra='allow')
+
+    DEBUG: bool = False
+    SECRET_KEY: str = 'secret-key'
+    ENV: str = 'production'
+    SCHEDULER_TIMEZONE: str = 'Asia/Shanghai'
+    LOGGING_PATH: str = './logs'
+
+    # 数据库
+    SQLALCHEMY_DATABASE_URI: str = ''
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+    SQLALCHEMY_ASYNC_READS: Optional[bool] = None
+    SQLALCHEMY_REPLICA_DATABASE_URI: Optional[str] = None
+    SQLALCHEMY_TRACK_MODIFICATIONS: bool = False
+    SQLALCHEMY_ENGINE_OPTIONS: Dict[str, Any] = {}
+    SQLALCHEMY_POOL_RECYCLE: Optional[int] = None
+    SQLALCHEMY_POOL_SIZE: Optional[int] = None
+    SQLALCHEMY_MAX_OVERFLOW: Optional[int] = None
+    SQLALCHEMY_POOL_TIMEOUT: Optional[float] = None
+    SQLALCHEMY_POOL_PRE_PING: Optional[bool] = None
+    SCHEDULER_API_ENABLED: bool = True
+
+    # 检索与缓存
+    SEARCH_INDEX_PATH: str = './data/search_index.db'
+    SEARCH_CANDIDATE_LIMIT: int = 300
+    COLLECTION_CACHE_SIZE: int = 10000
+    COLLECTION_CACHE_TTL: float = 5
+    RESPONSE_CACHE_BACKEND: str = 'memory'
+    RESPONSE_CACHE_SIZE: int = 4096
+    RESPONSE_CACHE_TTL: float = 3600
+    REDIS_HOST: str = 'localhost'
+    REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+    TOKEN_CACHE_SIZE: int = 10000
+
+    # 密码哈希与登录限流
+    PASSWORD_HASH_METHOD: str = 'pbkdf2:sha256:260000'
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+    LOGIN_IP_MAX_ATTEMPTS: int = 30
+    LOGIN_USER_MAX_ATTEMPTS: int = 5
+    LOGIN_THROTTLE_WINDOW: float = 300
+
+    # 请求指标与慢请求日志
+    METRICS_ENABLED: bool = True
+    STATS_ENDPOINTS_ENABLED: bool = False
+    SLOW_REQUEST_MS: float = 500
+    SLOW_REQUEST_MAX_STATEMENTS: int = 20
+    QUERY_PROFILING: Optional[bool] = None
+    SLOW_QUERY_MS: float = 100
+    N_PLUS_ONE_THRESHOLD: int = 3
+
+    # 数据源抓取
+    SAKURA_API_URL: Optional[str] = None
+    CRAWL_CONCURRENCY: int = 4
+    CRAWL_TIMEOUT: float = 10
+    CRAWL_RETRIES: int = 3
+    CRAWL_BACKOFF: float = 0.5
+    PIPELINE_QUEUE_SIZE: int = 8
+    PIPELINE_BATCH_SIZE: int = 200
+
+    @classmethod
+    def settings_customise_sources(cls, settings_cls, init_settings, env_settings, dotenv_settings,
+                                   file_secret_settings):
+        # 环境变量 > config.yaml（以构造参数传入） > 字段默认值
+        def env_without_section():
+            # 环境变量 ENV 用于选择 config.yaml 中的配置段（DEVELOPMENT、PRODUCTION），
+            # 不作为 ENV 配置项的值，ENV 配置项只取配置段中的 development、production
+            values = env_settings()
+            values.pop('ENV', None)
+            return values
+
+        return env_without_section, init_settings
+
+
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+_reload_hooks: List[Callable[[Settings], None]] = []
+
+
+def read_config_file(env: str = None) -> Dict[str, Any]:
+    """
+    读取并解析配置文件中指定环境的配置
 
     Args:
         env: 环境名称（DEVELOPMENT, PRODUCTION），如果不传则使用 ENV 环境变量
@@ -21,11 +115,8 @@ def load_config(env: str = None) -> Dict[str, Any]:
     if env is None:
         env = os.getenv('ENV', 'PRODUCTION')
 
-    # 构建配置文件路径
-    config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')
-
     # 读取配置文件
-    with open(config_path, 'r', encoding='utf-8') as f:
+    with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
         config_data = yaml.safe_load(f)
 
     # 获取指定环境的配置，如果不存在则使用 COMMON
@@ -35,6 +126,61 @@ def load_config(env: str = None) -> Dict[str, Any]:
         return config_data.get('COMMON', {})
 
 
+def get_settings() -> Settings:
+    """
+    获取缓存的配置对象，首次调用时加载
+
+    Returns:
+        Settings
+    """
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = Settings(**read_config_file())
+    return _settings
+
+
+def reload_settings() -> Settings:
+    """
+    重新读取配置文件和环境变量，并调用 add_reload_hook 注册的回调
+
+    Returns:
+        新的 Settings
+    """
+    global _settings
+    with _settings_lock:
+        _settings = Settings(**read_config_file())
+    for hook in list(_reload_hooks):
+        hook(_settings)
+    return _settings
+
+
+def add_reload_hook(hook: Callable[[Settings], None]) -> None:
+    """
+    注册配置重新加载后的回调，用于清理依赖配置的缓存
+
+    Args:
+        hook: 参数为新的 Settings
+    """
+    _reload_hooks.append(hook)
+
+
+def load_config(env: str = None) -> Dict[str, Any]:
+    """
+    加载配置文件
+
+    Args:
+        env: 环境名称（DEVELOPMENT, PRODUCTION），如果不传则使用当前环境的缓存配置
+
+    Returns:
+        配置字典
+    """
+    if env is None:
+        return get_settings().model_dump()
+    return Settings(**read_config_file(env)).model_dump()
+
+
 def get_database_url() -> str:
     """
     获取数据库连接URL
@@ -42,8 +188,7 @@ def get_database_url() -> str:
     Returns:
         数据库连接字符串
     """
-    config = load_config()
-    return config.get('SQLALCHEMY_DATABASE_URI', '')
+    return get_settings().SQLALCHEMY_DATABASE_URI
 
 
 def get_config_value(key: str, default: Any = None) -> Any:
@@ -57,5 +202,5 @@ def get_config_value(key: str, default: Any = None) -> Any:
     Returns:
         配置值
     """
-    config = load_config()
-    return config.get(key, default)
+    value = getattr(get_settings(), key, None)
+    return default if value is None else value
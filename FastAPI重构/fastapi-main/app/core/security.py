@@ -7,7 +7,7 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from app.utils.auth_verify_util import validate_token, parse_user_from_token
+from app.utils.auth_verify_util import verify_token
 
 
 security = HTTPBearer()
@@ -26,15 +26,14 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     Raises:
         HTTPException: token 无效时抛出 401 错误
     """
-    token = credentials.credentials
-    if not validate_token(token):
+    claims = verify_token(credentials.credentials)
+    if claims is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = parse_user_from_token(token)
-    return user
+    return claims.as_dict()
 
 
 def get_current_user_optional(
@@ -52,13 +51,8 @@ def get_current_user_optional(
     """
     if not credentials:
         return None
-    token = credentials.credentials
-    try:
-        if validate_token(token):
-            return parse_user_from_token(token)
-    except Exception:
-        pass
-    return None
+    claims = verify_token(credentials.credentials)
+    return claims.as_dict() if claims is not None else None
 
 
 def require_auth(credentials: HTTPAuthorizationCredentials = Depends(security)):
@@ -71,8 +65,7 @@ def require_auth(credentials: HTTPAuthorizationCredentials = Depends(security)):
     Raises:
         HTTPException: token 无效时抛出 401 错误
     """
-    token = credentials.credentials
-    if not validate_token(token):
+    if verify_token(credentials.credentials) is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="401 Unauthorized Access",
@@ -1,35 +1,102 @@
 """
 SQLAlchemy 数据库配置
 兼容 SQLAlchemy 1.4 版本，适配 FastAPI
+同步引擎供写接口与定时任务使用；读接口使用 asyncio 引擎（aiomysql），见 get_async_db。
+SQLite 部署默认不启用 asyncio 读：aiosqlite 在同一进程的工作线程中执行查询，实测吞吐低于同步接口
+（benchmarks/bench_async_api.py），读接口改为在线程池中使用同步会话，可用 SQLALCHEMY_ASYNC_READS 显式开关
+
+连接池参数读取配置 SQLALCHEMY_ENGINE_OPTIONS 及 SQLALCHEMY_POOL_*（见 config.yaml），
+配置 SQLALCHEMY_REPLICA_DATABASE_URI 后读接口连接只读副本，写接口与定时任务连接主库
 """
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
-from typing import Generator
+from starlette.concurrency import run_in_threadpool
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Optional
 
-from app.core.config import get_database_url
+from app.core.config import get_database_url, get_config_value
+from app.utils.metrics_util import instrument_engine
+from app.utils.pool_util import InstrumentedAsyncQueuePool, InstrumentedQueuePool, pool_status
 
+# 单项配置 -> create_engine 参数，优先级高于 SQLALCHEMY_ENGINE_OPTIONS
+POOL_CONFIG_KEYS = {
+    "pool_size": "SQLALCHEMY_POOL_SIZE",
+    "max_overflow": "SQLALCHEMY_MAX_OVERFLOW",
+    "pool_timeout": "SQLALCHEMY_POOL_TIMEOUT",
+    "pool_recycle": "SQLALCHEMY_POOL_RECYCLE",
+    "pool_pre_ping": "SQLALCHEMY_POOL_PRE_PING",
+}
 
-# 创建数据库连接URL
-database_url = get_database_url()
+# 只对 QueuePool 有效的参数
+QUEUE_POOL_OPTIONS = ("pool_size", "max_overflow", "pool_timeout")
 
-# 创建数据库引擎（兼容 SQLAlchemy 1.4）
-engine_kwargs = {
-    "pool_pre_ping": True,
-    "pool_recycle": 1800,
-}
 
-# 处理 SQLite 的特殊情况（测试环境）
-if database_url.startswith("sqlite"):
-    engine_kwargs.update({
-        "poolclass": StaticPool,
-        "connect_args": {"check_same_thread": False},
-    })
+def is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and url.rstrip("/").endswith((":memory:", "sqlite:", "+aiosqlite:", "+pysqlite:"))
+
+
+def engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    根据配置生成 create_engine 参数
+
+    pool_pre_ping 为 True 时每次取连接前检查连接是否可用（悲观策略）；
+    为 False 时不检查，依赖 pool_recycle 定期回收，断开的连接在出错时失效（乐观策略）
+
+    Args:
+        url: 连接串
+        is_async: 是否为 asyncio 引擎
+
+    Returns:
+        create_engine 的关键字参数
+    """
+    options = {"pool_pre_ping": True, "pool_recycle": 1800}
+    options.update(get_config_value("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    for option, key in POOL_CONFIG_KEYS.items():
+        value = get_config_value(key)
+        if value is not None:
+            options[option] = value
+
+    # 处理 SQLite 的特殊情况（测试环境）
+    if url.startswith("sqlite"):
+        for option in QUEUE_POOL_OPTIONS:
+            options.pop(option, None)
+        options["connect_args"] = {"check_same_thread": False}
+        # aiosqlite 的每个连接占用一个工作线程，文件库使用驱动默认的连接池
+        if not is_async or is_memory_sqlite(url):
+            options["poolclass"] = StaticPool
+    else:
+        options.setdefault("poolclass", InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool)
+    return options
+
+
+def create_db_engine(url: str) -> Engine:
+    """
+    按配置的连接池参数创建同步引擎
+
+    Args:
+        url: 连接串
+
+    Returns:
+        Engine
+    """
+    db_engine = create_engine(url, **engine_options(url))
+    instrument_engine(db_engine)
+    return db_engine
+
+
+# 创建数据库连接URL
+database_url = get_database_url()
+replica_url = get_config_value("SQLALCHEMY_REPLICA_DATABASE_URI") or None
 
-engine = create_engine(database_url, **engine_kwargs)
+# 主库引擎（兼容 SQLAlchemy 1.4），未配置只读副本时读写共用
+engine = create_db_engine(database_url)
+read_engine = create_db_engine(replica_url) if replica_url else engine
 
-# 创建会话工厂
+# 创建会话工厂: SessionLocal 连接主库，ReadSessionLocal 连接只读副本
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 
 # 数据库会话依赖，用于 FastAPI 的 Depends
@@ -44,3 +111,172 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Generator:
+    """
+    FastAPI 依赖，创建只读数据库会话（连接只读副本，未配置时连接主库）
+
+    Yields:
+        Session: 数据库会话
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# 同步驱动 -> asyncio 驱动
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+async_url = get_config_value("SQLALCHEMY_ASYNC_DATABASE_URI") or None
+_async_engine = None
+_async_session_factory = None
+
+
+def to_async_url(url: str) -> str:
+    """
+    将同步连接串转换为对应的 asyncio 驱动连接串
+
+    Args:
+        url: 同步连接串，如 mysql+pymysql://...
+
+    Returns:
+        asyncio 连接串，如 mysql+aiomysql://...；未知驱动原样返回
+    """
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+def create_async_db_engine(url: str) -> AsyncEngine:
+    """
+    创建 asyncio 引擎，连接池参数与同步引擎相同
+
+    Args:
+        url: 同步或 asyncio 连接串
+
+    Returns:
+        AsyncEngine
+    """
+    url = to_async_url(url)
+    async_engine = create_async_engine(url, **engine_options(url, is_async=True))
+    instrument_engine(async_engine)
+    return async_engine
+
+
+def get_async_session_factory() -> sessionmaker:
+    """
+    获取 AsyncSession 工厂，首次调用时创建引擎（未安装 asyncio 驱动时不影响同步部分导入）
+    asyncio 引擎只用于读接口，连接串读取配置 SQLALCHEMY_ASYNC_DATABASE_URI，
+    未配置时由只读副本（未配置副本时为主库）的连接串转换
+
+    Returns:
+        sessionmaker
+    """
+    global _async_engine, _async_session_factory
+    if _async_session_factory is None:
+        _async_engine = create_async_db_engine(async_url or replica_url or database_url)
+        _async_session_factory = sessionmaker(_async_engine, class_=AsyncSession, autoflush=False,
+                                              expire_on_commit=False)
+    return _async_session_factory
+
+
+async def dispose_async_engine() -> None:
+    """
+    关闭 asyncio 引擎的连接池，应用关闭时调用
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_session_factory = None
+
+
+def async_reads_enabled() -> bool:
+    """
+    读接口是否使用 asyncio 引擎：读取配置 SQLALCHEMY_ASYNC_READS，未配置时 SQLite 部署关闭、其余开启
+
+    Returns:
+        bool
+    """
+    setting = get_config_value("SQLALCHEMY_ASYNC_READS")
+    if setting is not None:
+        return bool(setting)
+    return not (async_url or replica_url or database_url).startswith("sqlite")
+
+
+class ThreadpoolSession:
+    """
+    只读同步会话的包装，提供与 AsyncSession 相同的 run_sync，查询在 Starlette 线程池中执行（与同步 def 接口相同）
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def run_sync(self, fn: Callable, *args, **kwargs) -> Any:
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+
+# 异步数据库会话依赖，用于 async def 接口
+async def get_async_db() -> AsyncGenerator:
+    """
+    FastAPI 依赖，创建异步数据库会话；未启用 asyncio 读时（见 async_reads_enabled）创建 ThreadpoolSession
+
+    基于 Query API 的查询函数可通过 ``await db.run_sync(func, *args)`` 复用，func 的第一个参数为同步 Session
+
+    Yields:
+        AsyncSession 或 ThreadpoolSession
+    """
+    if not async_reads_enabled():
+        db = ReadSessionLocal()
+        try:
+            yield ThreadpoolSession(db)
+        finally:
+            await run_in_threadpool(db.close)
+        return
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+def configure_database(primary_url: str, replica: Optional[str] = None, async_read_url: Optional[str] = None) -> None:
+    """
+    重新配置主库与只读副本（测试、基准脚本使用），已创建的会话工厂就地重新绑定
+
+    应在 asyncio 引擎使用前或 dispose_async_engine 之后调用
+
+    Args:
+        primary_url: 主库连接串
+        replica: 只读副本连接串，为空时读写共用主库
+        async_read_url: 读接口 asyncio 连接串，为空时由只读副本或主库连接串转换
+    """
+    global database_url, replica_url, async_url, engine, read_engine, _async_engine, _async_session_factory
+    for old in {engine, read_engine}:
+        old.dispose()
+    database_url, replica_url, async_url = primary_url, replica, async_read_url
+    engine = create_db_engine(primary_url)
+    read_engine = create_db_engine(replica) if replica else engine
+    SessionLocal.configure(bind=engine)
+    ReadSessionLocal.configure(bind=read_engine)
+    _async_engine = None
+    _async_session_factory = None
+
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    各引擎连接池的实时状态
+
+    Returns:
+        {"primary": ..., "replica": ...（配置了只读副本时）, "async_read": ...（asyncio 引擎已创建时）}
+    """
+    stats = {"primary": pool_status(engine.pool)}
+    if read_engine is not engine:
+        stats["replica"] = pool_status(read_engine.pool)
+    if _async_engine is not None:
+        stats["async_read"] = pool_status(_async_engine.sync_engine.pool)
+    return stats
@@ -4,12 +4,16 @@
 """
 import datetime
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index, UniqueConstraint
 from sqlalchemy.dialects.mysql import LONGTEXT
 from sqlalchemy.orm import relationship
-from werkzeug.security import generate_password_hash, check_password_hash
 
 from app.models.base import Base
+from app.utils.password_util import hash_password, check_password
+
+
+# MySQL 下使用 LONGTEXT，其他数据库（如测试用的 SQLite）退化为 TEXT
+LongText = Text().with_variant(LONGTEXT, 'mysql')
 
 
 class MovType(Base):
@@ -28,7 +32,7 @@ class MovInfo(Base):
     type_id = Column(Integer, ForeignKey('sakura_movtype.type_id'))  # 一对多关系,ForeignKey在多侧
     type_name = Column(String(20), nullable=False)
     vod_en = Column(Text, nullable=False)
-    vod_id = Column(Integer, primary_key=True)
+    vod_id = Column(Integer, nullable=False)  # 数据源ID, 表内为 (id, vod_id) 联合主键, ORM 仅以自增 id 标识
     vod_name = Column(Text, nullable=False)
     vod_play_from = Column(Text)
     vod_remarks = Column(Text)
@@ -38,20 +42,33 @@ class MovInfo(Base):
 
 class MovDetail(Base):
     __tablename__ = 'sakura_movdetail'
+    __table_args__ = (
+        # /vod_list 的筛选维度 + vod_time 排序, 见 migrations/versions/0001_vod_list_indexes.py
+        Index('ix_sakura_movdetail_type_id_vod_time', 'type_id', 'vod_time'),
+        # 一级类型 + 年份"更多", 见 migrations/versions/0007_movdetail_type_year_index.py
+        Index('ix_sakura_movdetail_type_id_vod_year_vod_time', 'type_id', 'vod_year', 'vod_time'),
+        Index('ix_sakura_movdetail_type_name_vod_time', 'type_name', 'vod_time'),
+        Index('ix_sakura_movdetail_vod_area_vod_year_vod_time', 'vod_area', 'vod_year', 'vod_time'),
+        Index('ix_sakura_movdetail_vod_year_vod_time', 'vod_year', 'vod_time'),
+        Index('ix_sakura_movdetail_vod_time', 'vod_time'),
+        Index('ix_sakura_movdetail_vod_id', 'vod_id'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
+    content_hash = Column(String(64))  # 入库内容摘要 (不含 vod_time), 用于增量写入, 见 app/task/upsert.py
     group_id = Column(Integer)
     type_id = Column(Integer, ForeignKey('sakura_movtype.type_id'))  # 一对多,设置外键
     type_id_1 = Column(Integer)
     type_name = Column(String(20))
     vod_actor = Column(Text)
-    vod_area = Column(Text)
+    vod_area = Column(String(32))
     vod_author = Column(Text)
     vod_behind = Column(Text)
     vod_blurb = Column(Text)
     vod_class = Column(Text)
     vod_color = Column(Text)
     vod_content = Column(Text)
+    vod_content_clean = Column(Text)  # 入库时去除 HTML 标签的简介, 见 app/utils/vod_util.py
     vod_copyright = Column(Integer)
     vod_director = Column(Text)
     vod_douban_id = Column(Integer)
@@ -67,7 +84,7 @@ class MovDetail(Base):
     vod_hits_day = Column(Integer)
     vod_hits_month = Column(Integer)
     vod_hits_week = Column(Integer)
-    vod_id = Column(Integer, primary_key=True)
+    vod_id = Column(Integer, nullable=False)  # 数据源ID, 表内为 (id, vod_id) 联合主键, ORM 仅以自增 id 标识
     vod_isend = Column(Integer)
     vod_jumpurl = Column(Text)
     vod_lang = Column(Text)
@@ -82,7 +99,8 @@ class MovDetail(Base):
     vod_play_from = Column(Text)
     vod_play_note = Column(Text)
     vod_play_server = Column(Text)
-    vod_play_url = Column(LONGTEXT)
+    vod_play_url = Column(LongText)
+    vod_play_list = Column(LongText)  # 入库时解析好的播放列表 JSON, 见 app/utils/vod_util.py
     vod_plot = Column(Integer)
     vod_plot_detail = Column(Text)
     vod_plot_name = Column(Text)
@@ -122,7 +140,7 @@ class MovDetail(Base):
     vod_version = Column(Text)
     vod_weekday = Column(Text)
     vod_writer = Column(Text)
-    vod_year = Column(Text)
+    vod_year = Column(String(16))
     this_mov_type = relationship('MovType', back_populates='this_type_movie_details')
     comments = relationship('Comment', back_populates='mov_detail', cascade='all, delete-orphan')
 
@@ -136,14 +154,15 @@ class User(Base):
 
     comments = relationship('Comment', back_populates='user', cascade='all, delete-orphan')  # 用户信息被删除后 评论也一起被删除
     collections = relationship('UserCollection', back_populates='user', cascade='all, delete-orphan')
+    collection_items = relationship('UserCollectionItem', back_populates='user', cascade='all, delete-orphan')
 
     def set_password(self, password):
-        # 生成hash后的密码
-        self.password_hash = generate_password_hash(password)
+        # 生成hash后的密码（在当前线程计算；接口中使用 password_util.get_password_hasher()）
+        self.password_hash = hash_password(password)
 
     def validate_password(self, password):
         # 将hash密码和密码进行比对
-        return check_password_hash(self.password_hash, password)
+        return check_password(self.password_hash, password)
 
 
 class Comment(Base):
@@ -156,6 +175,7 @@ class Comment(Base):
 
     user_id = Column(Integer, ForeignKey('sakura_user.id'))
     replied_id = Column(Integer, ForeignKey('sakura_comment.id'))  # 将replied_id定义为外键
+    root_id = Column(Integer, index=True)  # 所属顶层评论ID, 顶层评论为空, 用于一次查询取出整棵回复树
     movdetail_id = Column(Integer, ForeignKey('sakura_movdetail.id'))
 
     user = relationship('User', back_populates='comments')
@@ -165,10 +185,43 @@ class Comment(Base):
 
 
 class UserCollection(Base):
+    # 旧的收藏存储（"12;34;56;" 拼接字符串），已由 UserCollectionItem 取代，仅保留用于回滚
     __tablename__ = 'sakura_user_collection'
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('sakura_user.id'))
-    movdetail_id_list = Column(LONGTEXT)
+    movdetail_id_list = Column(LongText)
 
     user = relationship('User', back_populates='collections')
+
+
+class UserCollectionItem(Base):
+    __tablename__ = 'sakura_user_collection_item'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'movdetail_id', name='uq_sakura_user_collection_item_user_id_movdetail_id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('sakura_user.id'), nullable=False)
+    movdetail_id = Column(Integer, ForeignKey('sakura_movdetail.id'), nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    user = relationship('User', back_populates='collection_items')
+
+
+class CrawlPageState(Base):
+    """全量抓取的分页检查点, 见 app/task/checkpoint.py"""
+    __tablename__ = 'sakura_crawl_page'
+    __table_args__ = (
+        UniqueConstraint('crawl', 'page', name='uq_sakura_crawl_page_crawl_page'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    crawl = Column(String(32), nullable=False)  # 抓取任务, 如 list / detail
+    page = Column(Integer, nullable=False)
+    status = Column(String(16), nullable=False)  # done / failed
+    content_hash = Column(String(64))  # 页面数据的 sha256
+    etag = Column(String(255))
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
@@ -0,0 +1,54 @@
+"""
+列表查询投影
+列表类接口只需要少数几个字段，只查询这些列，避免加载 vod_play_url、vod_content 等大字段
+"""
+import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from app.models.models import MovDetail
+
+
+class VodListRow(NamedTuple):
+    """视频列表行，字段顺序与 VOD_LIST_COLUMNS 一致"""
+    id: int
+    vod_pic: Optional[str]
+    vod_name: Optional[str]
+    vod_remarks: Optional[str]
+    vod_time: Optional[datetime.datetime]
+
+
+VOD_LIST_COLUMNS = tuple(getattr(MovDetail, field) for field in VodListRow._fields)
+
+
+def vod_list_query(db):
+    """
+    创建只选择列表字段的查询，结果为与 VodListRow 同形的 Row
+
+    Args:
+        db: 数据库会话
+
+    Returns:
+        Query 对象
+    """
+    return db.query(*VOD_LIST_COLUMNS)
+
+
+def to_vod_list_items(rows: Iterable[VodListRow]) -> List[Dict]:
+    """
+    将列表行转换为接口返回格式
+
+    Args:
+        rows: vod_list_query 的查询结果
+
+    Returns:
+        视频列表
+    """
+    return [
+        {
+            "vod_id": row.id,
+            "vod_pic": row.vod_pic,
+            "vod_name": row.vod_name,
+            "vod_remarks": row.vod_remarks
+        }
+        for row in rows
+    ]
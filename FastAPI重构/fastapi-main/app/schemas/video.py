@@ -3,7 +3,6 @@
 """
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
-from datetime import datetime
 
 
 class VodListItem(BaseModel):
@@ -18,30 +17,45 @@ class VodListResponse(BaseModel):
     """视频列表响应"""
     code: int
     message: str
-    data: List[VodListItem]
-
-
-class VodDetailResponse(BaseModel):
-    """视频详情响应"""
-    code: int
-    data: Optional[Dict[str, Any]] = None
-    msg: str
+    data: Optional[List[VodListItem]] = None
+    next_cursor: Optional[str] = None  # 下一页游标，没有下一页时为 None
+    total: Optional[int] = None  # with_total=true 时返回
 
 
 class VodDetailOut(BaseModel):
-    """视频详情输出（部分字段）"""
+    """
+    视频详情输出
+    只包含前端使用的字段，movdetail 表的其余列（统计、下载地址、入库辅助列等）不返回
+    """
     id: int
     vod_id: int
+    type_id: Optional[int] = None
+    type_name: Optional[str] = None
     vod_name: Optional[str] = None
+    vod_en: Optional[str] = None
     vod_pic: Optional[str] = None
-    vod_content: Optional[str] = None
-    vod_play_url: Optional[Dict[str, str]] = None
+    vod_class: Optional[str] = None
+    vod_lang: Optional[str] = None
+    vod_content: Optional[str] = None  # 清洗后的简介
+    vod_play_from: Optional[str] = None
+    vod_play_url: Optional[Dict[str, str]] = None  # 第一个播放来源
+    vod_play_list: Optional[List[Dict[str, Any]]] = None  # 全部播放来源
     vod_time: Optional[str] = None
     vod_actor: Optional[str] = None
     vod_director: Optional[str] = None
     vod_area: Optional[str] = None
     vod_year: Optional[str] = None
     vod_remarks: Optional[str] = None
+    vod_score: Optional[str] = None
+    vod_total: Optional[int] = None
+    vod_isend: Optional[int] = None
 
     class Config:
         from_attributes = True
+
+
+class VodDetailResponse(BaseModel):
+    """视频详情响应"""
+    code: int
+    data: Optional[VodDetailOut] = None
+    msg: str
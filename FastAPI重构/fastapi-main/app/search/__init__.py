@@ -0,0 +1,7 @@
+"""
+视频全文检索
+"""
+from app.search.index import SearchIndex, get_search_index, rebuild_index
+from app.search.tokenizer import tokenize, query_tokens, covers_substring
+
+__all__ = ["SearchIndex", "get_search_index", "rebuild_index", "tokenize", "query_tokens", "covers_substring"]
@@ -0,0 +1,15 @@
+"""
+从数据库全量重建搜索索引（首次部署、索引文件丢失或损坏时执行）
+
+用法（在 fastapi-main 目录下）:
+    python -m app.search
+"""
+from app.models.database import SessionLocal
+from app.search.index import rebuild_index
+
+if __name__ == '__main__':
+    session = SessionLocal()
+    try:
+        print(f'indexed {rebuild_index(session)} documents')
+    finally:
+        session.close()
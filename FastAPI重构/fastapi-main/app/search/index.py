@@ -0,0 +1,272 @@
+"""
+视频全文检索倒排索引
+基于 SQLite 存储，纯 Python 实现，不依赖 MySQL 即可使用和测试
+
+/vod_list 的关键词搜索仍以数据库 LIKE 条件为准，索引只用来缩小候选范围（candidates），结果与直接 LIKE 一致。
+索引只有在 rebuild_index 完整执行过一次之后才会使用；抓取任务的增量写入不会使索引变为可用，
+增量写入失败（mark_stale）或重建期间有其他写入时索引不再使用，直到下一次完整重建
+"""
+import os
+import sqlite3
+import threading
+import logging
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import get_config_value
+from app.search.tokenizer import tokenize, query_tokens, covers_substring
+
+logger = logging.getLogger(__name__)
+
+# 参与索引的字段及其权重，片名命中的相关度最高
+FIELD_WEIGHTS = {
+    'vod_name': 4.0,
+    'vod_actor': 2.0,
+    'vod_director': 2.0,
+    'vod_content': 1.0,
+}
+
+# 单次搜索返回的最大候选数
+DEFAULT_SEARCH_LIMIT = 1000
+
+
+class SearchIndex:
+    """
+    倒排索引，文档以数据源的 vod_id 为主键
+
+    postings 表按 (token, vod_id) 存储加权词频，搜索时对所有查询词元做交集并按权重和排序
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL' if path != ':memory:' else 'PRAGMA journal_mode=MEMORY')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS search_postings (
+                token TEXT NOT NULL,
+                vod_id INTEGER NOT NULL,
+                weight REAL NOT NULL,
+                PRIMARY KEY (token, vod_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS ix_search_postings_vod_id ON search_postings (vod_id);
+            CREATE TABLE IF NOT EXISTS search_docs (
+                vod_id INTEGER PRIMARY KEY
+            );
+            CREATE TABLE IF NOT EXISTS search_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        ''')
+        self._conn.commit()
+
+    @staticmethod
+    def _postings(doc: Dict) -> Dict[str, float]:
+        """计算单个文档各词元的加权词频"""
+        weights = Counter()
+        for field, field_weight in FIELD_WEIGHTS.items():
+            for token, tf in Counter(tokenize(doc.get(field) or '')).items():
+                weights[token] += field_weight * tf
+        return weights
+
+    def index_documents(self, docs: Iterable[Dict]) -> int:
+        """
+        增量写入文档，已存在的文档会先删除旧词元再写入
+
+        Args:
+            docs: 文档字典序列，需包含 vod_id 及 FIELD_WEIGHTS 中的字段
+
+        Returns:
+            写入的文档数
+        """
+        rows = []
+        vod_ids = []
+        for doc in docs:
+            vod_id = doc.get('vod_id')
+            if vod_id is None:
+                continue
+            vod_id = int(vod_id)
+            vod_ids.append((vod_id,))
+            rows.extend((token, vod_id, weight) for token, weight in self._postings(doc).items())
+
+        if not vod_ids:
+            return 0
+
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM search_postings WHERE vod_id = ?', vod_ids)
+            self._conn.executemany('INSERT OR IGNORE INTO search_docs (vod_id) VALUES (?)', vod_ids)
+            self._conn.executemany('INSERT INTO search_postings (token, vod_id, weight) VALUES (?, ?, ?)', rows)
+            self._count_write()
+        return len(vod_ids)
+
+    def remove_documents(self, vod_ids: Iterable[int]) -> None:
+        """
+        从索引中删除文档
+
+        Args:
+            vod_ids: 数据源 vod_id 序列
+        """
+        params = [(int(vod_id),) for vod_id in vod_ids]
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM search_postings WHERE vod_id = ?', params)
+            self._conn.executemany('DELETE FROM search_docs WHERE vod_id = ?', params)
+            self._count_write()
+
+    def _count_write(self) -> None:
+        """在当前事务内递增写入次数，rebuild_index 据此发现重建期间其他进程的写入"""
+        self._conn.execute("INSERT INTO search_meta (key, value) VALUES ('writes', '1') "
+                           "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1")
+
+    def writes(self) -> int:
+        """上次 clear 以来 index_documents / remove_documents 的调用次数（所有进程合计）"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM search_meta WHERE key = 'writes'").fetchone()
+        return int(row[0]) if row else 0
+
+    def search(self, keyword: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[int]:
+        """
+        搜索关键词，返回按相关度降序排列的 vod_id
+
+        Args:
+            keyword: 搜索关键词
+            limit: 最大返回数量
+
+        Returns:
+            vod_id 列表
+        """
+        tokens = query_tokens(keyword)
+        if not tokens:
+            return []
+        placeholders = ','.join('?' * len(tokens))
+        sql = (f'SELECT vod_id FROM search_postings WHERE token IN ({placeholders}) '
+               f'GROUP BY vod_id HAVING COUNT(*) = ? ORDER BY SUM(weight) DESC, vod_id DESC LIMIT ?')
+        with self._lock:
+            rows = self._conn.execute(sql, (*tokens, len(tokens), limit)).fetchall()
+        return [row[0] for row in rows]
+
+    def candidates(self, keyword: str, limit: int = None) -> Optional[List[int]]:
+        """
+        取包含关键词的候选 vod_id，用于缩小数据库 LIKE 查询的范围
+
+        只有索引能保证不漏掉 LIKE 命中的文档时才返回候选：索引已完整重建，且关键词只含中日韩文字。
+        最少见的词元也超过 limit 个文档时关键词是常见词，沿 vod_time 索引扫描很快就能凑满一页，
+        构造大的 IN 列表反而更慢，同样返回 None
+
+        Args:
+            keyword: 搜索关键词
+            limit: 最多候选数，默认读取配置 SEARCH_CANDIDATE_LIMIT
+
+        Returns:
+            候选 vod_id 列表（可能包含不满足 LIKE 的文档），返回 None 时调用方直接使用 LIKE
+        """
+        if not covers_substring(keyword) or not self.is_ready():
+            return None
+        limit = limit or get_config_value('SEARCH_CANDIDATE_LIMIT', 300)
+        tokens = list(query_tokens(keyword))
+        with self._lock:
+            # 从文档数最少的词元出发，其余词元按主键 (token, vod_id) 逐个确认，不需要排序和聚合；
+            # 文档数只数到 limit + 1，常见词元不必数完
+            frequency = {token: self._conn.execute(
+                'SELECT COUNT(*) FROM (SELECT 1 FROM search_postings WHERE token = ? LIMIT ?)',
+                (token, limit + 1)).fetchone()[0] for token in tokens}
+            tokens.sort(key=frequency.get)
+            if frequency[tokens[0]] > limit:
+                return None
+            exists = ''.join(' AND EXISTS (SELECT 1 FROM search_postings p WHERE p.token = ? AND p.vod_id = p0.vod_id)'
+                             for _ in tokens[1:])
+            rows = self._conn.execute(f'SELECT p0.vod_id FROM search_postings p0 WHERE p0.token = ?{exists}',
+                                      tokens).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self) -> int:
+        """已索引的文档数"""
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM search_docs').fetchone()[0]
+
+    def is_ready(self) -> bool:
+        """索引是否已完整重建过（否则调用方应直接使用数据库 LIKE 查询）"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM search_meta WHERE key = 'built_at'").fetchone() is not None
+
+    def mark_ready(self) -> None:
+        """记录索引已包含数据库中的全部文档，由 rebuild_index 在重建完成后调用"""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO search_meta (key, value) VALUES ('built_at', ?)",
+                               (str(time.time()),))
+
+    def mark_stale(self) -> None:
+        """清除完整重建标记：索引可能缺少文档（增量写入失败等），之后的搜索直接使用 LIKE，直到重新执行 rebuild_index"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM search_meta WHERE key = 'built_at'")
+
+    def clear(self) -> None:
+        """清空索引（同时清除完整重建标记）"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM search_postings')
+            self._conn.execute('DELETE FROM search_docs')
+            self._conn.execute('DELETE FROM search_meta')
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_search_index: Optional[SearchIndex] = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """
+    获取进程内共享的搜索索引，路径由配置项 SEARCH_INDEX_PATH 指定
+
+    Returns:
+        SearchIndex 实例
+    """
+    global _search_index
+    if _search_index is None:
+        with _search_index_lock:
+            if _search_index is None:
+                path = get_config_value('SEARCH_INDEX_PATH', './data/search_index.db')
+                if path != ':memory:':
+                    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                _search_index = SearchIndex(path)
+    return _search_index
+
+
+def rebuild_index(session, index: Optional[SearchIndex] = None, batch_size: int = 1000) -> int:
+    """
+    从数据库全量重建索引，用于首次部署或索引损坏时；完成后索引才会用于 /vod_list 的关键词搜索
+
+    Args:
+        session: 数据库会话
+        index: 目标索引，默认使用共享索引
+        batch_size: 每批读取的行数
+
+    Returns:
+        索引的文档数
+    """
+    from app.models.models import MovDetail
+
+    index = index or get_search_index()
+    index.clear()
+    columns = [MovDetail.vod_id] + [getattr(MovDetail, field) for field in FIELD_WEIGHTS]
+    total = 0
+    own_writes = 0
+    batch = []
+    for row in session.query(*columns).yield_per(batch_size):
+        batch.append(dict(row._mapping))
+        if len(batch) >= batch_size:
+            total += index.index_documents(batch)
+            own_writes += 1
+            batch = []
+    if batch:
+        total += index.index_documents(batch)
+        own_writes += 1
+    if index.writes() != own_writes:
+        # 重建期间抓取任务写入过索引, 之前读出的批次可能覆盖了更新的词元, 索引保持不可用
+        logger.warning('搜索索引重建期间有其他写入, 索引未标记为可用, 请在抓取结束后重新执行')
+        return total
+    index.mark_ready()
+    logger.info(f'搜索索引重建完成, 共 {total} 条')
+    return total
@@ -0,0 +1,89 @@
+"""
+搜索分词模块
+中日韩文字按 n-gram（单字 + 二元组）切分，字母数字按整词切分
+"""
+import re
+import unicodedata
+from typing import List, Set
+
+# 中日韩文字区间：假名、CJK 扩展A、CJK 统一表意文字、兼容表意文字、韩文音节
+_CJK_CHARS = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af'
+_TOKEN_RE = re.compile(f'[{_CJK_CHARS}]+|[0-9a-z]+')
+_CJK_RE = re.compile(f'[{_CJK_CHARS}]')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def normalize(text: str) -> str:
+    """
+    文本归一化：去除 HTML 标签，全角转半角，统一小写
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        归一化后的文本
+    """
+    if not text:
+        return ''
+    text = _TAG_RE.sub(' ', text)
+    return unicodedata.normalize('NFKC', text).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    对待索引文本分词，保留重复词元用于统计词频
+
+    中日韩连续文字输出全部单字和相邻二元组，字母数字输出整词
+
+    Args:
+        text: 待索引文本
+
+    Returns:
+        词元列表
+    """
+    tokens = []
+    for run in _TOKEN_RE.findall(normalize(text)):
+        if _CJK_RE.match(run):
+            tokens.extend(run)
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def query_tokens(keyword: str) -> Set[str]:
+    """
+    对搜索关键词分词，结果中所有词元都命中的文档才算匹配
+
+    中日韩文字长度大于 1 时只取二元组（足以覆盖子串匹配），单字时取单字
+
+    Args:
+        keyword: 搜索关键词
+
+    Returns:
+        去重后的词元集合
+    """
+    tokens = set()
+    for run in _TOKEN_RE.findall(normalize(keyword)):
+        if _CJK_RE.match(run) and len(run) > 1:
+            tokens.update(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.add(run)
+    return tokens
+
+
+def covers_substring(keyword: str) -> bool:
+    """
+    倒排索引能否找全包含该关键词（子串匹配）的文档
+
+    中日韩文字的单字和二元组都已索引，包含关键词的文档一定含有它的全部查询词元；
+    字母数字只按整词索引（"one" 找不到 "onepiece"），关键词中含字母数字或没有任何词元时索引不能保证召回
+
+    Args:
+        keyword: 搜索关键词
+
+    Returns:
+        是否可以用索引结果作为 LIKE 查询的候选集
+    """
+    runs = _TOKEN_RE.findall(normalize(keyword))
+    return bool(runs) and all(_CJK_RE.match(run) for run in runs)
@@ -0,0 +1,176 @@
+import json
+import hashlib
+import logging
+import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.models.models import CrawlPageState
+
+logger = logging.getLogger(__name__)
+
+DONE = 'done'
+FAILED = 'failed'
+
+# 抓取模式
+RESUME = 'resume'  # 跳过已完成的页面, 抓取未完成和失败的页面
+FAILED_ONLY = 'failed'  # 只重试失败的页面
+REFRESH = 'refresh'  # 重新抓取全部页面, 跳过内容未变化的页面
+MODES = (RESUME, FAILED_ONLY, REFRESH)
+
+
+class PageDone(NamedTuple):
+    '''
+    流水线中随页面数据传递的标记: 该页数据写入后记为完成
+    '''
+    page: int
+    content_hash: Optional[str]
+    etag: Optional[str]
+
+
+class PageFailed(NamedTuple):
+    '''
+    流水线中传递的标记: 该页抓取或写入失败
+    '''
+    page: int
+    error: str
+
+
+def page_digest(data: dict) -> str:
+    '''
+    页面数据的 sha256, 只计算 list 部分 (total 等分页信息随数据源总量变化)
+    :param data: 页面 JSON
+    :return: 十六进制摘要
+    '''
+    raw = json.dumps(data.get('list'), sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class CrawlCheckpoint:
+    '''
+    全量抓取的分页检查点, 保存在 sakura_crawl_page 表
+    页面的完成标记与该页数据在同一个事务内提交, 中断后可从检查点继续
+    '''
+
+    def __init__(self, session: Session, crawl: str):
+        '''
+        :param session: 写库阶段使用的数据库会话
+        :param crawl: 抓取任务名, 如 list / detail
+        '''
+        self.session = session
+        self.crawl = crawl
+        self.states: Dict[int, CrawlPageState] = {
+            state.page: state
+            for state in session.query(CrawlPageState).filter(CrawlPageState.crawl == crawl)
+        }
+        # 解析线程只读的快照, 避免跨线程访问 ORM 对象
+        self.hashes = {page: state.content_hash for page, state in self.states.items()}
+        self.etags = {page: state.etag for page, state in self.states.items()}
+        self.unchanged = 0
+
+    def pages(self, total_page: int, mode: str = RESUME) -> List[int]:
+        '''
+        本次需要抓取的页码
+        :param total_page: 总页数
+        :param mode: 抓取模式 resume / failed / refresh
+        :return: 页码列表
+        '''
+        if mode not in MODES:
+            raise ValueError(f'未知的抓取模式: {mode}')
+        if mode == REFRESH:
+            return list(range(1, total_page + 1))
+        if mode == FAILED_ONLY:
+            return sorted(page for page, state in self.states.items()
+                          if state.status == FAILED and page <= total_page)
+        return [page for page in range(1, total_page + 1)
+                if page not in self.states or self.states[page].status != DONE]
+
+    def wrap_parse(self, parse: Callable[[int, dict, Optional[Exception]], list], skip_unchanged: bool):
+        '''
+        包装流水线解析阶段: 在页面数据之后追加完成/失败标记, 内容未变化的页面只传递完成标记
+        :param parse: 原解析函数, 参数为 (页码, 页面 JSON, 异常)
+        :param skip_unchanged: 是否跳过内容摘要未变化的页面
+        :return: 解析函数, 参数为 (页码, FetchedPage, 异常)
+        '''
+        def checkpointed_parse(page: int, fetched, error: Exception = None) -> list:
+            if error:
+                logger.error(f"抓取数据失败: {error}")
+                return [PageFailed(page, str(error))]
+            if fetched.not_modified:
+                self.unchanged += 1
+                return [PageDone(page, self.hashes.get(page), fetched.etag)]
+            digest = page_digest(fetched.data)
+            if skip_unchanged and self.hashes.get(page) == digest:
+                self.unchanged += 1
+                return [PageDone(page, digest, fetched.etag)]
+            return list(parse(page, fetched.data, None)) + [PageDone(page, digest, fetched.etag)]
+
+        return checkpointed_parse
+
+    def wrap_write(self, write: Callable[[Session, list], None]):
+        '''
+        包装流水线写库阶段: 数据与完成标记在同一个事务内提交, 写入失败时将本批页面记为失败
+        :param write: 原写库函数, 参数为 (会话, 行列表), 出错时抛出异常
+        :return: 写库函数, 参数为行与标记混合的列表
+        '''
+        def checkpointed_write(items: list) -> None:
+            rows, markers = split_markers(items)
+            try:
+                self._apply(markers)
+                if rows:
+                    write(self.session, rows)
+                self.session.commit()
+            except Exception as e:
+                logger.error(f"写入失败, 本批页面记为失败: {e}")
+                self.session.rollback()
+                # 回滚后本批新建的检查点对象已从会话移除, 重新创建
+                for page, state in list(self.states.items()):
+                    if not inspect(state).persistent:
+                        del self.states[page]
+                self._apply([PageFailed(marker.page, str(e)) for marker in markers])
+                self.session.commit()
+
+        return checkpointed_write
+
+    def _apply(self, markers: list) -> None:
+        now = datetime.datetime.utcnow()
+        for marker in markers:
+            state = self.states.get(marker.page)
+            if state is None:
+                state = CrawlPageState(crawl=self.crawl, page=marker.page, attempts=0)
+                self.states[marker.page] = state
+            self.session.add(state)
+            state.attempts = (state.attempts or 0) + 1
+            state.updated_at = now
+            if isinstance(marker, PageDone):
+                state.status = DONE
+                state.content_hash = marker.content_hash
+                state.etag = marker.etag
+                state.error = None
+            else:
+                state.status = FAILED
+                state.error = marker.error[:2000]
+
+    def summary(self) -> Dict[str, int]:
+        '''
+        :return: 各状态页数及本次跳过的未变化页数
+        '''
+        counts = {DONE: 0, FAILED: 0}
+        for state in self.states.values():
+            counts[state.status] = counts.get(state.status, 0) + 1
+        counts['unchanged'] = self.unchanged
+        return counts
+
+
+def split_markers(items: list) -> Tuple[list, list]:
+    '''
+    拆分流水线写库阶段收到的数据行与检查点标记
+    :param items: 行与标记混合的列表
+    :return: (数据行, 标记)
+    '''
+    rows, markers = [], []
+    for item in items:
+        (markers if isinstance(item, (PageDone, PageFailed)) else rows).append(item)
+    return rows, markers
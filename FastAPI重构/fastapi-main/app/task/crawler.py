@@ -0,0 +1,159 @@
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import get_config_value
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = 'https://m3u8.apiyhzy.com/api.php/provide/vod/'
+
+# 可重试的 HTTP 状态码: 限流与服务端错误
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    '''
+    页面在重试次数用尽后仍抓取失败
+    '''
+
+    def __init__(self, url: str, reason: str):
+        super().__init__(f'{url}: {reason}')
+        self.url = url
+        self.reason = reason
+
+
+class FetchedPage(NamedTuple):
+    data: Optional[Dict[str, Any]]  # 页面 JSON, 未修改时为 None
+    etag: Optional[str]
+    not_modified: bool
+
+
+class PageFetcher:
+    '''
+    数据源分页抓取客户端
+    复用带连接池的 requests.Session (keep-alive), 每次请求设置超时, 失败按指数退避重试;
+    Session 不保证线程安全, 每个线程持有独立的 Session
+    '''
+
+    def __init__(self, api_url: str = None, timeout: float = None, retries: int = None,
+                 backoff: float = None, pool_size: int = None):
+        '''
+        :param api_url: 数据源接口地址, 默认读取配置 SAKURA_API_URL
+        :param timeout: 单次请求超时秒数
+        :param retries: 失败后的最大重试次数
+        :param backoff: 退避基数秒数, 第 n 次重试前等待 backoff * 2 ** (n - 1)
+        :param pool_size: 每个 Session 的连接池大小
+        '''
+        self.api_url = api_url or get_config_value('SAKURA_API_URL', DEFAULT_API_URL)
+        self.timeout = timeout if timeout is not None else get_config_value('CRAWL_TIMEOUT', 10)
+        self.retries = retries if retries is not None else get_config_value('CRAWL_RETRIES', 3)
+        self.backoff = backoff if backoff is not None else get_config_value('CRAWL_BACKOFF', 0.5)
+        self.pool_size = pool_size or get_config_value('CRAWL_CONCURRENCY', 4)
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+        return session
+
+    def page_url(self, ac: str, page: int) -> str:
+        '''
+        :param ac: 接口类型 list / detail
+        :param page: 页码
+        :return: 页面地址
+        '''
+        return f'{self.api_url}?ac={ac}&pg={page}'
+
+    def fetch(self, ac: str, page: int) -> Dict[str, Any]:
+        '''
+        抓取一页并解析 JSON
+        :param ac: 接口类型 list / detail
+        :param page: 页码
+        :return: 页面 JSON
+        '''
+        return self.fetch_page(ac, page).data
+
+    def fetch_page(self, ac: str, page: int, etag: str = None) -> 'FetchedPage':
+        '''
+        抓取一页, 传入上次的 ETag 时发送条件请求, 数据源返回 304 时不下载页面
+        :param ac: 接口类型 list / detail
+        :param page: 页码
+        :param etag: 上次抓取时的 ETag
+        :return: FetchedPage
+        '''
+        url = self.page_url(ac, page)
+        headers = {'If-None-Match': etag} if etag else None
+        attempt = 0
+        while True:
+            try:
+                response = self.session.get(url, timeout=self.timeout, headers=headers)
+                if response.status_code == 304:
+                    return FetchedPage(None, etag, True)
+                if response.status_code == 200:
+                    return FetchedPage(response.json(), response.headers.get('ETag'), False)
+                reason = f'status {response.status_code}'
+                retryable = response.status_code in RETRY_STATUS
+            except (requests.ConnectionError, requests.Timeout) as e:
+                reason = f'{type(e).__name__}: {e}'
+                retryable = True
+            except ValueError as e:
+                # 响应不是合法 JSON (被截断等), 重试
+                reason = f'invalid json: {e}'
+                retryable = True
+
+            if not retryable or attempt >= self.retries:
+                raise FetchError(url, reason)
+            attempt += 1
+            delay = self.backoff * 2 ** (attempt - 1)
+            logger.warning(f'抓取失败, {delay:.2f}s 后第 {attempt} 次重试: {url} ({reason})')
+            time.sleep(delay)
+
+
+def iter_pages(fetch: Callable[[int], Any], pages: Iterable[int],
+               concurrency: int = None) -> Iterator[Tuple[int, Any, Optional[Exception]]]:
+    '''
+    并发抓取多个页面, 按页码顺序产出结果
+    最多同时抓取 concurrency 页; 调用方停止迭代 (break / close) 时取消尚未开始的抓取,
+    因此按顺序判断停止条件时, 迭代器本身最多多抓取 concurrency 页
+    :param fetch: 抓取单页的函数, 参数为页码
+    :param pages: 页码序列
+    :param concurrency: 并发数, 默认读取配置 CRAWL_CONCURRENCY
+    :return: (页码, 页面数据, 异常) 迭代器, 抓取失败时页面数据为 None
+    '''
+    concurrency = max(1, concurrency or get_config_value('CRAWL_CONCURRENCY', 4))
+    pages = iter(pages)
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='crawler')
+    pending = deque()
+    try:
+        for page in pages:
+            pending.append((page, executor.submit(fetch, page)))
+            if len(pending) >= concurrency:
+                break
+        while pending:
+            page, future = pending.popleft()
+            try:
+                result, error = future.result(), None
+            except Exception as e:
+                result, error = None, e
+            # 先补充窗口再产出, 调用方处理本页时后续页面已在抓取
+            next_page = next(pages, None)
+            if next_page is not None:
+                pending.append((next_page, executor.submit(fetch, next_page)))
+            yield page, result, error
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -0,0 +1,192 @@
+import time
+import queue
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.core.config import get_config_value
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class StageMetrics:
+    '''
+    单个阶段的吞吐与耗时统计
+    busy: 处理数据的累计耗时; blocked: 下游队列已满时等待的累计耗时 (反压)
+    '''
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.max_latency = 0.0
+
+    def record(self, seconds: float, items: int = 1) -> None:
+        self.items += items
+        self.busy += seconds
+        self.max_latency = max(self.max_latency, seconds)
+
+    def as_dict(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            'stage': self.name,
+            'items': self.items,
+            'busy_s': round(self.busy, 3),
+            'blocked_s': round(self.blocked, 3),
+            'max_ms': round(self.max_latency * 1000, 1),
+            'per_s': round(self.items / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+class IngestPipeline:
+    '''
+    抓取 -> 解析 -> 批量写库 三阶段流水线
+    抓取与解析各占一个线程, 写库在调用线程执行 (数据库会话只在一个线程内使用);
+    阶段之间为有界队列, 下游处理不过来时上游阻塞等待, 内存占用有上限
+    '''
+
+    def __init__(self, queue_size: int = None, batch_size: int = None):
+        '''
+        :param queue_size: 阶段之间的队列长度 (页), 默认读取配置 PIPELINE_QUEUE_SIZE
+        :param batch_size: 累计达到该行数后写库, 默认读取配置 PIPELINE_BATCH_SIZE
+        '''
+        self.queue_size = queue_size or get_config_value('PIPELINE_QUEUE_SIZE', 8)
+        self.batch_size = batch_size or get_config_value('PIPELINE_BATCH_SIZE', 200)
+        self.fetch_metrics = StageMetrics('fetch')
+        self.parse_metrics = StageMetrics('parse')
+        self.write_metrics = StageMetrics('write')
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def stop(self) -> None:
+        '''
+        停止抓取; 已在队列中的页面不再解析, 已解析的数据仍会写入
+        '''
+        self._stop.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def _put(self, q: queue.Queue, item, metrics: StageMetrics) -> bool:
+        start = time.perf_counter()
+        while True:
+            try:
+                q.put(item, timeout=0.1)
+                metrics.blocked += time.perf_counter() - start
+                return True
+            except queue.Full:
+                if self._errors:
+                    return False
+
+    def _fetch_worker(self, source: Iterable, out: queue.Queue) -> None:
+        iterator = iter(source)
+        try:
+            while not self.stopped:
+                start = time.perf_counter()
+                item = next(iterator, _END)
+                if item is _END:
+                    break
+                self.fetch_metrics.record(time.perf_counter() - start)
+                if not self._put(out, item, self.fetch_metrics):
+                    break
+        except BaseException as e:
+            self._errors.append(e)
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close:
+                close()
+            # 下游总会读到结束标记为止, 阻塞写入即可
+            out.put(_END)
+
+    def _parse_worker(self, parse: Callable, inp: queue.Queue, out: queue.Queue) -> None:
+        finished = False
+        try:
+            while True:
+                item = inp.get()
+                if item is _END:
+                    finished = True
+                    break
+                if self.stopped or self._errors:
+                    # 停止后丢弃队列中剩余的页面
+                    continue
+                start = time.perf_counter()
+                rows = parse(*item)
+                self.parse_metrics.record(time.perf_counter() - start)
+                if rows and not self._put(out, rows, self.parse_metrics):
+                    break
+        except BaseException as e:
+            self._errors.append(e)
+            self.stop()
+        finally:
+            # 读到结束标记为止, 避免抓取线程阻塞在已满的队列上
+            while not finished:
+                finished = inp.get() is _END
+            out.put(_END)
+
+    def run(self, source: Iterable, parse: Callable[..., Optional[List[dict]]],
+            write: Callable[[List[dict]], None]) -> None:
+        '''
+        运行流水线, 全部数据写入后返回; 任一阶段抛出异常时停止并在调用线程重新抛出
+        :param source: 抓取阶段的迭代器, 每项为一页 (如 iter_pages 的 (页码, 数据, 异常))
+        :param parse: 解析阶段, 参数为 source 的一项 (解包), 返回待写入的行列表, 返回空表示跳过
+        :param write: 写库阶段, 参数为若干次解析结果拼接的行列表; 批次只在两次解析结果之间切分,
+                      同一页的行与检查点标记总在同一批, 行数达到 batch_size 即写入 (最多超出一页)
+        :return: None
+        '''
+        start = time.perf_counter()
+        pages = queue.Queue(maxsize=self.queue_size)
+        rows_queue = queue.Queue(maxsize=self.queue_size)
+        threads = [
+            threading.Thread(target=self._fetch_worker, args=(source, pages), name='pipeline-fetch', daemon=True),
+            threading.Thread(target=self._parse_worker, args=(parse, pages, rows_queue), name='pipeline-parse',
+                             daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        batch = []
+
+        def flush():
+            write_start = time.perf_counter()
+            write(batch)
+            self.write_metrics.record(time.perf_counter() - write_start, len(batch))
+            batch.clear()
+
+        finished = False
+        try:
+            while True:
+                rows = rows_queue.get()
+                if rows is _END:
+                    finished = True
+                    break
+                if self._errors:
+                    continue
+                # 一页的行不拆到两批: 否则前一批写入失败、后一批带着该页完成标记提交时, 该页会缺行却记为完成
+                batch.extend(rows)
+                if len(batch) >= self.batch_size:
+                    flush()
+            if batch and not self._errors:
+                flush()
+        except BaseException as e:
+            self._errors.append(e)
+            self.stop()
+        finally:
+            while not finished:
+                finished = rows_queue.get() is _END
+            for thread in threads:
+                thread.join()
+            self.elapsed = time.perf_counter() - start
+
+        logger.info(f'流水线完成, 耗时 {self.elapsed:.2f}s: {self.metrics()}')
+        if self._errors:
+            raise self._errors[0]
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        '''
+        :return: 各阶段统计
+        '''
+        return [m.as_dict(self.elapsed) for m in (self.fetch_metrics, self.parse_metrics, self.write_metrics)]
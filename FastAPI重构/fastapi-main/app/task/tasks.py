@@ -1,25 +1,85 @@
-import json
 import datetime
 import logging
 
-import requests
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.models.database import SessionLocal
 from app.models.models import MovType, MovInfo, MovDetail
+from app.search import get_search_index
+from app.search.index import FIELD_WEIGHTS
+from app.task.crawler import PageFetcher, iter_pages
+from app.task.pipeline import IngestPipeline
+from app.task.checkpoint import CrawlCheckpoint, RESUME, REFRESH
+from app.task.upsert import ChangeSet, upsert_movdetails
+from app.utils.response_cache_util import get_response_cache
+from app.utils.vod_util import normalize_mov_detail, parse_vod_time
 
 # 设置日志
 logger = logging.getLogger(__name__)
 
 
+def update_search_index(mov_list: list, changes: ChangeSet = None) -> None:
+    '''
+    将新增或更新的 movdetail 写入搜索索引, 索引失败不影响入库;
+    失败时清除索引的完整重建标记, 关键词搜索退回 LIKE, 避免漏掉未写入索引的记录
+    :param mov_list: list
+    :param changes: 入库变更集, 传入时只索引新增及检索字段有变化的记录
+    :return: None
+    '''
+    if changes is not None:
+        vod_ids = set(changes.changed_ids(FIELD_WEIGHTS))
+        mov_list = [mov for mov in mov_list if mov.get('vod_id') is not None and int(mov['vod_id']) in vod_ids]
+    if not mov_list:
+        return
+    index = get_search_index()
+    try:
+        index.index_documents(mov_list)
+    except Exception as e:
+        logger.error(f"更新搜索索引失败, 索引停用直到重新执行 python -m app.search: {e}")
+        try:
+            index.mark_stale()
+        except Exception as stale_error:
+            logger.error(f"清除搜索索引可用标记失败: {stale_error}")
+
+
+def bump_response_cache_version() -> None:
+    '''
+    数据更新后递增响应缓存版本号, 使 /vod_list、/vod_detail 的缓存失效
+    :return: None
+    '''
+    try:
+        get_response_cache().bump_version()
+    except Exception as e:
+        logger.error(f"更新响应缓存版本失败: {e}")
+
+
+def count_pages(data: dict) -> int:
+    '''
+    根据数据源返回的 total / limit 计算总页数
+    :param data: 第一页 JSON
+    :return: 总页数
+    '''
+    total = int(data['total'])
+    limit_per_page = int(data['limit'])
+    return (total // limit_per_page) + 1 if total % limit_per_page else total // limit_per_page
+
+
 class SakuarDataSchedule:
-    def __init__(self):
-        self.sakura_list = 'https://m3u8.apiyhzy.com/api.php/provide/vod/?ac=list&pg={page}'
-        self.sakura_detail = 'https://m3u8.apiyhzy.com/api.php/provide/vod/?ac=detail&pg={page}'
+    def __init__(self, api_url: str = None, concurrency: int = None, session_factory=SessionLocal):
+        '''
+        :param api_url: 数据源接口地址, 默认读取配置 SAKURA_API_URL
+        :param concurrency: 并发抓取页数, 默认读取配置 CRAWL_CONCURRENCY
+        :param session_factory: 数据库会话工厂
+        '''
+        self.fetcher = PageFetcher(api_url)
+        self.concurrency = concurrency
+        self.session_factory = session_factory
         self.total_page = None
         self.avalon_latest_time = None
         self.stop_craw = False  # 当此值为True 不继续抓取数据
+        self.pipeline = None
+        self.changes = ChangeSet()  # 本次更新的变更集
 
     @staticmethod
     def get_avalon_latest_time(session: Session) -> datetime.datetime:
@@ -36,115 +96,129 @@ class SakuarDataSchedule:
         avalon_latest_time = datetime.datetime.strptime(avalon_latest_time_str, '%Y-%m-%d')
         return avalon_latest_time
 
-    def insert_or_update_movdetail(self, session: Session, mov_list: list) -> None:
+    def select_new_movdetail(self, mov_list: list) -> list:
         '''
-        将 movdetail 数据 插入或更新到数据库
-        :param session: 数据库会话
+        筛选比数据库最新时间更新的 movdetail 并规范化, 同时更新停止条件 stop_craw
         :param mov_list: list
-        :return:
+        :return: 需要插入或更新的 movdetail 列表
         '''
-        need_insert_mov_list = []
+        need_upsert_mov_list = []
         for mov_detail in mov_list:
-            vod_time_str = mov_detail.get('vod_time')
-            if not vod_time_str:
-                continue
-            try:
-                vod_time = datetime.datetime.strptime(vod_time_str, '%Y-%m-%d %H:%M:%S')
-            except:
+            vod_time = parse_vod_time(mov_detail.get('vod_time'))
+            if vod_time is None:
                 continue
 
             if vod_time > self.avalon_latest_time:
                 # 进行更新或插入数据操作
                 self.stop_craw = False
-                vod_id = mov_detail['vod_id']
-                avalon_mov_detail = session.query(MovDetail).filter_by(vod_id=vod_id).first()
-                if avalon_mov_detail:
-                    # 数据库已有此数据 执行更新操作
-                    for k, v in mov_detail.items():
-                        if hasattr(avalon_mov_detail, k):
-                            setattr(avalon_mov_detail, k, v)
-                    session.commit()
-                else:
-                    # 数据库没有此数据 执行插入操作
-                    need_insert_mov_list.append(mov_detail)
+                need_upsert_mov_list.append(normalize_mov_detail(mov_detail))
             else:
                 self.stop_craw = True
+        return need_upsert_mov_list
 
-        if need_insert_mov_list:
-            # 如果有需要插入的新数据
-            session.bulk_insert_mappings(
-                MovDetail,
-                need_insert_mov_list
-            )
-            session.commit()
-            logger.info(f'插入 {len(need_insert_mov_list)} 条新记录')
+    def write_movdetail(self, session: Session, mov_list: list) -> None:
+        '''
+        批量增量写入 movdetail, 只为内容有变化的记录更新搜索索引
+        :param session: 数据库会话
+        :param mov_list: 已规范化的 movdetail 列表
+        :return: None
+        '''
+        if not mov_list:
+            return
+        # 一次查询已有数据的摘要, 一个事务内插入新记录、更新变化的列
+        changes = upsert_movdetails(session, mov_list)
+        logger.info(f'插入 {len(changes.inserted)} 条新记录, 更新 {len(changes.updated)} 条记录, '
+                    f'{len(changes.unchanged)} 条未变化')
+        self.changes.merge(changes)
+        update_search_index(mov_list, changes)
+
+    def insert_or_update_movdetail(self, session: Session, mov_list: list) -> None:
+        '''
+        将 movdetail 数据 插入或更新到数据库
+        :param session: 数据库会话
+        :param mov_list: list
+        :return:
+        '''
+        self.write_movdetail(session, self.select_new_movdetail(mov_list))
+
+    def parse_page(self, page: int, data: dict, error: Exception = None) -> list:
+        '''
+        流水线解析阶段: 按页码顺序判断停止条件
+        :param page: 页码
+        :param data: 页面 JSON
+        :param error: 抓取异常
+        :return: 需要写入的 movdetail 列表
+        '''
+        if self.stop_craw:
+            logger.info("数据已更新完毕: 停止抓取")
+            self.pipeline.stop()
+            return []
+        if error:
+            logger.error(f"抓取数据失败: {error}")
+            return []
+        logger.info(f'Updating: {self.fetcher.page_url("detail", page)}')
+        return self.select_new_movdetail(data['list'])
 
     def get_sakura_data(self) -> None:
         '''
         获取樱花数据 对已有数据进行更新操作 其他执行插入操作
+        抓取、解析、写库三个阶段以流水线方式并行, 见 app/task/pipeline.py
         :return: None
         '''
-        session = SessionLocal()
+        session = self.session_factory()
+        self.changes = ChangeSet()
         try:
             self.avalon_latest_time = self.get_avalon_latest_time(session)  # 数据库vod_time最大值
 
-            url = self.sakura_detail.format(page=1)
-            logger.info(f'Updating: {url}')
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = json.loads(response.text)
-                total = int(data['total'])
-                limit_per_page = int(data['limit'])
-                self.total_page = (total // limit_per_page) + 1 if total % limit_per_page else total // limit_per_page
-                mov_detail_list = data['list']
-                self.insert_or_update_movdetail(session, mov_detail_list)
-            else:
-                logger.debug(f"抓取数据失败, code: {response.status_code}")
-
-            for i in range(2, self.total_page + 1):
-                url = self.sakura_detail.format(page=i)
-                if self.stop_craw:
-                    logger.info("数据已更新完毕: 停止抓取")
-                    break
-                logger.info(f'Updating: {url}')
-                response = requests.get(url)
-                if response.status_code == 200:
-                    data = json.loads(response.text)
-                    mov_detail_list = data['list']
-                    self.insert_or_update_movdetail(session, mov_detail_list)
-                else:
-                    logger.debug(f"抓取数据失败, code: {response.status_code}")
+            # 第一页取得总页数, 后续页面并发抓取
+            first_page = self.fetcher.fetch('detail', 1)
+            self.total_page = count_pages(first_page)
+
+            def pages():
+                yield 1, first_page, None
+                yield from iter_pages(lambda page: self.fetcher.fetch('detail', page),
+                                      range(2, self.total_page + 1), self.concurrency)
+
+            self.pipeline = IngestPipeline()
+            self.pipeline.run(pages(), self.parse_page, lambda rows: self.write_movdetail(session, rows))
         except Exception as e:
             logger.error(f"更新数据时出错: {e}")
             session.rollback()
         finally:
             session.close()
+            # 没有任何记录变化时保留响应缓存
+            if self.changes.changed:
+                bump_response_cache_version()
 
 
 class SakuraData:
-    def __init__(self):
+    def __init__(self, api_url: str = None, concurrency: int = None, session_factory=SessionLocal):
+        '''
+        :param api_url: 数据源接口地址, 默认读取配置 SAKURA_API_URL
+        :param concurrency: 并发抓取页数, 默认读取配置 CRAWL_CONCURRENCY
+        :param session_factory: 数据库会话工厂
+        '''
         self.total_page = None
         self.mov_type = None
-        self.sakura_list = 'https://m3u8.apiyhzy.com/api.php/provide/vod/?ac=list&pg={page}'
-        self.sakura_detail = 'https://m3u8.apiyhzy.com/api.php/provide/vod/?ac=detail&pg={page}'
+        self.fetcher = PageFetcher(api_url)
+        self.concurrency = concurrency
+        self.session_factory = session_factory
+        self.crawl_summary = None  # 最近一次全量抓取的检查点统计
+        self.changes = ChangeSet()  # 最近一次抓取的 movdetail 变更集
         self.__init_sakura__()
 
     def __init_sakura__(self):
-        url = self.sakura_list.format(page=1)
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = json.loads(response.text)
-            if self.mov_type is None:
-                self.mov_type = data['class']
-            if self.total_page is None:
-                total = int(data['total'])
-                limit_per_page = int(data['limit'])
-                self.total_page = (total // limit_per_page) + 1 if total % limit_per_page else total // limit_per_page
-        else:
-            raise Exception(f"初始化失败: 无法获取数据")
+        try:
+            data = self.fetcher.fetch('list', 1)
+        except Exception as e:
+            raise Exception(f"初始化失败: 无法获取数据 ({e})")
+        if self.mov_type is None:
+            self.mov_type = data['class']
+        if self.total_page is None:
+            self.total_page = count_pages(data)
 
     def insert_mov_type(self):
-        session = SessionLocal()
+        session = self.session_factory()
         try:
             session.bulk_insert_mappings(
                 MovType,
@@ -158,63 +232,156 @@ class SakuraData:
         finally:
             session.close()
 
-    def get_mov_info(self, page=1):
-        # 读取url数据并保存到数据库
-        session = SessionLocal()
+    @staticmethod
+    def parse_mov_info(page: int, data: dict, error: Exception = None) -> list:
+        '''
+        流水线解析阶段: mov info
+        :param page: 页码
+        :param data: 页面 JSON
+        :param error: 抓取异常
+        :return: mov info 列表
+        '''
+        if error:
+            logger.error(f"抓取数据失败: {error}")
+            return []
+        mov_info_list = data['list']
+        for mov_info in mov_info_list:
+            mov_info['vod_time'] = parse_vod_time(mov_info.get('vod_time'))
+        logger.info(f'mov_list page {page} catched')
+        return mov_info_list
+
+    @staticmethod
+    def parse_mov_detail(page: int, data: dict, error: Exception = None) -> list:
+        '''
+        流水线解析阶段: mov detail
+        :param page: 页码
+        :param data: 页面 JSON
+        :param error: 抓取异常
+        :return: 规范化后的 mov detail 列表
+        '''
+        if error:
+            logger.error(f"抓取数据失败: {error}")
+            return []
+        logger.info(f'mov_detail page {page} catched')
+        return [normalize_mov_detail(mov_detail) for mov_detail in data['list']]
+
+    @staticmethod
+    def write_mov_info(session: Session, mov_info_list: list) -> None:
+        '''
+        写入一批 mov info, 先删除相同 vod_id 的旧记录, 重复抓取同一页不会产生重复数据
+        :param session: 数据库会话
+        :param mov_info_list: mov info 列表
+        :return: None
+        '''
+        vod_ids = [mov_info['vod_id'] for mov_info in mov_info_list if mov_info.get('vod_id') is not None]
+        if vod_ids:
+            session.query(MovInfo).filter(MovInfo.vod_id.in_(vod_ids)).delete(synchronize_session=False)
+        session.bulk_insert_mappings(
+            MovInfo,
+            mov_info_list
+        )
+        session.commit()
+
+    def write_mov_detail(self, session: Session, mov_detail_list: list) -> ChangeSet:
+        '''
+        增量写入一批 mov detail, 只为内容有变化的记录更新搜索索引
+        :param session: 数据库会话
+        :param mov_detail_list: 规范化后的 mov detail 列表
+        :return: 本批变更集
+        '''
+        changes = upsert_movdetails(session, mov_detail_list)
+        self.changes.merge(changes)
+        update_search_index(mov_detail_list, changes)
+        return changes
+
+    def save_mov_info(self, page: int, data: dict) -> None:
+        '''
+        保存一页 mov info
+        :param page: 页码
+        :param data: 页面 JSON
+        :return: None
+        '''
+        session = self.session_factory()
         try:
-            url = self.sakura_list.format(page=page)
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = json.loads(response.text)
-                mov_info_list = data['list']
-                session.bulk_insert_mappings(
-                    MovInfo,
-                    mov_info_list
-                )
-                session.commit()
-                logger.info(f'mov_list page {page} catched')
-            else:
-                logger.debug(f"抓取数据失败, code: {response.status_code}")
+            self.write_mov_info(session, self.parse_mov_info(page, data))
         except Exception as e:
             logger.error(f"插入mov_info失败: {e}")
             session.rollback()
         finally:
             session.close()
 
-    def get_mov_detail(self, page=1):
+    def save_mov_detail(self, page: int, data: dict) -> None:
         '''
-        抓取 mov detail
+        保存一页 mov detail
         :param page: 页码
-        :return:
+        :param data: 页面 JSON
+        :return: None
         '''
-        session = SessionLocal()
+        session = self.session_factory()
         try:
-            url = self.sakura_detail.format(page=page)
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = json.loads(response.text)
-                mov_detail_list = data['list']
-                session.bulk_insert_mappings(
-                    MovDetail,
-                    mov_detail_list
-                )
-                session.commit()
-                logger.info(f'mov_detail page {page} catched')
-            else:
-                logger.debug(f"抓取数据失败, code: {response.status_code}")
+            if self.write_mov_detail(session, self.parse_mov_detail(page, data)).changed:
+                bump_response_cache_version()
         except Exception as e:
             logger.error(f"插入mov_detail失败: {e}")
             session.rollback()
         finally:
             session.close()
 
-    def crawl_mov_info_all(self):
-        for page in range(1, self.total_page + 1):
-            self.get_mov_info(page)
+    def get_mov_info(self, page=1):
+        # 读取url数据并保存到数据库
+        try:
+            data = self.fetcher.fetch('list', page)
+        except Exception as e:
+            logger.error(f"抓取数据失败: {e}")
+            return
+        self.save_mov_info(page, data)
 
-    def crawl_mov_detail_all(self):
-        for page in range(1, self.total_page + 1):
-            self.get_mov_detail(page)
+    def get_mov_detail(self, page=1):
+        '''
+        抓取 mov detail
+        :param page: 页码
+        :return:
+        '''
+        try:
+            data = self.fetcher.fetch('detail', page)
+        except Exception as e:
+            logger.error(f"抓取数据失败: {e}")
+            return
+        self.save_mov_detail(page, data)
 
+    def crawl(self, ac: str, parse, write, mode: str = RESUME) -> IngestPipeline:
+        '''
+        以流水线方式抓取全部页面: 并发抓取 -> 解析 -> 批量写库
+        每页的完成/失败状态记录在检查点表 (app/task/checkpoint.py), 与该页数据在同一个事务内提交
+        :param ac: 接口类型 list / detail
+        :param parse: 解析阶段, 参数为 (页码, 页面 JSON, 异常)
+        :param write: 写库阶段, 参数为 (session, 行列表), 出错时抛出异常
+        :param mode: resume 跳过已完成的页面; failed 只重试失败的页面; refresh 重新抓取全部页面并跳过内容未变化的页面
+        :return: 流水线 (含各阶段统计)
+        '''
+        session = self.session_factory()
+        pipeline = IngestPipeline()
+        self.changes = ChangeSet()
+        try:
+            checkpoint = CrawlCheckpoint(session, ac)
+            pages = checkpoint.pages(self.total_page, mode)
+            logger.info(f'抓取 {ac}: 模式 {mode}, 共 {self.total_page} 页, 本次 {len(pages)} 页')
+            etags = checkpoint.etags if mode == REFRESH else {}
+            source = iter_pages(lambda page: self.fetcher.fetch_page(ac, page, etags.get(page)),
+                                pages, self.concurrency)
+            pipeline.run(source, checkpoint.wrap_parse(parse, skip_unchanged=mode == REFRESH),
+                         checkpoint.wrap_write(write))
+            self.crawl_summary = checkpoint.summary()
+            logger.info(f'抓取 {ac} 完成: {self.crawl_summary}')
+        finally:
+            session.close()
+            # 本次抓取写入了变化的记录时使响应缓存失效
+            if self.changes.changed:
+                bump_response_cache_version()
+        return pipeline
 
+    def crawl_mov_info_all(self, mode: str = RESUME):
+        return self.crawl('list', self.parse_mov_info, self.write_mov_info, mode)
 
+    def crawl_mov_detail_all(self, mode: str = RESUME):
+        return self.crawl('detail', self.parse_mov_detail, self.write_mov_detail, mode)
@@ -0,0 +1,232 @@
+import json
+import hashlib
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.models import MovDetail
+
+logger = logging.getLogger(__name__)
+
+# SQLite 单条语句的绑定参数上限 (旧版本为 999)
+SQLITE_MAX_VARIABLES = 999
+
+movdetail_table = MovDetail.__table__
+movdetail_columns = frozenset(movdetail_table.columns.keys())
+
+# 不参与内容摘要的列: 主键、摘要本身, 以及数据源每次更新都会变化的 vod_time
+DIGEST_EXCLUDE = frozenset({'id', 'content_hash', 'vod_time'})
+
+
+class ExistingMovDetail(NamedTuple):
+    id: int
+    content_hash: Optional[str]
+    vod_time: object
+
+
+class ChangeSet:
+    '''
+    一批 movdetail 入库的变更集, 按 vod_id 记录, 供搜索索引、响应缓存等下游按需更新
+    '''
+
+    def __init__(self):
+        self.inserted: List[int] = []
+        self.updated: Dict[int, List[str]] = {}  # vod_id -> 实际写入的列
+        self.unchanged: List[int] = []
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated)
+
+    def changed_ids(self, columns: Iterable[str] = None) -> List[int]:
+        '''
+        :param columns: 只返回这些列发生变化的更新记录, 为空时返回全部更新记录
+        :return: 新增及更新的 vod_id 列表
+        '''
+        if columns is None:
+            return self.inserted + list(self.updated)
+        columns = set(columns)
+        return self.inserted + [vod_id for vod_id, changed in self.updated.items() if columns.intersection(changed)]
+
+    def merge(self, other: 'ChangeSet') -> 'ChangeSet':
+        self.inserted.extend(other.inserted)
+        self.updated.update(other.updated)
+        self.unchanged.extend(other.unchanged)
+        return self
+
+    def counts(self) -> Dict[str, int]:
+        return {'inserted': len(self.inserted), 'updated': len(self.updated), 'unchanged': len(self.unchanged)}
+
+    def __repr__(self) -> str:
+        return f'ChangeSet({self.counts()})'
+
+
+def content_digest(row: dict) -> str:
+    '''
+    记录内容的 sha256, 不含 DIGEST_EXCLUDE 中的列
+    :param row: 只含表中列的 movdetail 字典
+    :return: 十六进制摘要
+    '''
+    content = {k: v for k, v in row.items() if k not in DIGEST_EXCLUDE}
+    raw = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _same(old, new) -> bool:
+    # 数据源的数字字段可能是字符串, 按字符串比较
+    if old == new:
+        return True
+    if old is None or new is None:
+        return False
+    return str(old) == str(new)
+
+
+def existing_movdetails(session: Session, vod_ids: List[int]) -> Dict[int, ExistingMovDetail]:
+    '''
+    一次 IN 查询取得已入库视频的主键、内容摘要与更新时间, 不读取大字段
+    表内 vod_id 没有唯一约束, 历史数据可能重复, 取最早的一行
+    :param session: 数据库会话
+    :param vod_ids: 数据源ID列表
+    :return: {vod_id: ExistingMovDetail}
+    '''
+    if not vod_ids:
+        return {}
+    rows = (session.query(MovDetail.vod_id, MovDetail.id, MovDetail.content_hash, MovDetail.vod_time)
+            .filter(MovDetail.vod_id.in_(vod_ids))
+            .order_by(MovDetail.id.desc())
+            .all())
+    # 按 id 倒序, 重复的 vod_id 最终保留 id 最小的一行
+    return {vod_id: ExistingMovDetail(movdetail_id, content_hash, vod_time)
+            for vod_id, movdetail_id, content_hash, vod_time in rows}
+
+
+def _load_columns(session: Session, ids: List[int], columns: List[str]) -> Dict[int, dict]:
+    '''
+    读取内容已变化记录的旧值, 用于逐列比较
+    :param session: 数据库会话
+    :param ids: 主键列表
+    :param columns: 需要比较的列
+    :return: {id: {列: 旧值}}
+    '''
+    if not ids:
+        return {}
+    query = session.query(MovDetail.id, *[getattr(MovDetail, c) for c in columns]).filter(MovDetail.id.in_(ids))
+    return {row[0]: dict(zip(columns, row[1:])) for row in query}
+
+
+def _upsert_statement(dialect: str, rows: List[dict], update_columns: List[str]):
+    '''
+    构造按主键 id 冲突时更新的多行 INSERT
+    :param dialect: 数据库方言名
+    :param rows: 列相同的行
+    :param update_columns: 冲突时更新的列
+    :return: INSERT 语句, 不支持的方言返回 None
+    '''
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(movdetail_table).values(rows)
+        return stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in update_columns})
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(movdetail_table).values(rows)
+        return stmt.on_conflict_do_update(index_elements=['id'], set_={c: stmt.excluded[c] for c in update_columns})
+    return None
+
+
+def _write_rows(session: Session, rows: List[dict]) -> None:
+    '''
+    用方言原生的 INSERT ... ON DUPLICATE KEY UPDATE (MySQL) / ON CONFLICT DO UPDATE (SQLite) 写入,
+    已入库的行带主键 id 且只含变化的列, 冲突时只更新这些列; 新行 id 为空, 直接插入。
+    其他方言退回 bulk_update_mappings + bulk_insert_mappings
+    :param session: 数据库会话
+    :param rows: 待写入的行, 都包含 id 与 vod_id
+    '''
+    # 多行 INSERT 要求每行的列相同, 按列集合分组
+    groups: Dict[Tuple[str, ...], List[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    dialect = session.get_bind().dialect.name
+    for keys, group in groups.items():
+        update_columns = [c for c in keys if c not in ('id', 'vod_id')]
+        batch_size = len(group)
+        if dialect == 'sqlite':
+            batch_size = max(1, SQLITE_MAX_VARIABLES // len(keys))
+        for start in range(0, len(group), batch_size):
+            batch = group[start:start + batch_size]
+            stmt = _upsert_statement(dialect, batch, update_columns)
+            if stmt is not None:
+                session.execute(stmt)
+            else:
+                session.bulk_update_mappings(MovDetail, [row for row in batch if row['id'] is not None])
+                session.bulk_insert_mappings(MovDetail, [{k: v for k, v in row.items() if k != 'id'}
+                                                         for row in batch if row['id'] is None])
+
+
+def upsert_movdetails(session: Session, mov_list: List[dict]) -> ChangeSet:
+    '''
+    批量增量写入 movdetail, 整批在一个事务内提交
+    先用一次 IN 查询取得已入库记录的内容摘要: 摘要相同的记录只在 vod_time 变化时更新 vod_time;
+    摘要不同 (或旧记录没有摘要) 的记录读取旧值逐列比较, 只更新变化的列;
+    vod_id 未入库的记录插入。过滤后剩下的行用方言原生的 upsert 写入 (见 _write_rows)
+    :param session: 数据库会话
+    :param mov_list: 已规范化的 movdetail 字典列表 (见 app/utils/vod_util.normalize_mov_detail)
+    :return: 变更集
+    '''
+    changes = ChangeSet()
+    # 同一批内重复的 vod_id 只保留最后一条, 只保留表中的列
+    latest: Dict[int, dict] = {}
+    for mov_detail in mov_list:
+        if mov_detail.get('vod_id') is not None:
+            vod_id = int(mov_detail['vod_id'])
+            row = {k: v for k, v in mov_detail.items() if k in movdetail_columns and k not in ('id', 'content_hash')}
+            row['vod_id'] = vod_id
+            row['content_hash'] = content_digest(row)
+            latest[vod_id] = row
+    if not latest:
+        return changes
+
+    existing = existing_movdetails(session, list(latest))
+
+    writes: List[dict] = []
+    changed: List[Tuple[int, dict]] = []
+    for vod_id, row in latest.items():
+        current = existing.get(vod_id)
+        if current is None:
+            writes.append(dict(row, id=None))
+            changes.inserted.append(vod_id)
+        elif current.content_hash == row['content_hash']:
+            if 'vod_time' in row and not _same(current.vod_time, row['vod_time']):
+                writes.append({'id': current.id, 'vod_id': vod_id, 'vod_time': row['vod_time']})
+                changes.updated[vod_id] = ['vod_time']
+            else:
+                changes.unchanged.append(vod_id)
+        else:
+            changed.append((vod_id, row))
+
+    if changed:
+        columns = sorted({c for _, row in changed for c in row if c not in ('vod_id', 'content_hash')})
+        old_rows = _load_columns(session, [existing[vod_id].id for vod_id, _ in changed], columns)
+        for vod_id, row in changed:
+            movdetail_id = existing[vod_id].id
+            old = old_rows.get(movdetail_id, {})
+            diff = [c for c in row if c not in ('vod_id', 'content_hash') and not _same(old.get(c), row[c])]
+            update = {'id': movdetail_id, 'vod_id': vod_id, 'content_hash': row['content_hash']}
+            update.update((c, row[c]) for c in diff)
+            writes.append(update)
+            if diff:
+                changes.updated[vod_id] = diff
+            else:
+                # 旧记录没有摘要或摘要算法变化, 内容相同, 只补写摘要
+                changes.unchanged.append(vod_id)
+
+    try:
+        if writes:
+            _write_rows(session, writes)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    return changes
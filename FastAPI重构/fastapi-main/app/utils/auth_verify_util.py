@@ -1,12 +1,128 @@
 """
 JWT 认证工具（适配 FastAPI）
 基于 authlib 的 JWT 实现
+
+token 的过期时间使用标准的数字 exp 声明（Unix 时间戳）；旧 token 只有 dead_time（"%Y-%m-%d"），
+仍按 dead_time 当天 0 点过期处理。验证通过的 token 以摘要为键缓存到过期为止，
+同一会话的后续请求不再解码和校验签名
 """
 import datetime
-from typing import Optional
+import hashlib
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional
 
 from authlib.jose import jwt, JoseError
-from app.core.config import get_config_value
+from app.core.config import get_config_value, add_reload_hook
+from app.utils.cache_util import LRUCache
+
+
+class TokenClaims(NamedTuple):
+    """验证通过的 token 声明"""
+    user_id: Optional[int]
+    name: Optional[str]
+    exp: float  # 过期时间（Unix 时间戳）
+    payload: Dict[str, Any]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """返回 payload 的副本（与旧版 parse_user_from_token 的返回值相同）"""
+        return dict(self.payload)
+
+
+def claims_expiry(payload: Dict[str, Any]) -> Optional[float]:
+    """
+    读取 token 的过期时间，优先使用 exp，兼容只有 dead_time 的旧 token
+
+    Args:
+        payload: JWT 负载
+
+    Returns:
+        过期时间（Unix 时间戳），无法解析时返回 None
+    """
+    exp = payload.get('exp')
+    if exp is not None:
+        try:
+            return float(exp)
+        except (TypeError, ValueError):
+            return None
+    dead_time = payload.get('dead_time')
+    if dead_time:
+        try:
+            return datetime.datetime.strptime(dead_time, "%Y-%m-%d").timestamp()
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+class TokenVerifier:
+    """
+    JWT 验证器：每个 token 只解码、校验签名一次，验证结果缓存到 token 过期
+
+    缓存键为 token 的 sha256 摘要，进程内 LRU 淘汰；配置重新加载（如更换 SECRET_KEY）时清空
+    """
+
+    def __init__(self, cache_size: int = None, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            cache_size: 缓存的 token 数，默认读取配置 TOKEN_CACHE_SIZE
+            clock: 当前时间（Unix 时间戳）
+        """
+        self.clock = clock
+        self._cache = LRUCache(max_size=cache_size or get_config_value('TOKEN_CACHE_SIZE', 10000))
+
+    @staticmethod
+    def decode(token: str) -> Optional[TokenClaims]:
+        """
+        解码并校验签名，不检查是否过期
+
+        Args:
+            token: JWT token
+
+        Returns:
+            TokenClaims，签名无效或格式错误时返回 None
+        """
+        key = get_config_value('SECRET_KEY', 'secret-key')
+        try:
+            payload = dict(jwt.decode(token, key))
+        except (JoseError, ValueError):
+            return None
+        exp = claims_expiry(payload)
+        if exp is None:
+            return None
+        return TokenClaims(payload.get('id'), payload.get('name'), exp, payload)
+
+    def verify(self, token: str) -> Optional[TokenClaims]:
+        """
+        验证 token，命中缓存时不解码
+
+        Args:
+            token: JWT token
+
+        Returns:
+            TokenClaims，无效或已过期时返回 None
+        """
+        digest = hashlib.sha256(token.encode('utf-8')).digest()
+        now = self.clock()
+        claims = self._cache.get(digest)
+        if claims is not None:
+            if claims.exp > now:
+                return claims
+            self._cache.delete(digest)
+
+        claims = self.decode(token)
+        if claims is None or claims.exp <= now:
+            return None
+        self._cache.set(digest, claims, ttl=claims.exp - now)
+        return claims
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats()
+
+
+token_verifier = TokenVerifier()
+add_reload_hook(lambda settings: token_verifier.clear())
 
 
 def generate_auth_token(user_id: int, name: str, effective_time: int = 30, **kwargs) -> str:
@@ -26,17 +142,32 @@ def generate_auth_token(user_id: int, name: str, effective_time: int = 30, **kwa
     header = {'alg': 'HS256'}
     # 用于签名的密钥
     key = get_config_value('SECRET_KEY', 'secret-key')
-    # 待签名的数据负载
+    expires_at = datetime.datetime.now() + datetime.timedelta(days=effective_time)
+    # 待签名的数据负载; dead_time 供尚未升级的旧版本服务读取
     data = {
         'id': user_id,
         'name': name,
-        'dead_time': (datetime.datetime.now() + datetime.timedelta(days=effective_time)).strftime("%Y-%m-%d")
+        'exp': int(expires_at.timestamp()),
+        'dead_time': expires_at.strftime("%Y-%m-%d")
     }
     data.update(**kwargs)
     token = jwt.encode(header=header, payload=data, key=key)
     return token.decode()
 
 
+def verify_token(token: str) -> Optional[TokenClaims]:
+    """
+    验证 token 并返回声明（一次解码，结果缓存）
+
+    Args:
+        token: JWT token
+
+    Returns:
+        TokenClaims，无效或已过期时返回 None
+    """
+    return token_verifier.verify(token)
+
+
 def parse_user_from_token(token: str) -> dict:
     """
     从token中解析用户信息
@@ -46,10 +177,14 @@ def parse_user_from_token(token: str) -> dict:
 
     Returns:
         用户数据字典
+
+    Raises:
+        JoseError: 签名无效或格式错误
     """
-    key = get_config_value('SECRET_KEY', 'secret-key')
-    data = dict(jwt.decode(token, key))
-    return data
+    claims = token_verifier.verify(token) or token_verifier.decode(token)
+    if claims is None:
+        raise JoseError('invalid_token')
+    return claims.as_dict()
 
 
 def validate_token(token: str) -> bool:
@@ -62,12 +197,4 @@ def validate_token(token: str) -> bool:
     Returns:
         是否有效
     """
-    key = get_config_value('SECRET_KEY', 'secret-key')
-    try:
-        data = jwt.decode(token, key)
-        dead_time = data['dead_time']
-        if datetime.datetime.strptime(dead_time, "%Y-%m-%d") > datetime.datetime.now():
-            return True
-        return False
-    except JoseError:
-        return False
+    return token_verifier.verify(token) is not None
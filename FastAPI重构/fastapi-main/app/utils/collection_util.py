@@ -0,0 +1,179 @@
+"""
+用户收藏工具模块
+基于 sakura_user_collection_item 的 (user_id, movdetail_id) 唯一索引，增删均为单行索引操作；
+是否收藏的判断读取进程内缓存的用户收藏集合。缓存只在本 worker 内有效，过期时间（COLLECTION_CACHE_TTL）
+保持在几秒，其他 worker 的增删最多延迟这么久可见；本 worker 增删后用主库的结果更新缓存，
+不会在过期前从只读副本读到写入前的数据
+"""
+from typing import Dict, FrozenSet, Iterable, List
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import get_config_value
+from app.models.models import UserCollectionItem
+from app.utils.cache_util import LRUCache
+
+# user_id -> 收藏的视频ID集合
+collection_cache = LRUCache(
+    max_size=get_config_value('COLLECTION_CACHE_SIZE', 10000),
+    ttl=get_config_value('COLLECTION_CACHE_TTL', 5)
+)
+
+
+def collected_ids(db: Session, user_id: int) -> List[int]:
+    """
+    从数据库获取用户收藏的全部视频ID
+
+    Args:
+        db: 数据库会话
+        user_id: 用户ID
+
+    Returns:
+        视频ID列表
+    """
+    rows = (db.query(UserCollectionItem.movdetail_id)
+            .filter(UserCollectionItem.user_id == user_id)
+            .order_by(UserCollectionItem.id)
+            .all())
+    return [row.movdetail_id for row in rows]
+
+
+def get_collected_set(db: Session, user_id: int) -> FrozenSet[int]:
+    """
+    获取用户收藏的视频ID集合，优先读取缓存
+
+    Args:
+        db: 数据库会话
+        user_id: 用户ID
+
+    Returns:
+        视频ID集合
+    """
+    return collection_cache.get_or_set(user_id, lambda: frozenset(collected_ids(db, user_id)))
+
+
+def is_collected(db: Session, user_id: int, movdetail_id: int) -> bool:
+    """
+    判断视频是否已被用户收藏
+
+    Args:
+        db: 数据库会话
+        user_id: 用户ID
+        movdetail_id: 视频ID
+
+    Returns:
+        是否已收藏
+    """
+    return movdetail_id in get_collected_set(db, user_id)
+
+
+def are_collected(db: Session, user_id: int, movdetail_ids: Iterable[int]) -> Dict[int, bool]:
+    """
+    批量判断视频是否已被用户收藏
+
+    Args:
+        db: 数据库会话
+        user_id: 用户ID
+        movdetail_ids: 视频ID序列
+
+    Returns:
+        {视频ID: 是否已收藏}
+    """
+    collected = get_collected_set(db, user_id)
+    return {movdetail_id: movdetail_id in collected for movdetail_id in movdetail_ids}
+
+
+def has_collection(db: Session, user_id: int, movdetail_id: int) -> bool:
+    """
+    从数据库判断收藏记录是否存在（不读缓存）
+
+    Args:
+        db: 数据库会话
+        user_id: 用户ID
+        movdetail_id: 视频ID
+
+    Returns:
+        是否存在
+    """
+    return db.query(
+        db.query(UserCollectionItem)
+        .filter(UserCollectionItem.user_id == user_id, UserCollectionItem.movdetail_id == movdetail_id)
+        .exists()
+    ).scalar()
+
+
+def update_cached_set(db: Session, user_id: int, movdetail_id: int, collected: bool) -> None:
+    """
+    写入后更新本进程缓存的收藏集合：已缓存时只加入/移除这一个视频，未缓存时从主库读取
+
+    Args:
+        db: 写入使用的主库会话
+        user_id: 用户ID
+        movdetail_id: 视频ID
+        collected: 写入后是否处于收藏状态
+    """
+    cached = collection_cache.get(user_id)
+    if cached is None:
+        collection_cache.set(user_id, frozenset(collected_ids(db, user_id)))
+    elif collected:
+        collection_cache.set(user_id, cached | {movdetail_id})
+    else:
+        collection_cache.set(user_id, cached - {movdetail_id})
+
+
+def add_collection(db: Session, user_id: int, movdetail_id: int) -> bool:
+    """
+    添加收藏，已收藏时不做任何修改
+
+    Args:
+        db: 数据库会话
+        user_id: 用户ID
+        movdetail_id: 视频ID
+
+    Returns:
+        是否新增了收藏
+
+    Raises:
+        IntegrityError: 唯一索引以外的约束失败（如用户或视频不存在时的外键约束）
+    """
+    db.add(UserCollectionItem(user_id=user_id, movdetail_id=movdetail_id))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        # 只有 (user_id, movdetail_id) 已存在才是已收藏，其余约束失败原样抛出
+        if has_collection(db, user_id, movdetail_id):
+            update_cached_set(db, user_id, movdetail_id, True)
+            return False
+        collection_cache.delete(user_id)
+        raise
+    except Exception:
+        collection_cache.delete(user_id)
+        raise
+    update_cached_set(db, user_id, movdetail_id, True)
+    return True
+
+
+def remove_collection(db: Session, user_id: int, movdetail_id: int) -> bool:
+    """
+    移除收藏
+
+    Args:
+        db: 数据库会话
+        user_id: 用户ID
+        movdetail_id: 视频ID
+
+    Returns:
+        是否删除了收藏
+    """
+    try:
+        deleted = (db.query(UserCollectionItem)
+                   .filter(UserCollectionItem.user_id == user_id, UserCollectionItem.movdetail_id == movdetail_id)
+                   .delete(synchronize_session=False))
+        db.commit()
+    except Exception:
+        collection_cache.delete(user_id)
+        raise
+    update_cached_set(db, user_id, movdetail_id, False)
+    return bool(deleted)
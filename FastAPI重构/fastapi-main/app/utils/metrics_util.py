@@ -0,0 +1,196 @@
+"""
+请求性能指标工具模块
+ASGI 中间件按路由记录延迟、SQL 语句数、数据库耗时、行数与响应字节数，以 Prometheus 文本格式导出；
+超过 SLOW_REQUEST_MS 的请求连同其执行的 SQL 写入日志
+
+多 worker 部署（gunicorn / uvicorn --workers）时在启动前设置环境变量 PROMETHEUS_MULTIPROC_DIR
+（每次启动前清空该目录），各进程把指标写入其中，/metrics 汇总所有 worker；
+gunicorn 需在 child_exit 钩子中调用 mark_worker_dead(worker.pid)
+"""
+import contextvars
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from sqlalchemy import event
+
+from app.core.config import get_config_value
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SQL_LOG_LENGTH = 500
+
+REQUEST_LATENCY = Histogram('sakura_http_request_duration_seconds', '请求耗时（秒）',
+                            ['method', 'route', 'status'], buckets=LATENCY_BUCKETS)
+REQUEST_STATEMENTS = Histogram('sakura_http_request_db_statements', '每个请求执行的 SQL 语句数',
+                               ['method', 'route'], buckets=STATEMENT_BUCKETS)
+REQUEST_DB_TIME = Histogram('sakura_http_request_db_seconds', '每个请求的数据库耗时（秒）',
+                            ['method', 'route'], buckets=LATENCY_BUCKETS)
+REQUEST_DB_ROWS = Counter('sakura_http_request_db_rows', '数据库返回或影响的行数（以驱动报告的 rowcount 为准）',
+                          ['method', 'route'])
+RESPONSE_BYTES = Counter('sakura_http_response_bytes', '响应体字节数', ['method', 'route'])
+
+
+class RequestStats:
+    """单个请求的数据库统计，由 SQLAlchemy 事件钩子累加"""
+
+    __slots__ = ('statements', 'db_time', 'rows', 'sql')
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.sql: List[Tuple[float, str]] = []
+
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar('request_stats', default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """
+    当前请求的统计（不在请求中时返回 None）
+
+    Returns:
+        RequestStats
+    """
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    starts = conn.info.get('query_start')
+    elapsed = time.perf_counter() - starts.pop() if starts else 0.0
+    stats.statements += 1
+    stats.db_time += elapsed
+    rowcount = getattr(cursor, 'rowcount', -1)
+    if rowcount and rowcount > 0:
+        stats.rows += rowcount
+    if len(stats.sql) < get_config_value('SLOW_REQUEST_MAX_STATEMENTS', 20):
+        stats.sql.append((elapsed, statement))
+
+
+def instrument_engine(engine) -> None:
+    """
+    为引擎注册 SQL 统计钩子，只统计 MetricsMiddleware 处理中的请求所执行的语句
+
+    Args:
+        engine: Engine 或 AsyncEngine
+    """
+    engine = getattr(engine, 'sync_engine', engine)
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """
+    ASGI 中间件：记录每个请求的路由级指标，慢请求写日志
+
+    路由标签使用路由模板（如 /api/v1/comments/{vod_id}），未匹配的请求记为 unmatched，避免标签数膨胀
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Optional[Dict[Any, str]] = None
+
+    def route_label(self, scope) -> str:
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return 'unmatched'
+        if self._route_paths is None:
+            self._route_paths = {getattr(route, 'endpoint', None): route.path
+                                 for route in scope['app'].router.routes}
+        return self._route_paths.get(endpoint, 'unmatched')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+        body_bytes = 0
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status, body_bytes
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body':
+                body_bytes += len(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            method = scope['method']
+            route = self.route_label(scope)
+            REQUEST_LATENCY.labels(method, route, str(status)).observe(elapsed)
+            REQUEST_STATEMENTS.labels(method, route).observe(stats.statements)
+            REQUEST_DB_TIME.labels(method, route).observe(stats.db_time)
+            REQUEST_DB_ROWS.labels(method, route).inc(stats.rows)
+            RESPONSE_BYTES.labels(method, route).inc(body_bytes)
+            if elapsed * 1000 >= get_config_value('SLOW_REQUEST_MS', 500):
+                log_slow_request(scope, status, elapsed, stats)
+
+
+def log_slow_request(scope, status: int, elapsed: float, stats: RequestStats) -> None:
+    """
+    记录慢请求及其执行的 SQL（按耗时降序，语句截断到 SQL_LOG_LENGTH 个字符）
+
+    Args:
+        scope: ASGI scope
+        status: 响应状态码
+        elapsed: 请求耗时（秒）
+        stats: 请求的数据库统计
+    """
+    path = scope['path'] + ('?' + scope['query_string'].decode('latin-1') if scope.get('query_string') else '')
+    lines = [f'slow request {scope["method"]} {path} {status} {elapsed * 1000:.1f}ms '
+             f'sql={stats.statements} db={stats.db_time * 1000:.1f}ms rows={stats.rows}']
+    for duration, statement in sorted(stats.sql, key=lambda item: item[0], reverse=True):
+        lines.append(f'  {duration * 1000:8.2f}ms  {" ".join(statement.split())[:SQL_LOG_LENGTH]}')
+    if stats.statements > len(stats.sql):
+        lines.append(f'  ... {stats.statements - len(stats.sql)} more statements')
+    logger.warning('\n'.join(lines))
+
+
+def metrics_response_body() -> Tuple[bytes, str]:
+    """
+    生成 Prometheus 文本格式的指标；设置了 PROMETHEUS_MULTIPROC_DIR 时汇总所有 worker 进程
+
+    Returns:
+        (指标文本, Content-Type)
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: int) -> None:
+    """
+    清理已退出 worker 的实时指标文件（gunicorn child_exit 钩子中调用）
+
+    Args:
+        pid: worker 进程号
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
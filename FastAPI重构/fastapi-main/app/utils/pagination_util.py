@@ -0,0 +1,128 @@
+"""
+分页工具模块
+提供基于 (vod_time, id) 的游标分页（keyset pagination）和带缓存的总数统计
+"""
+import base64
+import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+from app.utils.cache_util import LRUCache
+
+PER_PAGE = 12
+
+
+class InvalidCursor(ValueError):
+    """游标无法解析"""
+
+
+def encode_cursor(sort_time: Optional[datetime.datetime], row_id: int) -> str:
+    """
+    将排序键编码为不透明游标
+
+    时间保留到微秒：同一秒内的多行（如 utcnow 写入的评论）必须能区分先后，否则 seek 条件会跳过它们
+
+    Args:
+        sort_time: 最后一行的排序时间，可以为空
+        row_id: 最后一行的 id
+
+    Returns:
+        URL 安全的游标字符串
+    """
+    time_part = sort_time.isoformat(sep=' ', timespec='microseconds') if sort_time is not None else ''
+    raw = f"{time_part}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime.datetime], int]:
+    """
+    解析游标（兼容旧版只精确到秒的游标）
+
+    Args:
+        cursor: encode_cursor 生成的游标
+
+    Returns:
+        (排序时间, id)，排序时间为空表示上一页停在排序时间为 NULL 的行
+
+    Raises:
+        InvalidCursor: 游标格式不正确
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        sort_time, row_id = raw.split('|')
+        return (datetime.datetime.fromisoformat(sort_time) if sort_time else None), int(row_id)
+    except Exception:
+        raise InvalidCursor(cursor)
+
+
+def apply_cursor(query, time_column, id_column, cursor: str):
+    """
+    添加 seek 条件 (time, id) < (cursor_time, cursor_id)
+
+    SQLite 与 MySQL 降序排序时 NULL 排在最后：游标时间不为空时，排序时间为 NULL 的行都在游标之后；
+    游标时间为空时只剩 NULL 行，按 id 继续
+
+    Args:
+        query: 查询
+        time_column: 排序时间列
+        id_column: 排序 id 列
+        cursor: encode_cursor 生成的游标
+
+    Returns:
+        添加条件后的查询
+
+    Raises:
+        InvalidCursor: 游标格式不正确
+    """
+    cursor_time, cursor_id = decode_cursor(cursor)
+    if cursor_time is None:
+        return query.filter(time_column.is_(None), id_column < cursor_id)
+    conditions = [
+        time_column < cursor_time,
+        and_(time_column == cursor_time, id_column < cursor_id)
+    ]
+    if time_column.nullable:
+        conditions.append(time_column.is_(None))
+    return query.filter(or_(*conditions))
+
+
+def keyset_page(query, time_column, id_column, cursor: Optional[str] = None, page: int = 1,
+                per_page: int = PER_PAGE):
+    """
+    按 (time_column, id_column) 降序分页
+
+    传入 cursor 时使用 seek 条件 (time, id) < (cursor_time, cursor_id) 代替 OFFSET，
+    深分页与首页代价相同；否则退回 page/OFFSET 方式
+
+    Args:
+        query: 已加好筛选条件的查询
+        time_column: 排序时间列
+        id_column: 排序 id 列（保证排序唯一）
+        cursor: 上一页返回的 next_cursor，空字符串表示第一页
+        page: 页码（仅在 cursor 为 None 时使用）
+        per_page: 每页数量
+
+    Returns:
+        (当前页结果列表, next_cursor)，没有下一页时 next_cursor 为 None
+
+    Raises:
+        InvalidCursor: 游标格式不正确
+    """
+    if cursor:
+        query = apply_cursor(query, time_column, id_column, cursor)
+    query = query.order_by(time_column.desc(), id_column.desc())
+    if cursor is None:
+        query = query.offset((page - 1) * per_page)
+
+    # 多取一行用于判断是否还有下一页
+    rows = query.limit(per_page + 1).all()
+    if len(rows) <= per_page:
+        return rows, None
+    rows = rows[:per_page]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, time_column.key), getattr(last, id_column.key))
+
+
+# 查询总数的缓存，避免每次翻页都执行一次全量 COUNT
+count_cache = LRUCache(max_size=1024, ttl=300)
@@ -0,0 +1,221 @@
+"""
+密码哈希工具模块
+PBKDF2 哈希与校验在独立的进程池中执行，不占用请求线程池、不持有主进程的 GIL
+
+进程池前的等待队列有上限，排满时立即拒绝（PasswordHasherBusy），登录高峰不会无限堆积；
+哈希参数由配置 PASSWORD_HASH_METHOD 决定，参数变化后旧哈希在用户下次登录成功时重新生成
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+
+from app.core.config import get_config_value, add_reload_hook
+
+DEFAULT_METHOD = f'pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}'
+SALT_LENGTH = 16
+
+
+class PasswordHasherBusy(Exception):
+    """哈希队列已满"""
+
+
+def normalize_method(method: str) -> str:
+    """
+    补全哈希参数，与 werkzeug 写入哈希串的前缀一致（如 pbkdf2:sha256 -> pbkdf2:sha256:260000）
+
+    Args:
+        method: 哈希参数
+
+    Returns:
+        完整的哈希参数
+    """
+    parts = method.split(':')
+    if parts[0] == 'pbkdf2':
+        if len(parts) == 1:
+            parts.append('sha256')
+        if len(parts) == 2:
+            parts.append(str(DEFAULT_PBKDF2_ITERATIONS))
+    return ':'.join(parts)
+
+
+def hash_password(password: str, method: str = None) -> str:
+    """
+    生成密码哈希（在当前线程中计算）
+
+    Args:
+        password: 明文密码
+        method: 哈希参数，默认读取配置 PASSWORD_HASH_METHOD
+
+    Returns:
+        哈希串
+    """
+    method = method or get_config_value('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+    return generate_password_hash(password, method=method, salt_length=SALT_LENGTH)
+
+
+def check_password(password_hash: Optional[str], password: str) -> bool:
+    """
+    校验密码（在当前线程中计算）
+
+    Args:
+        password_hash: 哈希串
+        password: 明文密码
+
+    Returns:
+        是否匹配
+    """
+    if not password_hash:
+        return False
+    return check_password_hash(password_hash, password)
+
+
+class PasswordHasher:
+    """
+    进程池密码哈希服务
+
+    同时最多 workers 个哈希在计算，另有 queue_size 个排队；超出时 hash/verify 抛出 PasswordHasherBusy。
+    进程池在首次使用时创建（spawn 方式，避免在多线程的主进程中 fork）；
+    spawn 的子进程会重新导入主模块，直接运行的脚本需要 if __name__ == '__main__' 保护
+    """
+
+    def __init__(self, workers: int = None, queue_size: int = None, method: str = None):
+        """
+        Args:
+            workers: 哈希进程数，默认读取配置 PASSWORD_HASH_WORKERS
+            queue_size: 排队上限，默认读取配置 PASSWORD_HASH_QUEUE_SIZE
+            method: 哈希参数，默认读取配置 PASSWORD_HASH_METHOD
+        """
+        self.workers = workers or get_config_value('PASSWORD_HASH_WORKERS', 2)
+        self.queue_size = queue_size if queue_size is not None else get_config_value('PASSWORD_HASH_QUEUE_SIZE', 64)
+        self.method = normalize_method(method or get_config_value('PASSWORD_HASH_METHOD', DEFAULT_METHOD))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    async def _run(self, func, *args) -> Any:
+        with self._lock:
+            if self.pending >= self.workers + self.queue_size:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self.pending += 1
+            try:
+                future = self._get_executor().submit(func, *args)
+            except BaseException:
+                self.pending -= 1
+                raise
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # 哈希进程异常退出，丢弃进程池，下一次调用时重新创建
+            self.shutdown()
+            raise
+
+    async def hash(self, password: str) -> str:
+        """
+        生成密码哈希
+
+        Args:
+            password: 明文密码
+
+        Returns:
+            哈希串
+
+        Raises:
+            PasswordHasherBusy: 队列已满
+        """
+        return await self._run(hash_password, password, self.method)
+
+    async def verify(self, password_hash: Optional[str], password: str) -> bool:
+        """
+        校验密码
+
+        Args:
+            password_hash: 哈希串
+            password: 明文密码
+
+        Returns:
+            是否匹配
+
+        Raises:
+            PasswordHasherBusy: 队列已满
+        """
+        if not password_hash:
+            return False
+        return await self._run(check_password, password_hash, password)
+
+    def needs_rehash(self, password_hash: Optional[str]) -> bool:
+        """
+        哈希参数是否与当前配置不同（登录成功后应重新生成）
+
+        Args:
+            password_hash: 哈希串
+
+        Returns:
+            是否需要重新生成
+        """
+        if not password_hash or '$' not in password_hash:
+            return True
+        return password_hash.split('$', 1)[0] != self.method
+
+    def shutdown(self) -> None:
+        """关闭进程池，下次使用时重新创建"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'method': self.method,
+            'workers': self.workers,
+            'queue_size': self.queue_size,
+            'pending': self.pending,
+            'completed': self.completed,
+            'rejected': self.rejected,
+        }
+
+
+_password_hasher: Optional[PasswordHasher] = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    """
+    获取进程内共享的密码哈希服务
+
+    Returns:
+        PasswordHasher
+    """
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher()
+    return _password_hasher
+
+
+def shutdown_password_hasher() -> None:
+    """关闭共享的密码哈希服务（应用关闭或配置重新加载时调用）"""
+    global _password_hasher
+    hasher, _password_hasher = _password_hasher, None
+    if hasher is not None:
+        hasher.shutdown()
+
+
+add_reload_hook(lambda settings: shutdown_password_hasher())
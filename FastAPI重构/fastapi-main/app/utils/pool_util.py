@@ -0,0 +1,75 @@
+"""
+数据库连接池工具模块
+带等待时间统计的 QueuePool，以及读取连接池实时状态（已借出、溢出、等待耗时）的函数
+"""
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class _TimedCheckout:
+    """统计从连接池取连接的次数、等待耗时与超时次数"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            wait = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    """同步引擎使用的 QueuePool"""
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """asyncio 引擎使用的 QueuePool"""
+
+
+def pool_status(pool) -> Dict[str, Any]:
+    """
+    读取连接池实时状态
+
+    Args:
+        pool: 引擎的连接池（engine.pool）
+
+    Returns:
+        状态字典；QueuePool 包含容量、已借出、空闲、溢出数，带统计的连接池另含取连接次数、等待耗时与超时次数
+    """
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    if isinstance(pool, _TimedCheckout):
+        status.update({
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "wait_avg_ms": round(pool.wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            "wait_max_ms": round(pool.wait_max * 1000, 3),
+        })
+    return status
@@ -0,0 +1,250 @@
+"""
+SQL 性能分析工具模块（开发模式）
+按请求记录每条语句的指纹（去掉字面量、折叠 IN 列表后的语句形状）与耗时：
+同一指纹在一个请求中重复执行达到 N_PLUS_ONE_THRESHOLD 次时视为 N+1 查询；
+耗时超过 SLOW_QUERY_MS 的 SELECT 附带 EXPLAIN 结果。结果写入日志和 Server-Timing 响应头
+
+默认随 DEBUG 开启，可用 QUERY_PROFILING 单独开关。测试中可用 collect_queries() / query_budget_util 统计查询数
+"""
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_config_value
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_PLACEHOLDER = re.compile(r'%s|%\(\w+\)s|:\w+|\$\d+')
+
+
+def fingerprint(statement: str) -> str:
+    """
+    计算语句指纹：字面量与占位符统一为 ?，IN 列表折叠为 IN (...)，空白归一
+
+    Args:
+        statement: SQL 语句
+
+    Returns:
+        指纹
+    """
+    text = ' '.join(statement.split())
+    text = _STRING.sub('?', text)
+    text = _PLACEHOLDER.sub('?', text)
+    text = _NUMBER.sub('?', text)
+    return _IN_LIST.sub('IN (...)', text)
+
+
+class QueryRecord(NamedTuple):
+    """一条已执行的语句"""
+    fingerprint: str
+    statement: str
+    duration: float  # 秒
+    explain: Optional[str]
+
+
+class QueryProfile:
+    """一个请求（或一段代码）执行的语句"""
+
+    def __init__(self):
+        self.queries: List[QueryRecord] = []
+        self._lock = threading.Lock()
+
+    def add(self, record: QueryRecord) -> None:
+        with self._lock:
+            self.queries.append(record)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_time(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    def repeated(self, threshold: int = None) -> Dict[str, int]:
+        """
+        重复执行达到阈值的语句形状（N+1 候选）
+
+        Args:
+            threshold: 次数阈值，默认读取配置 N_PLUS_ONE_THRESHOLD
+
+        Returns:
+            {指纹: 次数}，按次数降序
+        """
+        threshold = threshold or get_config_value('N_PLUS_ONE_THRESHOLD', 3)
+        counts = Counter(query.fingerprint for query in self.queries)
+        return {shape: n for shape, n in counts.most_common() if n >= threshold}
+
+    def slow(self) -> List[QueryRecord]:
+        """超过 SLOW_QUERY_MS 的语句，按耗时降序"""
+        limit = get_config_value('SLOW_QUERY_MS', 100) / 1000
+        return sorted((query for query in self.queries if query.duration >= limit),
+                      key=lambda query: query.duration, reverse=True)
+
+    def server_timing(self, total: float = None) -> str:
+        """
+        生成 Server-Timing 响应头
+
+        Args:
+            total: 请求总耗时（秒）
+
+        Returns:
+            如 total;dur=12.3, db;dur=4.5;desc="6 queries", nplus1;desc="1 repeated shapes"
+        """
+        parts = []
+        if total is not None:
+            parts.append(f'total;dur={total * 1000:.1f}')
+        parts.append(f'db;dur={self.total_time * 1000:.1f};desc="{self.count} queries"')
+        repeated = self.repeated()
+        if repeated:
+            parts.append(f'nplus1;desc="{len(repeated)} repeated shapes, max {max(repeated.values())}x"')
+        slow = self.slow()
+        if slow:
+            parts.append(f'slowsql;dur={slow[0].duration * 1000:.1f};desc="{len(slow)} slow"')
+        return ', '.join(parts)
+
+
+_current: contextvars.ContextVar[Optional[QueryProfile]] = contextvars.ContextVar('query_profile', default=None)
+_collectors: List[QueryProfile] = []
+_collectors_lock = threading.Lock()
+_enabled = False
+
+
+def profiling_enabled() -> bool:
+    """QUERY_PROFILING 未配置时跟随 DEBUG"""
+    enabled = get_config_value('QUERY_PROFILING')
+    return get_config_value('DEBUG', False) if enabled is None else enabled
+
+
+def explain(conn, statement: str, parameters: Any) -> Optional[str]:
+    """
+    对 SELECT 语句执行 EXPLAIN（SQLite 为 EXPLAIN QUERY PLAN），直接使用 DBAPI 游标，不触发事件钩子
+
+    Args:
+        conn: SQLAlchemy 连接
+        statement: 语句
+        parameters: 语句参数
+
+    Returns:
+        执行计划文本，失败或非 SELECT 时返回 None
+    """
+    if not statement.lstrip().upper().startswith('SELECT'):
+        return None
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    try:
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return '\n'.join(' | '.join(str(col) for col in row) for row in cursor.fetchall())
+        finally:
+            cursor.close()
+    except Exception as e:
+        return f'EXPLAIN failed: {e}'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None or _collectors:
+        conn.info.setdefault('profile_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    if profile is None and not _collectors:
+        return
+    starts = conn.info.get('profile_start')
+    duration = time.perf_counter() - starts.pop() if starts else 0.0
+    plan = None
+    if not executemany and duration * 1000 >= get_config_value('SLOW_QUERY_MS', 100):
+        plan = explain(conn, statement, parameters)
+    record = QueryRecord(fingerprint(statement), statement, duration, plan)
+    if profile is not None:
+        profile.add(record)
+    for collector in list(_collectors):
+        if collector is not profile:
+            collector.add(record)
+
+
+def enable_query_profiling() -> None:
+    """在所有引擎（包括 AsyncEngine 内部的同步引擎）上注册分析钩子"""
+    global _enabled
+    if not _enabled:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _enabled = True
+
+
+@contextmanager
+def collect_queries() -> Iterator[QueryProfile]:
+    """
+    统计代码块内所有线程执行的语句（用于测试，TestClient 在另一个线程中运行应用）
+
+    Yields:
+        QueryProfile
+    """
+    enable_query_profiling()
+    profile = QueryProfile()
+    with _collectors_lock:
+        _collectors.append(profile)
+    try:
+        yield profile
+    finally:
+        with _collectors_lock:
+            _collectors.remove(profile)
+
+
+def log_profile(method: str, path: str, profile: QueryProfile) -> None:
+    """
+    记录 N+1 与慢语句
+
+    Args:
+        method: 请求方法
+        path: 请求路径
+        profile: 请求的语句记录
+    """
+    for shape, n in profile.repeated().items():
+        logger.warning(f'possible N+1 in {method} {path}: {n}x {shape[:300]}')
+    for query in profile.slow():
+        logger.warning(f'slow query in {method} {path}: {query.duration * 1000:.1f}ms '
+                       f'{" ".join(query.statement.split())[:500]}\n{query.explain or ""}')
+
+
+class QueryProfilingMiddleware:
+    """
+    ASGI 中间件：记录每个请求的语句，在响应头中返回 Server-Timing，并在日志中报告 N+1 与慢语句
+    """
+
+    def __init__(self, app):
+        self.app = app
+        enable_query_profiling()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = _current.set(profile)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                header = profile.server_timing(time.perf_counter() - start)
+                message['headers'] = list(message.get('headers', [])) + [(b'server-timing', header.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            log_profile(scope['method'], scope['path'], profile)
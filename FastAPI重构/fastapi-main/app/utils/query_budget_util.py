@@ -0,0 +1,87 @@
+"""
+查询预算 pytest 插件
+测试中执行的 SQL 语句数超过预算、或出现 N+1 重复查询时使测试失败
+
+在 conftest.py 中启用::
+
+    pytest_plugins = ['app.utils.query_budget_util']
+
+    def test_vod_detail(client, query_budget):
+        with query_budget(3):
+            client.get('/api/v1/vod_detail', params={'vod_id': 1})
+
+    @pytest.mark.query_budget(5, max_repeats=2)
+    def test_comments(client):
+        client.get('/api/v1/comments/1')
+"""
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Iterator, Optional
+
+import pytest
+
+from app.utils.profiling_util import QueryProfile, collect_queries
+
+
+def budget_failures(profile: QueryProfile, max_queries: Optional[int], max_repeats: Optional[int] = None) -> str:
+    """
+    检查语句记录是否超出预算
+
+    Args:
+        profile: 语句记录
+        max_queries: 最多语句数，None 表示不限
+        max_repeats: 同一语句形状最多执行次数，None 表示不检查
+
+    Returns:
+        失败原因，未超出时为空字符串
+    """
+    problems = []
+    if max_queries is not None and profile.count > max_queries:
+        problems.append(f'executed {profile.count} queries, budget is {max_queries}')
+    if max_repeats is not None:
+        for shape, n in profile.repeated(max_repeats + 1).items():
+            problems.append(f'{n}x (max {max_repeats}) {shape}')
+    if problems and profile.count:
+        problems.append('statements:\n' + '\n'.join(f'  {query.fingerprint}' for query in profile.queries))
+    return '\n'.join(problems)
+
+
+@contextmanager
+def assert_query_budget(max_queries: Optional[int], max_repeats: Optional[int] = None) -> Iterator[QueryProfile]:
+    """
+    代码块内的语句数超出预算时抛出 AssertionError
+
+    Args:
+        max_queries: 最多语句数
+        max_repeats: 同一语句形状最多执行次数
+
+    Yields:
+        QueryProfile
+    """
+    with collect_queries() as profile:
+        yield profile
+    failures = budget_failures(profile, max_queries, max_repeats)
+    if failures:
+        raise AssertionError(failures)
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'query_budget(max_queries, max_repeats=None): 整个测试的 SQL 语句数预算')
+
+
+@pytest.fixture
+def query_budget() -> Callable[..., ContextManager[QueryProfile]]:
+    """返回 assert_query_budget，用 with 语句限定需要检查的代码块"""
+    return assert_query_budget
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker('query_budget')
+    if marker is None:
+        return (yield)
+    with collect_queries() as profile:
+        result = yield
+    failures = budget_failures(profile, *marker.args, **marker.kwargs)
+    if failures:
+        pytest.fail(failures, pytrace=False)
+    return result
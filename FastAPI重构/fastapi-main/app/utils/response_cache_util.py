@@ -0,0 +1,267 @@
+"""
+接口响应缓存模块
+视频数据只在定时任务更新时变化，/vod_list、/vod_detail 的响应按规范化的查询参数缓存；
+定时任务结束后递增数据版本号，旧版本的缓存键自然失效。
+一次请求只解析一次版本号：get 返回带版本号的缓存键，写回时 set 使用同一个键，
+未命中后查询期间版本号递增时，查询结果写入旧版本，不会以新版本缓存入库前的数据
+
+后端可选进程内 LRU（memory）或 Redis（redis），由配置项 RESPONSE_CACHE_BACKEND 指定。
+memory 后端的版本号只在本进程内有效，多进程部署时请使用 redis 后端。
+异步接口通过 aget/aset 访问缓存，redis 后端的网络请求在线程池中执行，不阻塞事件循环
+"""
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_config_value
+from app.utils.cache_util import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry(NamedTuple):
+    """一次缓存读取的结果"""
+    key: Optional[str]  # 带版本号的缓存键，写回时传给 set；读取版本号失败时为 None（不写回）
+    value: Any  # 缓存的响应，未命中时为 None
+
+
+class MemoryBackend:
+    """进程内 LRU 后端"""
+
+    # 读写只访问内存，可在事件循环中直接调用
+    blocking = False
+
+    def __init__(self, max_size: int = 4096):
+        self._cache = LRUCache(max_size=max_size)
+        self._version = 0
+
+    def get(self, key: str) -> Any:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        self._cache.set(key, value, ttl)
+
+    def get_version(self) -> int:
+        return self._version
+
+    def bump_version(self) -> int:
+        self._version += 1
+        self._cache.clear()
+        return self._version
+
+
+class RedisBackend:
+    """
+    Redis 后端，响应以 JSON 存储，可被多个 worker 共享
+
+    Args:
+        client: 兼容 redis-py 的客户端（测试时可传入 fakeredis），为空时按 host/port/db 创建
+    """
+
+    # 每次读写都是一次网络往返，异步接口中需放到线程池执行
+    blocking = True
+
+    def __init__(self, client=None, host: str = 'localhost', port: int = 6379, db: int = 0,
+                 prefix: str = 'sakura:resp'):
+        if client is None:
+            import redis
+            client = redis.Redis(host=host, port=port, db=db)
+        self.client = client
+        self.prefix = prefix
+        self.version_key = f'{prefix}:version'
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(f'{self.prefix}:{key}')
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        raw = json.dumps(value, ensure_ascii=False, default=str)
+        self.client.set(f'{self.prefix}:{key}', raw, ex=int(ttl) if ttl else None)
+
+    def get_version(self) -> int:
+        return int(self.client.get(self.version_key) or 0)
+
+    def bump_version(self) -> int:
+        return int(self.client.incr(self.version_key))
+
+
+class ResponseCache:
+    """
+    响应缓存，缓存键包含数据版本号；后端异常时按未命中处理，不影响接口
+
+    Args:
+        backend: MemoryBackend 或 RedisBackend
+        ttl: 缓存过期秒数
+        version_ttl: 数据版本号在本进程内的缓存秒数，避免每次请求都读取一次版本号
+    """
+
+    def __init__(self, backend, ttl: Optional[float] = 3600, version_ttl: float = 5):
+        self.backend = backend
+        self.ttl = ttl
+        self.version_ttl = version_ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._version = None
+        self._version_checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(namespace: str, **params) -> str:
+        """
+        按规范化的查询参数生成缓存键：忽略 None，字符串去除首尾空白，参数按名称排序
+
+        Args:
+            namespace: 接口名
+            **params: 查询参数
+
+        Returns:
+            缓存键（不含版本号）
+        """
+        parts = []
+        for name in sorted(params):
+            value = params[name]
+            if value is None:
+                continue
+            if isinstance(value, str):
+                value = value.strip()
+            parts.append(f'{name}={value}')
+        return f'{namespace}?' + '&'.join(parts)
+
+    def _current_version(self) -> int:
+        now = time.monotonic()
+        if self._version is None or now - self._version_checked_at > self.version_ttl:
+            self._version = self.backend.get_version()
+            self._version_checked_at = now
+        return self._version
+
+    def get(self, key: str) -> CacheEntry:
+        """
+        读取缓存，解析当前版本号并返回带版本号的缓存键
+
+        Args:
+            key: make_key 生成的缓存键
+
+        Returns:
+            CacheEntry，未命中时 value 为 None
+        """
+        versioned_key, value = None, None
+        try:
+            versioned_key = f'v{self._current_version()}:{key}'
+            value = self.backend.get(versioned_key)
+        except Exception as e:
+            logger.warning(f"读取响应缓存失败: {e}")
+            with self._lock:
+                self.errors += 1
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return CacheEntry(versioned_key, value)
+
+    def set(self, key: Optional[str], value: Any) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: get 返回的带版本号的缓存键（CacheEntry.key），为 None 时不写入
+            value: 响应
+        """
+        if key is None:
+            return
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            logger.warning(f"写入响应缓存失败: {e}")
+            with self._lock:
+                self.errors += 1
+
+    async def aget(self, key: str) -> CacheEntry:
+        """
+        在异步接口中读取缓存，会阻塞的后端在线程池中执行
+
+        Args:
+            key: make_key 生成的缓存键
+
+        Returns:
+            CacheEntry，未命中时 value 为 None
+        """
+        if not getattr(self.backend, 'blocking', True):
+            return self.get(key)
+        return await run_in_threadpool(self.get, key)
+
+    async def aset(self, key: Optional[str], value: Any) -> None:
+        """
+        在异步接口中写入缓存，会阻塞的后端在线程池中执行
+
+        Args:
+            key: aget 返回的带版本号的缓存键（CacheEntry.key）
+            value: 响应
+        """
+        if not getattr(self.backend, 'blocking', True):
+            self.set(key, value)
+        else:
+            await run_in_threadpool(self.set, key, value)
+
+    def bump_version(self) -> int:
+        """
+        递增数据版本号，使所有已缓存的响应失效
+
+        Returns:
+            新版本号
+        """
+        version = self.backend.bump_version()
+        self._version = version
+        self._version_checked_at = time.monotonic()
+        logger.info(f'响应缓存版本更新为 {version}')
+        return version
+
+    def stats(self) -> Dict[str, Any]:
+        """命中统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    获取进程内共享的响应缓存，按配置选择后端；redis 不可用时退回 memory 后端
+
+    Returns:
+        ResponseCache 实例
+    """
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                backend_name = get_config_value('RESPONSE_CACHE_BACKEND', 'memory')
+                backend = None
+                if backend_name == 'redis':
+                    try:
+                        backend = RedisBackend(
+                            host=get_config_value('REDIS_HOST', 'localhost'),
+                            port=get_config_value('REDIS_PORT', 6379),
+                            db=get_config_value('REDIS_DB', 0)
+                        )
+                    except ImportError:
+                        logger.warning("未安装 redis, 响应缓存使用进程内 memory 后端")
+                if backend is None:
+                    backend = MemoryBackend(max_size=get_config_value('RESPONSE_CACHE_SIZE', 4096))
+                _response_cache = ResponseCache(backend, ttl=get_config_value('RESPONSE_CACHE_TTL', 3600))
+    return _response_cache
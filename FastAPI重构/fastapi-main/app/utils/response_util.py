@@ -4,6 +4,8 @@
 """
 from typing import Any, Optional, Dict
 
+from fastapi.responses import ORJSONResponse
+
 
 def success_response(
     data: Any = None,
@@ -51,6 +53,20 @@ def resp_ok(data: Any = None, message: str = 'Success') -> Dict[str, Any]:
     return success_response(data=data, message=message, code=200)
 
 
+def resp_page(
+    data: Any = None,
+    message: str = 'Success',
+    next_cursor: Optional[str] = None,
+    total: Optional[int] = None
+) -> Dict[str, Any]:
+    """快速创建分页响应，在成功响应的基础上附带 next_cursor 和可选的 total"""
+    resp = success_response(data=data, message=message, code=200)
+    resp['next_cursor'] = next_cursor
+    if total is not None:
+        resp['total'] = total
+    return resp
+
+
 def resp_created(data: Any = None, message: str = 'Created successfully') -> Dict[str, Any]:
     """快速创建已创建响应"""
     return success_response(data=data, message=message, code=201)
@@ -79,3 +95,27 @@ def resp_not_found(message: str = 'Not found', data: Optional[Any] = None) -> Di
 def resp_server_error(message: str = 'Internal server error', data: Optional[Any] = None) -> Dict[str, Any]:
     """快速创建服务器错误响应"""
     return error_response(message=message, code=500, data=data)
+
+
+def resp_too_many_requests(message: str = 'Too many requests', data: Optional[Any] = None) -> Dict[str, Any]:
+    """快速创建请求过于频繁响应"""
+    return error_response(message=message, code=429, data=data)
+
+
+def resp_service_unavailable(message: str = 'Service unavailable', data: Optional[Any] = None) -> Dict[str, Any]:
+    """快速创建服务繁忙响应"""
+    return error_response(message=message, code=503, data=data)
+
+
+def resp_json(content: Dict[str, Any], status_code: int = 200) -> ORJSONResponse:
+    """
+    直接用 orjson 序列化响应
+    接口返回 Response 对象时 FastAPI 不再按 response_model 校验数据、也不经过 jsonable_encoder 逐个遍历字段，
+    适用于视频列表、详情等较大的响应；需要校验时由接口先按模型 model_validate(...).model_dump()（结果可缓存），
+    response_model 仍用于生成接口文档
+
+    :param content: 响应字典，值只能是 orjson 支持的类型（str/int/float/bool/None/list/dict/datetime 等）
+    :param status_code: HTTP 状态码
+    :return: ORJSONResponse
+    """
+    return ORJSONResponse(content, status_code=status_code)
@@ -0,0 +1,87 @@
+"""
+请求限流工具模块
+基于滑动时间窗口的尝试次数限制（如按 IP、按用户名限制登录尝试）
+
+计数只在当前进程内有效，多 worker 部署时每个进程单独计数
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Hashable
+
+
+class AttemptThrottle:
+    """
+    滑动窗口限流：window 秒内最多 limit 次尝试
+
+    最多跟踪 max_keys 个键，超出时丢弃最久未活动的键
+    """
+
+    def __init__(self, limit: int, window: float, max_keys: int = 100000,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            limit: 窗口内允许的尝试次数
+            window: 窗口长度（秒）
+            max_keys: 跟踪的键数上限
+            clock: 单调时钟
+        """
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self.clock = clock
+        self._attempts: "OrderedDict[Hashable, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prune(self, key: Hashable, now: float) -> Deque[float]:
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            return deque()
+        while attempts and attempts[0] <= now - self.window:
+            attempts.popleft()
+        if not attempts:
+            del self._attempts[key]
+        return attempts
+
+    def retry_after(self, key: Hashable) -> float:
+        """
+        距离允许下一次尝试还需等待的秒数
+
+        Args:
+            key: 限流键
+
+        Returns:
+            等待秒数，0 表示允许尝试
+        """
+        with self._lock:
+            now = self.clock()
+            attempts = self._prune(key, now)
+            if len(attempts) < self.limit:
+                return 0.0
+            return max(attempts[0] + self.window - now, 0.0)
+
+    def record(self, key: Hashable) -> None:
+        """
+        记录一次尝试
+
+        Args:
+            key: 限流键
+        """
+        with self._lock:
+            now = self.clock()
+            self._prune(key, now)
+            attempts = self._attempts.setdefault(key, deque())
+            attempts.append(now)
+            self._attempts.move_to_end(key)
+            while len(self._attempts) > self.max_keys:
+                self._attempts.popitem(last=False)
+
+    def reset(self, key: Hashable) -> None:
+        """
+        清除键的尝试记录（如登录成功后）
+
+        Args:
+            key: 限流键
+        """
+        with self._lock:
+            self._attempts.pop(key, None)
@@ -0,0 +1,127 @@
+"""
+视频数据规范化工具模块
+入库时清理 vod_content 的 HTML 标签、解析 vod_play_url 为结构化的播放列表，
+结果写入 vod_content_clean、vod_play_list 两列，详情接口直接读取，不再逐次处理字符串
+
+数据源的播放地址格式:
+    vod_play_from: 来源1$$$来源2
+    vod_play_url:  第01集$url#第02集$url$$$第01集$url#...
+"""
+import datetime
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from app.models.models import MovDetail
+
+# 数据源 vod_content 中包裹正文的标签（含属性写法，如 <span style="...">）
+_CONTENT_TAG_RE = re.compile(r'</?(?:p|span)(?:\s[^>]*)?>', re.IGNORECASE)
+
+SOURCE_SEPARATOR = '$$$'
+EPISODE_SEPARATOR = '#'
+NAME_URL_SEPARATOR = '$'
+
+VOD_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 定长筛选列 -> 列长度，入库前按列定义截断，避免 MySQL 严格模式下超长写入失败
+BOUNDED_COLUMNS = {name: MovDetail.__table__.c[name].type.length for name in ('vod_area', 'vod_year')}
+
+
+def parse_vod_time(value: Any) -> Optional[datetime.datetime]:
+    """
+    解析数据源的 vod_time 字符串
+
+    Args:
+        value: vod_time 字符串或 datetime
+
+    Returns:
+        datetime，无法解析时返回 None
+    """
+    if isinstance(value, datetime.datetime):
+        return value
+    try:
+        return datetime.datetime.strptime(value, VOD_TIME_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+def clean_vod_content(content: Optional[str]) -> Optional[str]:
+    """
+    去除简介中的 <p>、<span> 标签
+
+    Args:
+        content: 原始简介
+
+    Returns:
+        清理后的简介
+    """
+    if not content:
+        return content
+    return _CONTENT_TAG_RE.sub('', content)
+
+
+def parse_play_url(play_url: Optional[str], play_from: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    解析播放地址，按 $$$ 拆分多个播放来源，每个来源按 # 拆分剧集、按 $ 拆分剧集名与地址
+
+    Args:
+        play_url: 原始 vod_play_url
+        play_from: 原始 vod_play_from，与 play_url 的来源一一对应
+
+    Returns:
+        [{"from": 来源名, "episodes": [{"name": 剧集名, "url": 地址}, ...]}, ...]
+    """
+    if not play_url:
+        return []
+    sources = play_url.split(SOURCE_SEPARATOR)
+    froms = play_from.split(SOURCE_SEPARATOR) if play_from else []
+    play_list = []
+    for index, source in enumerate(sources):
+        episodes = []
+        for episode in source.split(EPISODE_SEPARATOR):
+            name, sep, url = episode.partition(NAME_URL_SEPARATOR)
+            if not sep:
+                continue
+            episodes.append({"name": name, "url": url})
+        if episodes:
+            play_list.append({"from": froms[index] if index < len(froms) else '', "episodes": episodes})
+    return play_list
+
+
+def play_list_to_dict(play_list: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    取第一个播放来源，转为 {剧集名: 地址}，与旧版详情接口的 vod_play_url 格式一致
+
+    Args:
+        play_list: parse_play_url 的结果
+
+    Returns:
+        {剧集名: 地址}
+    """
+    if not play_list:
+        return {}
+    return {episode["name"]: episode["url"] for episode in play_list[0]["episodes"]}
+
+
+def normalize_mov_detail(mov_detail: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    为一条数据源 movdetail 计算 vod_content_clean、vod_play_list，将 vod_time 解析为 datetime，
+    并将 vod_area、vod_year 截断到列长度（原地写入并返回）
+
+    Args:
+        mov_detail: 数据源返回的 movdetail 字典
+
+    Returns:
+        mov_detail
+    """
+    mov_detail['vod_time'] = parse_vod_time(mov_detail.get('vod_time'))
+    for column, length in BOUNDED_COLUMNS.items():
+        value = mov_detail.get(column)
+        if isinstance(value, str) and len(value) > length:
+            mov_detail[column] = value[:length]
+    mov_detail['vod_content_clean'] = clean_vod_content(mov_detail.get('vod_content'))
+    mov_detail['vod_play_list'] = json.dumps(
+        parse_play_url(mov_detail.get('vod_play_url'), mov_detail.get('vod_play_from')),
+        ensure_ascii=False, separators=(',', ':')
+    )
+    return mov_detail
@@ -0,0 +1,3 @@
+"""
+性能基准测试脚本，在 fastapi-main 目录下以 python -m benchmarks.<name> 运行
+"""
@@ -0,0 +1,75 @@
+"""
+认证依赖开销基准
+
+1. 读取配置：每次打开并解析 config.yaml（旧实现） vs 解析一次并缓存的 Settings
+2. get_current_user：旧实现 validate_token + parse_user_from_token 解码、校验签名两次并各读一次 SECRET_KEY；
+   新实现 TokenVerifier 解码一次（缓存未命中），或直接命中已验证 token 缓存
+
+用法（在 fastapi-main 目录下）:
+    python -m benchmarks.bench_auth_overhead --repeat 2000
+"""
+import argparse
+import datetime
+import os
+from typing import Any
+
+import yaml
+from authlib.jose import jwt, JoseError
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core import config
+from app.core.security import get_current_user
+from app.utils.auth_verify_util import generate_auth_token, token_verifier
+from benchmarks.common import timeit, print_table
+
+
+def legacy_get_config_value(key: str, default: Any = None) -> Any:
+    """旧实现：每次调用都读取并解析 config.yaml"""
+    env = os.getenv('ENV', 'PRODUCTION')
+    with open(config.CONFIG_PATH, 'r', encoding='utf-8') as f:
+        config_data = yaml.safe_load(f)
+    return config_data.get(env, config_data.get('COMMON', {})).get(key, default)
+
+
+def legacy_get_current_user(token: str) -> dict:
+    """旧实现：validate_token 与 parse_user_from_token 各解码一次，dead_time 每次 strptime"""
+    key = legacy_get_config_value('SECRET_KEY', 'secret-key')
+    try:
+        data = jwt.decode(token, key)
+        if datetime.datetime.strptime(data['dead_time'], "%Y-%m-%d") <= datetime.datetime.now():
+            raise ValueError('expired')
+    except JoseError:
+        raise ValueError('invalid')
+    key = legacy_get_config_value('SECRET_KEY', 'secret-key')
+    return dict(jwt.decode(token, key))
+
+
+def cold_get_current_user(credentials):
+    token_verifier.clear()
+    return get_current_user(credentials)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    token = generate_auth_token(user_id=1, name='bench')
+    credentials = HTTPAuthorizationCredentials(scheme='Bearer', credentials=token)
+
+    config_results = {
+        'legacy yaml per call': timeit(lambda: legacy_get_config_value('SECRET_KEY'), args.repeat),
+        'cached settings': timeit(lambda: config.get_config_value('SECRET_KEY'), args.repeat),
+    }
+    print_table('get_config_value(SECRET_KEY)', config_results)
+
+    auth_results = {
+        'legacy yaml + double decode': timeit(lambda: legacy_get_current_user(token), args.repeat),
+        'single decode (cache miss)': timeit(lambda: cold_get_current_user(credentials), args.repeat),
+        'verified-token cache hit': timeit(lambda: get_current_user(credentials), args.repeat),
+    }
+    print_table('get_current_user dependency', auth_results)
+
+
+if __name__ == '__main__':
+    main()
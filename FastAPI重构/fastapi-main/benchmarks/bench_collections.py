@@ -0,0 +1,74 @@
+"""
+收藏增删查基准：旧的拼接字符串存储 vs 规范化 (user_id, movdetail_id) 表
+
+对收藏数不同的用户，分别统计一次收藏+取消收藏（toggle）和一次是否收藏判断的耗时
+
+用法（在 fastapi-main 目录下）:
+    python -m benchmarks.bench_collections
+"""
+import argparse
+
+from app.models.models import UserCollection, UserCollectionItem
+from app.utils.collection_util import is_collected, add_collection, remove_collection
+from benchmarks.common import make_engine, seed_catalogue, seed_users, timeit, print_table
+
+FAVOURITE_COUNTS = [10, 1000, 5000, 20000]
+
+
+def legacy_toggle(db, user_id: int, vod_id: str):
+    """旧实现：子串判断后拼接/替换整个字符串再写回"""
+    collection = db.query(UserCollection).filter(UserCollection.user_id == user_id).first()
+    if vod_id + ';' not in (collection.movdetail_id_list or ''):
+        collection.movdetail_id_list = (collection.movdetail_id_list or '') + vod_id + ';'
+    db.commit()
+    collection = db.query(UserCollection).filter(UserCollection.user_id == user_id).first()
+    collection.movdetail_id_list = collection.movdetail_id_list.replace(vod_id + ';', '')
+    db.commit()
+
+
+def legacy_contains(db, user_id: int, vod_id: str) -> bool:
+    collection = db.query(UserCollection).filter(UserCollection.user_id == user_id).first()
+    return vod_id + ';' in (collection.movdetail_id_list or '')
+
+
+def normalized_toggle(db, user_id: int, vod_id: int):
+    add_collection(db, user_id, vod_id)
+    remove_collection(db, user_id, vod_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    max_count = max(FAVOURITE_COUNTS)
+    _, Session = make_engine()
+    session = Session()
+    seed_catalogue(session, max_count + 1)
+    user_ids = seed_users(session, len(FAVOURITE_COUNTS))
+    for user_id, count in zip(user_ids, FAVOURITE_COUNTS):
+        session.add(UserCollection(user_id=user_id, movdetail_id_list=''.join(f'{i};' for i in range(1, count + 1))))
+        session.bulk_insert_mappings(UserCollectionItem, [{'user_id': user_id, 'movdetail_id': i}
+                                                          for i in range(1, count + 1)])
+    session.commit()
+
+    toggle_results = {}
+    contains_results = {}
+    target = max_count + 1  # 未收藏的视频
+    for user_id, count in zip(user_ids, FAVOURITE_COUNTS):
+        toggle_results[f'legacy     {count} favs'] = timeit(
+            lambda: legacy_toggle(session, user_id, str(target)), args.repeat)
+        toggle_results[f'normalized {count} favs'] = timeit(
+            lambda: normalized_toggle(session, user_id, target), args.repeat)
+        contains_results[f'legacy     {count} favs'] = timeit(
+            lambda: legacy_contains(session, user_id, str(target)), args.repeat)
+        contains_results[f'normalized {count} favs'] = timeit(
+            lambda: is_collected(session, user_id, target), args.repeat)
+    session.close()
+
+    print_table('toggle (add + remove)', toggle_results)
+    print_table('contains', contains_results)
+
+
+if __name__ == '__main__':
+    main()
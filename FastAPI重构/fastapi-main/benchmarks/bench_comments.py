@@ -0,0 +1,90 @@
+"""
+评论树接口基准：验证查询次数与评论树大小无关，以及 NDJSON 导出的内存占用
+
+对不同规模的评论树统计 load_comment_tree + build_comment_tree 的 SQL 语句数和耗时，
+语句数随树大小变化时以非零状态码退出；并对比一次性构建响应与流式导出的内存峰值
+
+用法（在 fastapi-main 目录下）:
+    python -m benchmarks.bench_comments
+"""
+import argparse
+import json
+import sys
+import tracemalloc
+
+from app.api.v1.comment import load_comment_tree, build_comment_tree, iter_comment_export
+from benchmarks.common import (make_engine, seed_catalogue, seed_users, seed_comment_tree, count_queries,
+                               timeit, print_table)
+
+# (顶层评论数, 每条顶层评论的回复数)
+TREE_SIZES = [(1, 0), (5, 10), (20, 50), (50, 200)]
+EXPORT_SIZES = [(200, 10), (1000, 10), (3000, 10)]
+
+
+def peak_memory(func) -> int:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    engine, Session = make_engine()
+    session = Session()
+    seed_catalogue(session, len(TREE_SIZES) + len(EXPORT_SIZES))
+    user_ids = seed_users(session, 100)
+    for movdetail_id, (threads, replies) in enumerate(TREE_SIZES, start=1):
+        seed_comment_tree(session, movdetail_id, user_ids, threads, replies)
+    session.close()
+
+    query_counts = {}
+    results = {}
+    for movdetail_id, (threads, replies) in enumerate(TREE_SIZES, start=1):
+        name = f'{threads} threads x {replies} replies'
+        session = Session()
+        with count_queries(engine) as statements:
+            build_comment_tree(load_comment_tree(session, movdetail_id))
+        session.close()
+        query_counts[name] = len(statements)
+
+        def run():
+            s = Session()
+            build_comment_tree(load_comment_tree(s, movdetail_id))
+            s.close()
+        results[name] = timeit(run, args.repeat)
+
+    print('\nSQL statements per request')
+    for name, count in query_counts.items():
+        print(f'{name:<32}{count:>6}')
+    print_table('comment tree latency', results)
+
+    print('\nexport peak memory (bytes)')
+    print(f'{"case":<32}{"full json":>14}{"ndjson stream":>16}')
+    for movdetail_id, (threads, replies) in enumerate(EXPORT_SIZES, start=len(TREE_SIZES) + 1):
+        session = Session()
+        seed_comment_tree(session, movdetail_id, user_ids, threads, replies)
+        session.close()
+
+        def full():
+            s = Session()
+            json.dumps(build_comment_tree(load_comment_tree(s, movdetail_id)), ensure_ascii=False)
+            s.close()
+
+        def stream():
+            for _ in iter_comment_export(movdetail_id, session_factory=Session):
+                pass
+        print(f'{f"{threads} threads x {replies} replies":<32}{peak_memory(full):>14}{peak_memory(stream):>16}')
+
+    if len(set(query_counts.values())) != 1:
+        print('FAIL: query count grows with tree size')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+登录高峰下的目录接口延迟
+
+持续请求 /vod_list 的同时，以较高并发请求登录接口，对比：
+1. 旧实现：同步 def 登录接口，PBKDF2 在 Starlette 请求线程池中计算，并发数只受线程池大小限制
+2. 新实现：async def 登录接口，PBKDF2 在 PasswordHasher 进程池中计算，同时计算数与排队数有上限（超出时返回 503）
+
+关闭响应缓存，每个 /vod_list 请求都查询数据库；登录限流调到足够大，不影响压测。
+输出各阶段 /vod_list 的 p50/p95/p99 延迟与登录吞吐
+
+用法（在 fastapi-main 目录下）:
+    python -m benchmarks.bench_login_storm --duration 10 --storm 32
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+# 压测从同一 IP、少量用户名发起登录，放开限流
+os.environ.setdefault('LOGIN_IP_MAX_ATTEMPTS', '100000000')
+os.environ.setdefault('LOGIN_USER_MAX_ATTEMPTS', '100000000')
+
+import httpx
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from app.models import database
+from app.models.database import get_db
+from app.models.models import User
+from app.schemas.auth import UserLogin
+from app.utils import response_cache_util
+from app.utils.password_util import hash_password, get_password_hasher
+from app.utils.response_cache_util import ResponseCache
+from benchmarks.bench_async_api import NullBackend
+from benchmarks.common import make_engine, percentile, seed_catalogue
+
+PASSWORD = 'bench-password'
+
+
+def add_legacy_login(app) -> None:
+    """改造前的登录接口：同步 def，在请求线程池中校验密码"""
+
+    @app.post('/legacy/login')
+    def legacy_login(credentials: UserLogin, db: Session = Depends(get_db)):
+        user = db.query(User).filter(User.name == credentials.name).first()
+        if not user or not user.validate_password(credentials.password):
+            return {'code': 400}
+        return {'code': 200}
+
+
+async def catalogue_loop(client: httpx.AsyncClient, stop: asyncio.Event, latencies: List[float]) -> None:
+    page = 0
+    while not stop.is_set():
+        page = page % 50 + 1
+        start = time.perf_counter()
+        response = await client.get('/api/v1/vod_list', params={'page': page, 'movtype': 0})
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def login_loop(client: httpx.AsyncClient, path: str, users: int, worker: int, stop: asyncio.Event,
+                     codes: Dict[int, int]) -> None:
+    n = worker
+    while not stop.is_set():
+        n += 1
+        response = await client.post(path, json={'name': f'user{n % users + 1}', 'password': PASSWORD})
+        code = response.json()['code']
+        codes[code] = codes.get(code, 0) + 1
+        if code == 503:
+            await asyncio.sleep(0.05)
+
+
+async def run_phase(app, login_path: str, args) -> Dict[str, float]:
+    latencies: List[float] = []
+    codes: Dict[int, int] = {}
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+        tasks = [asyncio.create_task(catalogue_loop(client, stop, latencies)) for _ in range(args.readers)]
+        if login_path:
+            tasks += [asyncio.create_task(login_loop(client, login_path, args.users, i, stop, codes))
+                      for i in range(args.storm)]
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+    # 异步引擎的连接绑定在本阶段的事件循环上
+    await database.dispose_async_engine()
+    return {
+        'reads/s': len(latencies) / args.duration,
+        'p50': statistics.median(latencies) if latencies else 0.0,
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'logins/s': codes.get(200, 0) / args.duration,
+        'rejected': codes.get(503, 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--readers', type=int, default=4, help='并发请求 /vod_list 的客户端数')
+    parser.add_argument('--storm', type=int, default=32, help='并发请求登录的客户端数')
+    args = parser.parse_args()
+
+    url = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "bench.db")}'
+    _, Session = make_engine(url)
+    session = Session()
+    seed_catalogue(session, args.rows)
+    password_hash = hash_password(PASSWORD)
+    session.bulk_insert_mappings(User, [{'name': f'user{i}', 'password_hash': password_hash}
+                                        for i in range(1, args.users + 1)])
+    session.commit()
+    session.close()
+
+    database.configure_database(url)
+    response_cache_util._response_cache = ResponseCache(NullBackend())
+    from app.core.app_factory import create_app
+    app = create_app()
+    add_legacy_login(app)
+
+    hasher = get_password_hasher()
+    print(f'hasher: {hasher.workers} workers, queue {hasher.queue_size}, {hasher.method}; '
+          f'cpus: {os.cpu_count()}')
+    phases = [('catalogue only', None), ('storm: threadpool hashing', '/legacy/login'),
+              ('storm: process pool hashing', '/api/v1/auth/login')]
+    print(f'{"phase":<30}{"reads/s":>10}{"p50":>9}{"p95":>9}{"p99":>9}{"logins/s":>10}{"503s":>7}  (ms)')
+    for name, path in phases:
+        r = asyncio.run(run_phase(app, path, args))
+        print(f'{name:<30}{r["reads/s"]:>10.1f}{r["p50"]:>9.2f}{r["p95"]:>9.2f}{r["p99"]:>9.2f}'
+              f'{r["logins/s"]:>10.1f}{r["rejected"]:>7}')
+    hasher.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+关键词搜索基准：LIKE 全表扫描 vs 倒排索引缩小候选范围后再 LIKE
+
+同时检查两种方式返回的结果（全部命中行，按 vod_time 排序）完全一致；
+含字母数字或没有词元的关键词不使用索引（candidates 返回 None）。
+首页耗时: 使用索引的方式不得比 LIKE 慢超过 SLOWER_RATIO 倍加 SLOWER_MARGIN_MS 毫秒（常见词不应退化）。
+另检查增量写入索引失败后，新入库的视频仍能搜到（索引停用，退回 LIKE），
+以及重建期间有抓取任务写入索引时，重建结束后索引不标记为可用
+
+用法（在 fastapi-main 目录下）:
+    python -m benchmarks.bench_search --rows 70000
+"""
+import argparse
+import random
+import sys
+
+import app.search.index as search_index_module
+from app.api.v1.video import keyword_condition
+from app.models.models import MovDetail
+from app.search import SearchIndex, rebuild_index
+from app.task.tasks import update_search_index
+from benchmarks.common import fake_mov_detail, make_engine, seed_catalogue, timeit, print_table
+
+# 海贼、张伟、海 为常见词（命中大部分行）
+KEYWORDS = ["海贼", "魔法少年", "张伟", "星空王国", "不存在的词", "海", "one", "！！"]
+# 首页耗时允许的退化: index 均值 <= like 均值 * SLOWER_RATIO + SLOWER_MARGIN_MS
+SLOWER_RATIO = 1.5
+SLOWER_MARGIN_MS = 0.5
+
+
+def like_search(session, keyword: str, limit: int = None):
+    query = (session.query(MovDetail.id)
+             .filter(keyword_condition(keyword))
+             .order_by(MovDetail.vod_time.desc(), MovDetail.id.desc()))
+    return [row.id for row in query.limit(limit)]
+
+
+def index_search(session, index: SearchIndex, keyword: str, limit: int = None):
+    query = session.query(MovDetail.id)
+    candidates = index.candidates(keyword)
+    if candidates is not None:
+        query = query.filter(MovDetail.vod_id.in_(candidates))
+    query = query.filter(keyword_condition(keyword)).order_by(MovDetail.vod_time.desc(), MovDetail.id.desc())
+    return [row.id for row in query.limit(limit)]
+
+
+def failed_index_write_falls_back(session, index: SearchIndex) -> bool:
+    """增量写入索引失败时，新入库的视频仍能搜到"""
+    vod_id = session.query(MovDetail.vod_id).order_by(MovDetail.vod_id.desc()).limit(1).scalar() + 1
+    doc = fake_mov_detail(vod_id, random.Random(0))
+    doc['vod_name'] = '雪国列车'
+    session.add(MovDetail(**doc))
+    session.commit()
+
+    def failing_index_documents(docs):
+        raise RuntimeError('index write failed')
+
+    search_index_module._search_index = index
+    index.index_documents = failing_index_documents
+    try:
+        update_search_index([doc])
+    finally:
+        del index.index_documents
+    new_id = session.query(MovDetail.id).filter(MovDetail.vod_id == vod_id).scalar()
+    return not index.is_ready() and new_id in index_search(session, index, '雪国列车')
+
+
+def rebuild_with_concurrent_write_stays_stale(session) -> bool:
+    """重建期间有其他写入（模拟抓取任务在重建读到的批次之后更新了索引）时，索引不标记为可用"""
+    index = SearchIndex()
+    index_documents = index.index_documents
+
+    def index_with_crawl_write(docs):
+        written = index_documents(docs)
+        index_documents([{'vod_id': docs[0]['vod_id'], 'vod_name': '抓取任务写入'}])
+        return written
+
+    index.index_documents = index_with_crawl_write
+    rebuild_index(session, index)
+    del index.index_documents
+    stale = not index.is_ready()
+    rebuild_index(session, index)
+    return stale and index.is_ready()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    _, Session = make_engine()
+    session = Session()
+    seed_catalogue(session, args.rows)
+
+    index = SearchIndex()
+    build = timeit(lambda: rebuild_index(session, index), repeat=1)
+    print(f'rows={args.rows} index_build={build["mean"]:.0f}ms')
+
+    mismatched = []
+    slower = []
+    results = {}
+    for keyword in KEYWORDS:
+        like_ids, index_ids = like_search(session, keyword), index_search(session, index, keyword)
+        candidates = index.candidates(keyword)
+        print(f'{keyword:<8} hits={len(like_ids):>6} '
+              f'candidates={"LIKE only" if candidates is None else len(candidates)} same={like_ids == index_ids}')
+        if like_ids != index_ids:
+            mismatched.append(keyword)
+        like = results[f'like   {keyword}'] = timeit(lambda: like_search(session, keyword, 12), args.repeat)
+        indexed = results[f'index  {keyword}'] = timeit(lambda: index_search(session, index, keyword, 12),
+                                                        args.repeat)
+        if indexed['mean'] > like['mean'] * SLOWER_RATIO + SLOWER_MARGIN_MS:
+            slower.append(f'{keyword} {indexed["mean"]:.2f}ms vs {like["mean"]:.2f}ms')
+    print_table('keyword search latency (first page)', results)
+
+    failed = []
+    if slower:
+        failed.append(f'index slower than LIKE on the first page: {slower}')
+    if mismatched:
+        failed.append(f'results differ from LIKE: {mismatched}')
+    if not failed_index_write_falls_back(session, index):
+        failed.append('new row missing after a failed index write')
+    if not rebuild_with_concurrent_write_stays_stale(session):
+        failed.append('rebuild marked ready despite a concurrent index write')
+    session.close()
+    for reason in failed:
+        print(f'FAIL {reason}')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
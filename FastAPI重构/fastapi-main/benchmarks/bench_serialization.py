@@ -0,0 +1,155 @@
+"""
+响应序列化基准：response_model=dict + JSONResponse（旧实现） vs 类型化 response_model vs 直接返回 ORJSONResponse
+
+1. 序列化本身：对视频列表页、大列表（--large 条）、视频详情（全部列 + 播放列表）分别测量
+   - dict model + json:  FastAPI 按 response_model=dict 校验并序列化，再由 JSONResponse 用 json.dumps 编码
+   - no model + json:    不声明 response_model，jsonable_encoder 逐个遍历字段后 json.dumps
+   - typed model + json: 按 VodListResponse / VodDetailResponse 校验并序列化后 json.dumps
+   - validate + resp_json: 按模型 model_validate().model_dump() 后用 orjson 编码（当前实现未命中缓存时）
+   - resp_json:          缓存命中时直接返回已校验数据的 ORJSONResponse，跳过校验与 jsonable_encoder
+2. 完整请求：在同一个应用（含全部中间件）上注册返回相同数据的旧接口与新接口，用 TestClient 请求
+3. 检查新旧响应解析后完全一致，与 FastAPI 按类型化 response_model 的输出一致，且详情只包含 VodDetailOut 的字段
+
+用法（在 fastapi-main 目录下）:
+    python -m benchmarks.bench_serialization --rows 2000 --large 1000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+os.environ.setdefault('QUERY_PROFILING', 'false')
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.v1.video import query_vod_detail, query_vod_list
+from app.models import database
+from app.models.models import MovDetail
+from app.models.projections import to_vod_list_items, vod_list_query
+from app.schemas.video import VodDetailOut, VodDetailResponse, VodListResponse
+from app.utils import response_cache_util
+from app.utils.response_cache_util import MemoryBackend, ResponseCache
+from app.utils.response_util import resp_json, resp_page
+from benchmarks.common import make_engine, print_table, seed_catalogue, timeit
+
+
+def build_payloads(Session, large: int):
+    """
+    用接口的查询函数生成真实响应数据
+
+    Returns:
+        {名称: (按 response_model 校验后的响应字典, 类型化 response_model)}
+    """
+    session = Session()
+    try:
+        page = query_vod_list(session, page=1)
+        items = to_vod_list_items(vod_list_query(session).order_by(MovDetail.id).limit(large))
+        # 集数最多（播放列表最长）的视频
+        vod_id = max(session.query(MovDetail.id, MovDetail.vod_play_url),
+                     key=lambda row: (row.vod_play_url or '').count('#')).id
+        detail = {"code": 200, "data": query_vod_detail(session, vod_id), "msg": "success"}
+    finally:
+        session.close()
+    payloads = {
+        f'vod_list ({len(page["data"])})': (page, VodListResponse),
+        f'vod_list ({len(items)})': (resp_page(items, 'success'), VodListResponse),
+        'vod_detail': (detail, VodDetailResponse),
+    }
+    return {name: (model.model_validate(payload).model_dump(), model) for name, (payload, model) in payloads.items()}
+
+
+def render_with_model(payload, field) -> bytes:
+    """FastAPI 对返回 dict 的接口的处理：按 response_model 校验、序列化，再由 JSONResponse 编码"""
+    # is_coroutine=True 时 serialize_response 内部没有真正的 await，直接驱动协程，不把事件循环开销计入
+    coroutine = serialize_response(field=field, response_content=payload)
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return JSONResponse(done.value).body
+    raise RuntimeError('serialize_response suspended unexpectedly')
+
+
+def render_without_model(payload) -> bytes:
+    """未声明 response_model 时：jsonable_encoder 遍历后由 JSONResponse 编码"""
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def add_bench_routes(app, payloads) -> None:
+    """注册返回相同数据的旧接口（dict + JSONResponse）与新接口（resp_json）"""
+    for index, (payload, model) in enumerate(payloads.values()):
+        def legacy(payload=payload):
+            return payload
+
+        def fast(payload=payload):
+            return resp_json(payload)
+
+        app.add_api_route(f'/bench/legacy/{index}', legacy, response_model=dict, response_class=JSONResponse)
+        app.add_api_route(f'/bench/fast/{index}', fast, response_model=model)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--large', type=int, default=1000, help='大列表条数')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    url = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "serialization.db")}'
+    _, Session = make_engine(url)
+    session = Session()
+    seed_catalogue(session, args.rows)
+    session.close()
+    payloads = build_payloads(Session, args.large)
+
+    failures = []
+    dict_field = create_response_field(name='dict_response', type_=dict)
+    for name, (payload, model) in payloads.items():
+        typed_field = create_response_field(name='typed_response', type_=model)
+        legacy = render_with_model(payload, dict_field)
+        fast = resp_json(model.model_validate(payload).model_dump()).body
+        same = json.loads(legacy) == json.loads(fast) == json.loads(render_with_model(payload, typed_field))
+        if not same:
+            failures.append(name)
+        print(f'{name:<20} {len(fast) / 1024:>8.1f} KB  same_as_legacy={same}')
+        print_table(f'serialize {name}', {
+            'dict model + json': timeit(lambda: render_with_model(payload, dict_field), args.repeat),
+            'no model + json': timeit(lambda: render_without_model(payload), args.repeat),
+            'typed model + json': timeit(lambda: render_with_model(payload, typed_field), args.repeat),
+            'validate + resp_json': timeit(lambda: resp_json(model.model_validate(payload).model_dump()).body,
+                                           args.repeat),
+            'resp_json (orjson)': timeit(lambda: resp_json(payload).body, args.repeat),
+        })
+
+    detail_fields = set(payloads['vod_detail'][0]['data'])
+    if detail_fields != set(VodDetailOut.model_fields):
+        failures.append(f'vod_detail fields {sorted(detail_fields ^ set(VodDetailOut.model_fields))}')
+
+    from fastapi.testclient import TestClient
+    database.configure_database(url)
+    response_cache_util._response_cache = ResponseCache(MemoryBackend())
+    from app.core.app_factory import create_app
+    app = create_app()
+    add_bench_routes(app, payloads)
+    client = TestClient(app)
+    for index, name in enumerate(payloads):
+        legacy = client.get(f'/bench/legacy/{index}')
+        fast = client.get(f'/bench/fast/{index}')
+        if legacy.json() != fast.json():
+            failures.append(f'{name} over http')
+        print_table(f'GET {name} (full request)', {
+            'dict model + JSONResponse': timeit(lambda: client.get(f'/bench/legacy/{index}'), args.repeat),
+            'resp_json (ORJSONResponse)': timeit(lambda: client.get(f'/bench/fast/{index}'), args.repeat),
+        })
+    client.close()
+
+    if failures:
+        print(f'\nFAIL responses differ: {failures}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
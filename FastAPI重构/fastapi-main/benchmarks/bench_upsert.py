@@ -0,0 +1,126 @@
+"""
+movdetail 入库基准：逐行查询+逐行提交+全列覆盖（旧实现） vs 整页 IN 查询+按内容摘要增量写入
+
+按数据源分页（每页 20 条）写入，分别统计全新数据、半数已存在且内容变化、全部已存在且只有 vod_time 变化
+三种情况下的 rows/s、每页 SQL 语句数、事务数和 UPDATE/INSERT 写入的参数字节数，
+并检查写入后库中每个 vod_id 恰有一行且各列与最后写入的数据一致，不一致时以非零状态码退出
+
+用法（在 fastapi-main 目录下）:
+    python -m benchmarks.bench_upsert --rows 4000
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import event
+
+from app.models.models import MovDetail
+from app.task.upsert import movdetail_columns, upsert_movdetails
+from app.utils.vod_util import normalize_mov_detail
+from benchmarks.common import make_engine, fake_mov_detail, count_queries
+
+PER_PAGE = 20
+
+
+def legacy_write_page(session, mov_list):
+    """旧实现：每条记录一次查询，更新逐条提交，新增在页末 bulk insert"""
+    need_insert_mov_list = []
+    for mov_detail in mov_list:
+        avalon_mov_detail = session.query(MovDetail).filter_by(vod_id=mov_detail['vod_id']).first()
+        if avalon_mov_detail:
+            for k, v in mov_detail.items():
+                if hasattr(avalon_mov_detail, k):
+                    setattr(avalon_mov_detail, k, v)
+            session.commit()
+        else:
+            need_insert_mov_list.append(mov_detail)
+    if need_insert_mov_list:
+        session.bulk_insert_mappings(MovDetail, need_insert_mov_list)
+        session.commit()
+
+
+def make_pages(rows: int, first_id: int, seed: int, time_shift: datetime.timedelta = None):
+    rnd = random.Random(seed)
+    docs = [normalize_mov_detail(fake_mov_detail(vod_id, rnd)) for vod_id in range(first_id, first_id + rows)]
+    if time_shift:
+        for doc in docs:
+            doc['vod_time'] += time_shift
+    return [docs[i:i + PER_PAGE] for i in range(0, rows, PER_PAGE)]
+
+
+def stored_matches(session, pages) -> bool:
+    """库中每个 vod_id 恰有一行, 且表中的列与写入的数据一致（按字符串比较）"""
+    expected = {doc['vod_id']: doc for page in pages for doc in page}
+    columns = sorted(c for c in movdetail_columns if c not in ('id', 'content_hash'))
+    stored = {}
+    for row in session.query(*[getattr(MovDetail, c) for c in columns]):
+        values = dict(zip(columns, row))
+        if values['vod_id'] in stored:
+            return False
+        stored[values['vod_id']] = values
+    return set(stored) == set(expected) and all(
+        str(stored[vod_id][c]) == str(doc[c]) for vod_id, doc in expected.items() for c in columns if c in doc)
+
+
+def run(write_page, rows: int, existing_ratio: float, touch_only: bool = False):
+    """返回 (rows/s, 每页语句数, 每页事务数, 每页写入字节数, 写入结果是否正确)"""
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    engine, Session = make_engine(f'sqlite:///{path}')
+    session = Session()
+    existing = int(rows * existing_ratio)
+    if existing:
+        # 已存在的数据: vod_id 1..existing, 通过增量写入入库 (带内容摘要)
+        for page in make_pages(existing, 1, seed=1):
+            upsert_movdetails(session, page)
+    if touch_only:
+        # 写入的数据与已存在的数据相同, 只有 vod_time 更新
+        pages = make_pages(rows, 1, seed=1, time_shift=datetime.timedelta(days=1))
+    else:
+        # 写入的数据: 前 existing 条更新已有 vod_id (内容变化)，其余为新 vod_id
+        pages = make_pages(rows, 1, seed=2)
+
+    commits = []
+    written = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith(('INSERT', 'UPDATE')):
+            params = parameters if executemany else [parameters]
+            written.append(sum(len(str(value).encode('utf-8')) for row in params for value in row))
+
+    event.listen(engine, 'commit', lambda conn: commits.append(1))
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    with count_queries(engine) as statements:
+        start = time.perf_counter()
+        for page in pages:
+            write_page(session, page)
+        elapsed = time.perf_counter() - start
+    ok = stored_matches(session, pages)
+    session.close()
+    engine.dispose()
+    return rows / elapsed, len(statements) / len(pages), len(commits) / len(pages), sum(written) / len(pages), ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=4000)
+    args = parser.parse_args()
+
+    print(f'{"case":<32}{"rows/s":>10}{"stmts/page":>12}{"txns/page":>11}{"bytes/page":>12}{"stored ok":>11}')
+    cases = (('new', 0.0, False), ('50% changed', 0.5, False), ('100% vod_time only', 1.0, True))
+    failures = []
+    for case, existing_ratio, touch_only in cases:
+        for name, write_page in (('legacy', legacy_write_page), ('delta', upsert_movdetails)):
+            rate, statements, commits, written, ok = run(write_page, args.rows, existing_ratio, touch_only)
+            label = f'{name} {case}'
+            print(f'{label:<32}{rate:>10.0f}{statements:>12.1f}{commits:>11.1f}{written:>12.0f}{str(ok):>11}')
+            if not ok:
+                failures.append(label)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
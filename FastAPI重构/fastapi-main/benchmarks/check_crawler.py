@@ -0,0 +1,220 @@
+"""
+抓取任务检查与基准
+对本地模拟数据源 (benchmarks.fake_provider) 运行 SakuraData 全量抓取与 SakuarDataSchedule 增量更新，检查:
+    - 全量抓取写入全部页面
+    - 增量更新按页码顺序判断停止条件，不写入、不遗漏
+    - 检查点: 记录失败页面、只重试失败页面、续跑跳过已完成页面、刷新时跳过内容未变化的页面
+    - 批量写入失败时, 记为完成的页面数据完整, 失败批次涉及的页面都记为失败
+    - 5xx 与超时按退避重试后成功
+并对比不同并发数下的全量抓取耗时，任一检查失败时以非零状态码退出
+
+用法（在 fastapi-main 目录下）:
+    python -m benchmarks.check_crawler --rows 2000 --latency 0.05
+"""
+import argparse
+import copy
+import datetime
+import functools
+import sys
+import time
+
+import app.search.index as search_index_module
+import app.task.tasks as tasks_module
+import app.utils.response_cache_util as response_cache_module
+from app.models.models import CrawlPageState, MovDetail, MovInfo
+from app.search import SearchIndex
+from app.task.pipeline import IngestPipeline
+from app.task.tasks import SakuraData, SakuarDataSchedule
+from app.task.crawler import PageFetcher, FetchError
+from benchmarks.common import make_engine
+from benchmarks.fake_provider import FakeProvider
+
+failures = []
+
+
+def check(name: str, ok: bool, detail: str = '') -> None:
+    print(f'{"ok  " if ok else "FAIL"} {name} {detail}')
+    if not ok:
+        failures.append(name)
+
+
+def full_crawl(provider: FakeProvider, concurrency: int):
+    """全量抓取 list 与 detail，返回 (耗时, Session 工厂, detail 流水线)"""
+    _, Session = make_engine()
+    search_index_module._search_index = SearchIndex()
+    start = time.perf_counter()
+    sakura = SakuraData(api_url=provider.api_url, concurrency=concurrency, session_factory=Session)
+    sakura.insert_mov_type()
+    sakura.crawl_mov_info_all()
+    pipeline = sakura.crawl_mov_detail_all()
+    return time.perf_counter() - start, Session, pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.02, help='模拟数据源每次请求的延迟秒数')
+    args = parser.parse_args()
+    response_cache_module._response_cache = response_cache_module.ResponseCache(response_cache_module.MemoryBackend())
+
+    with FakeProvider.synthetic(args.rows) as provider:
+        page_count = provider.pages[('detail', 1)]['pagecount']
+        provider.latency = args.latency
+
+        # 全量抓取: 不同并发数
+        timings = {}
+        for concurrency in (1, 4, 16):
+            elapsed, Session, pipeline = full_crawl(provider, concurrency)
+            timings[concurrency] = (elapsed, pipeline)
+            session = Session()
+            detail_count = session.query(MovDetail).count()
+            info_count = session.query(MovInfo).count()
+            session.close()
+            check(f'full crawl concurrency={concurrency}', detail_count == args.rows and info_count == args.rows,
+                  f'detail={detail_count} info={info_count} pages={page_count} {elapsed:.2f}s')
+
+        # 增量更新: 数据库已有前 stale_from 页之后的旧数据, 只应抓取到第一个全是旧数据的页面为止
+        _, Session = make_engine()
+        search_index_module._search_index = SearchIndex()
+        sakura = SakuraData(api_url=provider.api_url, concurrency=4, session_factory=Session)
+        sakura.insert_mov_type()
+        stale_from = 4
+        for page in range(stale_from, page_count + 1):
+            sakura.save_mov_detail(page, copy.deepcopy(provider.pages[('detail', page)]))
+        provider.requests.clear()
+        schedule = SakuarDataSchedule(api_url=provider.api_url, concurrency=4, session_factory=Session)
+        schedule.get_sakura_data()
+        session = Session()
+        detail_count = session.query(MovDetail).count()
+        duplicated = detail_count - session.query(MovDetail.vod_id).distinct().count()
+        session.close()
+        fetched = sorted(page for ac, page in provider.requests if ac == 'detail')
+        check('incremental update inserts missing pages', detail_count == args.rows and duplicated == 0,
+              f'rows={detail_count} duplicated={duplicated}')
+        # 停止条件: 某页最后一条记录不晚于库中最新日期的零点 (get_avalon_latest_time 按天截断)
+        latest = datetime.datetime.strptime(provider.pages[('detail', stale_from)]['list'][0]['vod_time'][:10],
+                                            '%Y-%m-%d')
+        stop_page = next(page for page in range(1, page_count + 1)
+                         if provider.pages[('detail', page)]['list'][-1]['vod_time'] <= str(latest))
+        # 停止前已抓取的页面最多为: 抓取并发数 + 流水线队列中的页面
+        max_extra = schedule.concurrency + schedule.pipeline.queue_size + 1
+        check('incremental update stops early', stop_page <= max(fetched) <= stop_page + max_extra,
+              f'stop page={stop_page} fetched pages={fetched[0]}..{fetched[-1]}')
+
+        # 检查点: 第 5 页持续失败 -> 只重试失败页 -> 已完成时续跑不再抓取 -> 刷新时跳过未变化的页面
+        provider.latency = 0
+        _, Session = make_engine()
+        search_index_module._search_index = SearchIndex()
+        sakura = SakuraData(api_url=provider.api_url, concurrency=4, session_factory=Session)
+        sakura.fetcher.backoff = 0.01
+        provider.fail = lambda ac, page, attempt: 503 if page == 5 else None
+        sakura.crawl_mov_detail_all()
+        session = Session()
+        detail_count = session.query(MovDetail).count()
+        session.close()
+        check('checkpoint records failed page', sakura.crawl_summary['failed'] == 1
+              and detail_count == args.rows - 20, f'{sakura.crawl_summary} rows={detail_count}')
+
+        provider.fail = None
+        provider.requests.clear()
+        sakura.crawl_mov_detail_all(mode='failed')
+        session = Session()
+        detail_count = session.query(MovDetail).count()
+        session.close()
+        check('retry failed pages only', list(provider.requests) == [('detail', 5)] and detail_count == args.rows,
+              f'requests={dict(provider.requests)} rows={detail_count}')
+
+        provider.requests.clear()
+        sakura.crawl_mov_detail_all(mode='resume')
+        check('resume skips completed pages', not provider.requests, f'requests={len(provider.requests)}')
+
+        changed = provider.pages[('detail', 7)]['list'][0]
+        changed['vod_remarks'] = '已完结'
+        provider.requests.clear()
+        sakura.crawl_mov_detail_all(mode='refresh')
+        session = Session()
+        remarks = session.query(MovDetail.vod_remarks).filter(MovDetail.vod_id == changed['vod_id']).scalar()
+        session.close()
+        check('refresh skips unchanged pages', sakura.crawl_summary['unchanged'] == page_count - 1
+              and remarks == '已完结' and len(provider.requests) == page_count,
+              f'{sakura.crawl_summary} remarks={remarks}')
+        # 变化页面中只有一条记录的一列变化, 其余记录不写入
+        check('delta ingest emits change-set', sakura.changes.updated == {int(changed['vod_id']): ['vod_remarks']}
+              and not sakura.changes.inserted and len(sakura.changes.unchanged) == 19, repr(sakura.changes))
+
+        # 数据源支持 ETag 时, 刷新对未变化的页面发送条件请求, 只下载变化的页面
+        provider.etags = True
+        sakura.crawl_mov_detail_all(mode='refresh')
+        changed['vod_remarks'] = '更新至99集'
+        provider.status.clear()
+        sakura.crawl_mov_detail_all(mode='refresh')
+        check('refresh sends conditional requests', provider.status[304] == page_count - 1
+              and provider.status[200] == 1, str(dict(provider.status)))
+        provider.etags = False
+
+        # 批量写入失败: 每批 30 行（每页 20 行）, 含第 3 页数据的那一批写入失败
+        _, Session = make_engine()
+        search_index_module._search_index = SearchIndex()
+        sakura = SakuraData(api_url=provider.api_url, concurrency=1, session_factory=Session)
+        sakura.insert_mov_type()
+        poisoned = provider.pages[('detail', 3)]['list'][5]['vod_id']
+        write_mov_detail = sakura.write_mov_detail
+
+        def failing_write(session, rows):
+            if any(row['vod_id'] == poisoned for row in rows):
+                raise RuntimeError('write failed')
+            return write_mov_detail(session, rows)
+
+        sakura.write_mov_detail = failing_write
+        tasks_module.IngestPipeline = functools.partial(IngestPipeline, batch_size=30)
+        try:
+            sakura.crawl_mov_detail_all()
+        finally:
+            tasks_module.IngestPipeline = IngestPipeline
+        session = Session()
+        stored = {vod_id for (vod_id,) in session.query(MovDetail.vod_id)}
+        states = {state.page: state.status for state in session.query(CrawlPageState)
+                  .filter(CrawlPageState.crawl == 'detail')}
+        session.close()
+        incomplete = [page for page, status in states.items() if status == 'done'
+                      and any(row['vod_id'] not in stored for row in provider.pages[('detail', page)]['list'])]
+        check('failed batch fails every page it touched', not incomplete and states.get(3) == 'failed',
+              f'failed={sorted(page for page, status in states.items() if status != "done")} '
+              f'done but incomplete={incomplete}')
+
+        # 重试: 第 2 页前两次返回 503, 第 3 页第一次超时
+        provider.latency = 0
+        provider.requests.clear()
+
+        def fail(ac, page, attempt):
+            if page == 2 and attempt <= 2:
+                return 503
+            if page == 3 and attempt == 1:
+                time.sleep(0.5)
+            return None
+
+        provider.fail = fail
+        fetcher = PageFetcher(api_url=provider.api_url, timeout=0.2, retries=3, backoff=0.01)
+        ok = fetcher.fetch('detail', 2)['page'] == 2 and fetcher.fetch('detail', 3)['page'] == 3
+        check('retry 5xx and timeout', ok and provider.requests[('detail', 2)] == 3
+              and provider.requests[('detail', 3)] == 2, str(dict(provider.requests)))
+        provider.fail = lambda ac, page, attempt: 503
+        try:
+            PageFetcher(api_url=provider.api_url, retries=2, backoff=0.01).fetch('detail', 1)
+            check('retries exhausted raises FetchError', False)
+        except FetchError as e:
+            check('retries exhausted raises FetchError', True, e.reason)
+        provider.fail = None
+
+    print(f'\nfull crawl of {args.rows} rows ({page_count} pages x2), latency {args.latency * 1000:.0f}ms')
+    for concurrency, (elapsed, pipeline) in timings.items():
+        print(f'  concurrency={concurrency:<3} {elapsed:>7.2f}s  {page_count * 2 / elapsed:>8.1f} pages/s')
+        for stage in pipeline.metrics():
+            print(f'      {stage["stage"]:<6} items={stage["items"]:<6} busy={stage["busy_s"]:>6.2f}s '
+                  f'blocked={stage["blocked_s"]:>6.2f}s max={stage["max_ms"]:>7.1f}ms {stage["per_s"]:>8.1f}/s')
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+请求指标检查
+
+1. 异步读接口（AsyncSession + greenlet）与同步写接口（线程池）的 SQL 语句数、数据库耗时、行数都计入对应路由
+2. 慢请求日志包含请求执行的 SQL
+3. gun.conf 设置 PROMETHEUS_MULTIPROC_DIR、启动时清空该目录并注册 child_exit 钩子；
+   两个 worker 进程的指标在 /metrics 中汇总
+4. METRICS_ENABLED 关闭时不注册 /metrics
+
+用法（在 fastapi-main 目录下）:
+    python -m benchmarks.check_metrics
+"""
+import logging
+import os
+import runpy
+import subprocess
+import sys
+import tempfile
+
+failures = []
+
+WORKER = '''
+import sys
+from fastapi.testclient import TestClient
+from app.models import database
+from app.utils import response_cache_util
+from app.utils.response_cache_util import MemoryBackend, ResponseCache
+database.configure_database(sys.argv[1])
+response_cache_util._response_cache = ResponseCache(MemoryBackend())
+from app.core.app_factory import create_app
+client = TestClient(create_app())
+for _ in range(int(sys.argv[2])):
+    client.get('/api/v1/vod_detail', params={'vod_id': 1})
+client.close()
+'''
+
+
+def check(name: str, ok: bool, detail: str = '') -> None:
+    print(f'{"ok  " if ok else "FAIL"} {name} {detail}')
+    if not ok:
+        failures.append(name)
+
+
+def sample(text: str, name: str, **labels) -> float:
+    """读取指标文本中名称与标签都匹配的样本值之和"""
+    total = 0.0
+    for line in text.splitlines():
+        if line.startswith('#') or not line.startswith(name + '{'):
+            continue
+        series, value = line.rsplit(' ', 1)
+        if all(f'{key}="{val}"' in series for key, val in labels.items()):
+            total += float(value)
+    return total
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record.getMessage())
+
+
+def check_single_process(url: str):
+    from fastapi.testclient import TestClient
+    from app.core.security import require_auth
+    from app.models import database
+    from app.utils import response_cache_util
+    from app.utils.response_cache_util import MemoryBackend, ResponseCache
+
+    database.configure_database(url)
+    response_cache_util._response_cache = ResponseCache(MemoryBackend())
+    from app.core.app_factory import create_app
+    app = create_app()
+    app.dependency_overrides[require_auth] = lambda: None
+    client = TestClient(app)
+
+    handler = ListHandler()
+    logging.getLogger('app.utils.metrics_util').addHandler(handler)
+    os.environ['SLOW_REQUEST_MS'] = '0'
+    from app.core.config import reload_settings
+    reload_settings()
+
+    client.get('/api/v1/vod_list', params={'movtype': 0})
+    client.get('/api/v1/vod_detail', params={'vod_id': 3})
+    client.post('/api/v1/publish/comment/3', json={'body': '好看', 'user_id': 1})
+    client.get('/api/v1/no_such_route')
+    text = client.get('/metrics').text
+    client.close()
+
+    detail_route = dict(method='GET', route='/api/v1/vod_detail')
+    check('latency histogram per route', sample(text, 'sakura_http_request_duration_seconds_count',
+                                                status='200', **detail_route) == 1)
+    statements = sample(text, 'sakura_http_request_db_statements_sum', **detail_route)
+    check('async read statements counted', statements >= 1, f'statements={statements}')
+    comment_route = dict(method='POST', route='/api/v1/publish/comment/{vod_id}')
+    statements = sample(text, 'sakura_http_request_db_statements_sum', **comment_route)
+    check('threadpool write statements counted', statements >= 1, f'statements={statements}')
+    check('db time recorded', sample(text, 'sakura_http_request_db_seconds_sum', **detail_route) > 0)
+    check('response bytes recorded', sample(text, 'sakura_http_response_bytes_total', **detail_route) > 0)
+    check('unmatched routes share one label', sample(text, 'sakura_http_request_duration_seconds_count',
+                                                     route='unmatched') == 1)
+    slow = [message for message in handler.records if '/api/v1/vod_detail' in message]
+    check('slow request logged with sql', bool(slow) and 'SELECT' in slow[0], slow[0].splitlines()[0] if slow else '')
+
+    os.environ['METRICS_ENABLED'] = 'false'
+    reload_settings()
+    try:
+        with TestClient(create_app()) as disabled:
+            status = disabled.get('/metrics').status_code
+    finally:
+        del os.environ['METRICS_ENABLED']
+        reload_settings()
+    check('/metrics not registered when METRICS_ENABLED is off', status == 404, f'status={status}')
+
+
+def load_gunicorn_config(metrics_dir: str) -> dict:
+    """按 gunicorn 的方式加载 gun.conf 并执行 on_starting；不改变当前进程的环境变量"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = metrics_dir
+    try:
+        config = runpy.run_path(os.path.join(root, 'app', 'config', 'config', 'gun.conf'))
+        config['on_starting'](None)
+    finally:
+        del os.environ['PROMETHEUS_MULTIPROC_DIR']
+    return config
+
+
+def check_multiprocess(url: str):
+    metrics_dir = tempfile.mkdtemp()
+    stale = os.path.join(metrics_dir, 'histogram_1.db')
+    open(stale, 'w').close()
+    config = load_gunicorn_config(metrics_dir)
+    check('gun.conf clears the multiprocess dir on start', os.path.isdir(metrics_dir) and not os.path.exists(stale))
+    check('gun.conf registers child_exit', callable(config.get('child_exit')))
+
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=metrics_dir)
+    for count in (3, 4):
+        subprocess.run([sys.executable, '-c', WORKER, url, str(count)], env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    code = ('from app.utils.metrics_util import metrics_response_body;'
+            'import sys; sys.stdout.write(metrics_response_body()[0].decode())')
+    text = subprocess.run([sys.executable, '-c', code], env=env, check=True, capture_output=True,
+                          text=True).stdout
+    count = sample(text, 'sakura_http_request_duration_seconds_count', route='/api/v1/vod_detail')
+    check('metrics aggregated across workers', count == 7, f'count={count}')
+
+
+def main():
+    from app.models.models import User
+    from benchmarks.common import make_engine, seed_catalogue
+
+    url = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "metrics.db")}'
+    _, Session = make_engine(url)
+    session = Session()
+    seed_catalogue(session, 20)
+    session.add(User(id=1, name='user1', password_hash='x'))
+    session.commit()
+    session.close()
+
+    check_multiprocess(url)
+    check_single_process(url)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
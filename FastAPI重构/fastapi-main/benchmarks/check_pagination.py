@@ -0,0 +1,98 @@
+"""
+游标分页检查
+
+1. 同一秒内写入的多条评论（时间只差微秒或完全相同）逐页翻完不丢行、不重复
+2. 排序时间为 NULL 的视频排在最后，游标分页能翻到
+3. 旧版只精确到秒的游标仍可解析
+4. NDJSON 评论导出包含视频的全部顶层评论与回复
+
+用法（在 fastapi-main 目录下）:
+    python -m benchmarks.check_pagination
+"""
+import datetime
+import json
+import os
+import sys
+import tempfile
+
+from app.api.v1.comment import iter_comment_export, query_comments_page
+from app.models.models import Comment, MovDetail
+from app.models.projections import vod_list_query
+from app.utils.pagination_util import decode_cursor, keyset_page
+from benchmarks.common import make_engine, seed_catalogue
+
+failures = []
+
+
+def check(name: str, ok: bool, detail: str = '') -> None:
+    print(f'{"ok  " if ok else "FAIL"} {name} {detail}')
+    if not ok:
+        failures.append(name)
+
+
+def seed_same_second_comments(session, vod_id: int, count: int) -> list:
+    """在同一秒内写入 count 条顶层评论，其中每 5 条的时间完全相同"""
+    base = datetime.datetime(2024, 1, 1, 12, 0, 0)
+    comments = [Comment(body=f'c{i}', movdetail_id=vod_id,
+                        timestamp=base + datetime.timedelta(microseconds=i // 5 * 997))
+                for i in range(count)]
+    session.add_all(comments)
+    session.commit()
+    return sorted(comment.id for comment in comments)
+
+
+def seed_replies(session, root_ids: list) -> list:
+    """给每条顶层评论写入一条同一时刻的回复"""
+    replies = [Comment(body=f'r{root_id}', replied_id=root_id, root_id=root_id,
+                       timestamp=datetime.datetime(2024, 1, 1, 12, 0, 1))
+               for root_id in root_ids]
+    session.add_all(replies)
+    session.commit()
+    return sorted(reply.id for reply in replies)
+
+
+def page_all(fetch) -> list:
+    """从第一页翻到最后一页，返回全部 id"""
+    ids, cursor, pages = [], '', 0
+    while cursor is not None and pages < 1000:
+        rows, cursor = fetch(cursor)
+        ids.extend(rows)
+        pages += 1
+    return ids
+
+
+def main():
+    url = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "pagination.db")}'
+    _, Session = make_engine(url)
+    session = Session()
+    seed_catalogue(session, 30)
+    expected = seed_same_second_comments(session, 1, 50)
+
+    ids = page_all(lambda cursor: (lambda page: ([item['id'] for item in page[0]], page[1]))(
+        query_comments_page(session, 1, cursor, 7, 0)))
+    check('same-second comments paged completely', sorted(ids) == expected and len(ids) == len(set(ids)),
+          f'{len(ids)}/{len(expected)} rows')
+
+    reply_ids = seed_replies(session, expected)
+    lines = [json.loads(line) for line in iter_comment_export(1, batch_size=7, session_factory=Session)]
+    exported = sorted(item['id'] for item in lines)
+    exported_replies = sorted(reply['id'] for item in lines for reply in item['reply_list'])
+    check('export contains every comment', exported == expected and exported_replies == reply_ids,
+          f'{len(exported)}/{len(expected)} threads, {len(exported_replies)}/{len(reply_ids)} replies')
+
+    session.query(MovDetail).filter(MovDetail.id % 4 == 0).update({MovDetail.vod_time: None},
+                                                                   synchronize_session=False)
+    session.commit()
+    rows = page_all(lambda cursor: (lambda page: ([row.id for row in page[0]], page[1]))(
+        keyset_page(vod_list_query(session), MovDetail.vod_time, MovDetail.id, cursor=cursor, per_page=4)))
+    check('null sort keys paged after dated rows', sorted(rows) == list(range(1, 31)) and len(rows) == 30,
+          f'{len(rows)}/30 rows, tail={rows[-7:]}')
+    session.close()
+
+    legacy = 'MjAyMy0wMS0wMSAwMDowMDowMHwxMDA'  # "2023-01-01 00:00:00|100"
+    check('second-precision cursor still accepted', decode_cursor(legacy) == (datetime.datetime(2023, 1, 1), 100))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+SQL 分析检查（开发模式）
+
+1. 响应头包含 Server-Timing（db 耗时与语句数）
+2. 逐行懒加载关系的接口被报告为 N+1（响应头与日志）
+3. 慢语句日志附带 EXPLAIN 结果
+4. assert_query_budget 与 pytest 插件在超出预算时失败（未安装 pytest 时跳过插件检查）
+
+用法（在 fastapi-main 目录下）:
+    python -m benchmarks.check_query_profiling
+"""
+import importlib.util
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+
+os.environ['QUERY_PROFILING'] = 'true'
+
+failures = []
+
+PYTEST_FILE = '''
+import pytest
+from fastapi.testclient import TestClient
+from app.models import database
+from app.utils import response_cache_util
+from app.utils.response_cache_util import MemoryBackend, ResponseCache
+
+pytest_plugins = ['app.utils.query_budget_util']
+
+database.configure_database({url!r})
+response_cache_util._response_cache = ResponseCache(MemoryBackend())
+from app.core.app_factory import create_app
+client = TestClient(create_app())
+
+
+def test_within_budget(query_budget):
+    with query_budget(5):
+        client.get('/api/v1/vod_detail', params={{'vod_id': 1}})
+
+
+@pytest.mark.query_budget(0)
+def test_over_budget():
+    client.get('/api/v1/vod_detail', params={{'vod_id': 2}})
+'''
+
+
+def check(name: str, ok: bool, detail: str = '') -> None:
+    print(f'{"ok  " if ok else "FAIL"} {name} {detail}')
+    if not ok:
+        failures.append(name)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record.getMessage())
+
+
+def add_lazy_endpoint(app, Session) -> None:
+    """逐行访问懒加载关系的接口（N+1）"""
+    from app.models.models import MovDetail
+
+    @app.get('/lazy')
+    def lazy():
+        session = Session()
+        try:
+            return [row.this_mov_type.type_name if row.this_mov_type else None
+                    for row in session.query(MovDetail).order_by(MovDetail.id).limit(10)]
+        finally:
+            session.close()
+
+
+def check_pytest_plugin(url: str):
+    if importlib.util.find_spec('pytest') is None:
+        print('skip pytest plugin (pytest not installed)')
+        return
+    path = os.path.join(tempfile.mkdtemp(), 'test_budget.py')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(PYTEST_FILE.format(url=url))
+    result = subprocess.run([sys.executable, '-m', 'pytest', '-q', '-p', 'no:cacheprovider', path],
+                            capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=os.getcwd()))
+    out = result.stdout
+    check('pytest plugin fails over-budget test', '1 failed, 1 passed' in out and 'budget is 0' in out,
+          out.strip().splitlines()[-1] if out.strip() else result.stderr[-300:])
+
+
+def main():
+    from fastapi.testclient import TestClient
+    from app.core.config import reload_settings
+    from app.models import database
+    from app.utils import response_cache_util
+    from app.utils.query_budget_util import assert_query_budget
+    from app.utils.response_cache_util import MemoryBackend, ResponseCache
+    from benchmarks.common import make_engine, seed_catalogue
+
+    url = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "profile.db")}'
+    _, Session = make_engine(url)
+    session = Session()
+    seed_catalogue(session, 20)
+    session.close()
+
+    database.configure_database(url)
+    response_cache_util._response_cache = ResponseCache(MemoryBackend())
+    from app.core.app_factory import create_app
+    app = create_app()
+    add_lazy_endpoint(app, database.SessionLocal)
+    client = TestClient(app)
+    handler = ListHandler()
+    logging.getLogger('app.utils.profiling_util').addHandler(handler)
+
+    timing = client.get('/api/v1/vod_detail', params={'vod_id': 1}).headers.get('server-timing', '')
+    check('server-timing header', 'db;dur=' in timing and 'queries' in timing, timing)
+
+    timing = client.get('/lazy').headers.get('server-timing', '')
+    check('n+1 reported in header', 'nplus1' in timing, timing)
+    check('n+1 logged', any('possible N+1 in GET /lazy' in message for message in handler.records))
+
+    os.environ['SLOW_QUERY_MS'] = '0'
+    reload_settings()
+    handler.records.clear()
+    client.get('/api/v1/vod_detail', params={'vod_id': 2})
+    slow = [message for message in handler.records if message.startswith('slow query')]
+    check('slow query logged with explain', any('SEARCH' in message or 'SCAN' in message for message in slow),
+          slow[0].splitlines()[-1] if slow else '')
+    os.environ.pop('SLOW_QUERY_MS')
+    reload_settings()
+
+    try:
+        with assert_query_budget(20, max_repeats=2):
+            client.get('/lazy')
+        failed = ''
+    except AssertionError as e:
+        failed = str(e)
+    check('budget fails on repeated shape', 'max 2' in failed, failed.splitlines()[0] if failed else '')
+    with assert_query_budget(5) as profile:
+        client.get('/api/v1/vod_detail', params={'vod_id': 3})
+    check('budget passes within limit', 0 < profile.count <= 5, f'queries={profile.count}')
+    client.close()
+
+    check_pytest_plugin(url)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
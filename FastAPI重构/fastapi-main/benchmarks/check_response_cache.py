@@ -0,0 +1,158 @@
+"""
+响应缓存检查
+
+1. 未命中后写入，再次读取命中
+2. bump_version 后旧版本的缓存失效；未命中后查询期间版本递增时，写回旧版本，不以新版本缓存旧数据
+3. 缓存键规范化: 忽略 None、去除首尾空白、参数顺序无关；/vod_list 的空字符串筛选与未传参命中同一条缓存
+4. redis 后端（安装了 fakeredis 时使用 fakeredis，否则用只实现 get/set/incr 的内存客户端）:
+   两个 ResponseCache（模拟两个 worker）共享缓存与版本号，异步 aget/aset 在线程池中执行
+5. 后端抛出异常时按未命中处理并计入 errors
+
+用法（在 fastapi-main 目录下）:
+    python -m benchmarks.check_response_cache
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+os.environ.setdefault('QUERY_PROFILING', 'false')
+
+from app.models import database
+from app.utils import response_cache_util
+from app.utils.response_cache_util import MemoryBackend, RedisBackend, ResponseCache
+from benchmarks.common import make_engine, seed_catalogue
+
+failures = []
+
+
+def check(name: str, ok: bool, detail: str = '') -> None:
+    print(f'{"ok  " if ok else "FAIL"} {name} {detail}')
+    if not ok:
+        failures.append(name)
+
+
+class DictRedis:
+    """fakeredis 不可用时的替代客户端，只实现 RedisBackend 用到的命令"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode('utf-8') if isinstance(value, str) else value
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key) or 0) + 1).encode('utf-8')
+        return int(self.data[key])
+
+
+class BrokenBackend:
+    """读写都抛出异常的后端"""
+    blocking = False
+
+    def get(self, key):
+        raise ConnectionError('backend down')
+
+    def set(self, key, value, ttl):
+        raise ConnectionError('backend down')
+
+    def get_version(self):
+        raise ConnectionError('backend down')
+
+    def bump_version(self):
+        raise ConnectionError('backend down')
+
+
+def redis_client():
+    try:
+        import fakeredis
+        return fakeredis.FakeStrictRedis(), 'fakeredis'
+    except ImportError:
+        return DictRedis(), 'dict stub'
+
+
+def check_memory_backend() -> None:
+    cache = ResponseCache(MemoryBackend())
+    key = cache.make_key('vod_detail', vod_id=1)
+    miss = cache.get(key)
+    cache.set(miss.key, {'code': 200})
+    hit = cache.get(key)
+    check('hit after miss', miss.value is None and hit.value == {'code': 200} and (cache.hits, cache.misses) == (1, 1),
+          str(cache.stats()))
+
+    cache.bump_version()
+    check('bump_version invalidates', cache.get(key).value is None)
+
+    # 未命中 -> 查询期间入库并递增版本 -> 写回读取时的版本
+    entry = cache.get(key)
+    cache.bump_version()
+    cache.set(entry.key, {'code': 200, 'data': 'stale'})
+    check('miss before bump is not cached under the new version', cache.get(key).value is None)
+
+
+def check_key_normalization() -> None:
+    make_key = ResponseCache.make_key
+    check('make_key ignores None, order and whitespace',
+          make_key('vod_list', page=1, vod_area=None, keyword=' 海贼 ') == make_key('vod_list', keyword='海贼', page=1))
+
+    url = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "response_cache.db")}'
+    _, Session = make_engine(url)
+    session = Session()
+    seed_catalogue(session, 30)
+    session.close()
+    database.configure_database(url)
+    cache = ResponseCache(MemoryBackend())
+    response_cache_util._response_cache = cache
+
+    from fastapi.testclient import TestClient
+    from app.core.app_factory import create_app
+    with TestClient(create_app()) as client:
+        first = client.get('/api/v1/vod_list', params={'movtype': 1, 'vod_area': '', 'keyword': ''}).json()
+        second = client.get('/api/v1/vod_list', params={'movtype': 1}).json()
+    check('empty filters share the omitted-filter cache entry', first == second and cache.hits == 1,
+          str(cache.stats()))
+
+
+def check_redis_backend() -> None:
+    client, name = redis_client()
+    worker_a = ResponseCache(RedisBackend(client=client), version_ttl=0)
+    worker_b = ResponseCache(RedisBackend(client=client), version_ttl=0)
+    key = worker_a.make_key('vod_detail', vod_id=2)
+
+    async def fill():
+        entry = await worker_a.aget(key)
+        await worker_a.aset(entry.key, {'code': 200, 'data': {'vod_name': '海贼'}})
+
+    asyncio.run(fill())
+    shared = worker_b.get(key).value
+    check(f'redis backend shared between workers ({name})', shared == {'code': 200, 'data': {'vod_name': '海贼'}},
+          str(shared))
+
+    worker_a.bump_version()
+    check(f'redis bump_version invalidates other workers ({name})', worker_b.get(key).value is None,
+          str(worker_b.stats()))
+
+
+def check_backend_errors() -> None:
+    cache = ResponseCache(BrokenBackend())
+    key = cache.make_key('vod_detail', vod_id=3)
+    entry = cache.get(key)
+    cache.set(entry.key, {'code': 200})
+    cache.set('v0:' + key, {'code': 200})
+    check('backend errors count as misses', entry.value is None and cache.errors == 2 and cache.misses == 1,
+          str(cache.stats()))
+
+
+def main():
+    check_memory_backend()
+    check_key_normalization()
+    check_redis_backend()
+    check_backend_errors()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
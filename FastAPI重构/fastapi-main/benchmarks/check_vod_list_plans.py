@@ -0,0 +1,119 @@
+"""
+/vod_list 查询计划回归检查
+
+在 SQLite 上执行全部 Alembic 迁移，对 /vod_list 的每种筛选组合执行 EXPLAIN QUERY PLAN。
+sakura_movdetail 必须通过 SEARCH ... USING INDEX 定位；唯一允许的 SCAN 是沿排序索引
+（SCAN ... USING INDEX）逐行过滤，且取一页实际走过的行数不超过 WALK_LIMIT，否则以非零状态码退出
+
+用法（在 fastapi-main 目录下）:
+    python -m benchmarks.check_vod_list_plans
+"""
+import datetime
+import itertools
+import os
+import sys
+import tempfile
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.orm import sessionmaker
+
+import app.search.index as search_index_module
+from app.api.v1.video import build_vod_list_query, mov_type_dict
+from app.models.models import MovDetail
+from app.search import SearchIndex
+from app.utils.pagination_util import apply_cursor, encode_cursor
+from benchmarks.common import seed_catalogue
+
+MOVTYPES = sorted(mov_type_dict)
+VOD_CLASSES = [None, '日本动漫']
+VOD_AREAS = [None, '日本', 'more']
+VOD_YEARS = [None, '2020', 'more']
+KEYWORDS = [None, '海贼']
+CURSORS = [None, encode_cursor(datetime.datetime(2023, 1, 1), 100)]
+PER_PAGE = 13
+# 沿排序索引取一页最多允许走过的行数
+WALK_LIMIT = PER_PAGE * 10
+
+
+def migrate(url: str) -> None:
+    """对目标库执行全部迁移"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config = Config(os.path.join(root, 'alembic.ini'))
+    config.set_main_option('script_location', os.path.join(root, 'migrations'))
+    config.cmd_opts = type('opts', (), {'x': [f'url={url}']})()
+    command.upgrade(config, 'head')
+
+
+def explain(session, query) -> list:
+    """返回查询计划的 detail 列"""
+    sql = str(query.statement.compile(session.bind, compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in session.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+
+
+def is_scan(detail: str) -> bool:
+    return detail.startswith('SCAN sakura_movdetail')
+
+
+def is_index_walk(detail: str) -> bool:
+    return is_scan(detail) and 'USING INDEX' in detail
+
+
+def walked_rows(session, query, cursor) -> int:
+    """沿 (vod_time, id) 倒序索引取到这一页最后一行为止走过的行数"""
+    rows = query.with_entities(MovDetail.vod_time, MovDetail.id).all()
+    walked = session.query(func.count(MovDetail.id))
+    if cursor:
+        walked = apply_cursor(walked, MovDetail.vod_time, MovDetail.id, cursor)
+    total = walked.scalar()
+    if len(rows) < PER_PAGE:
+        return total
+    after = apply_cursor(walked, MovDetail.vod_time, MovDetail.id, encode_cursor(*rows[-1]))
+    return total - after.scalar()
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'plans.db')}"
+        migrate(url)
+        engine = create_engine(url)
+        session = sessionmaker(bind=engine)()
+        docs = seed_catalogue(session, 2000)
+        session.execute(text('ANALYZE'))
+
+        index = SearchIndex()
+        index.index_documents(docs)
+        index.mark_ready()
+        search_index_module._search_index = index
+
+        failures = 0
+        combos = itertools.product(MOVTYPES, VOD_CLASSES, VOD_AREAS, VOD_YEARS, KEYWORDS, CURSORS)
+        for movtype, vod_class, vod_area, vod_year, keyword, cursor in combos:
+            query = build_vod_list_query(session, movtype, vod_area, vod_class, vod_year, keyword)
+            if cursor:
+                query = apply_cursor(query, MovDetail.vod_time, MovDetail.id, cursor)
+            query = query.order_by(MovDetail.vod_time.desc(), MovDetail.id.desc()).limit(PER_PAGE)
+            plan = explain(session, query)
+            scans = [detail for detail in plan if is_scan(detail)]
+            if not scans:
+                continue
+            walked = walked_rows(session, query, cursor) if all(map(is_index_walk, scans)) else None
+            if walked is None or walked > WALK_LIMIT:
+                failures += 1
+                reason = 'FULL SCAN' if walked is None else f'INDEX WALK {walked} rows'
+                print(f'{reason} movtype={movtype} vod_class={vod_class} vod_area={vod_area} '
+                      f'vod_year={vod_year} keyword={keyword} cursor={bool(cursor)}')
+                for detail in plan:
+                    print(f'    {detail}')
+
+        session.close()
+        engine.dispose()
+
+    total = len(MOVTYPES) * len(VOD_CLASSES) * len(VOD_AREAS) * len(VOD_YEARS) * len(KEYWORDS) * len(CURSORS)
+    print(f'{total - failures}/{total} filter combinations served by an index search or a short index walk')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""
+基准测试公共工具
+在 SQLite 上建表并生成合成视频数据，不依赖 MySQL
+"""
+import datetime
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.base import Base
+from app.models import models  # noqa: F401  注册全部模型
+from app.models.models import MovType, MovDetail, User, Comment, UserCollectionItem
+from app.utils.vod_util import normalize_mov_detail
+
+# 与 video.py 中 mov_type_dict 对应的二级类型
+TYPE_IDS = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 20,
+            21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34]
+AREAS = ["中国", "内地", "美国", "日本", "韩国", "英国", "法国", "香港", "泰国", "台湾", "印度"]
+YEARS = [str(y) for y in range(2005, 2024)]
+WORDS = ["海贼", "火影", "少年", "魔法", "战争", "恋爱", "校园", "冒险", "侦探", "机器人",
+         "星空", "王国", "骑士", "剑客", "龙珠", "樱花", "时光", "旅行", "秘密", "英雄"]
+NAMES = ["张伟", "王芳", "李娜", "刘洋", "陈静", "杨帆", "赵磊", "黄勇", "周杰", "吴敏"]
+
+
+def make_engine(url: str = 'sqlite://'):
+    """
+    创建基准测试用数据库引擎并建表
+
+    Args:
+        url: 数据库连接，默认内存 SQLite
+
+    Returns:
+        (engine, Session 工厂)
+    """
+    kwargs = {}
+    if url == 'sqlite://':
+        kwargs = {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+    elif url.startswith('sqlite'):
+        # 与 app/models/database.py 一致: FastAPI 在线程池中创建和关闭同步会话, 可能不是同一个线程
+        kwargs = {"connect_args": {"check_same_thread": False}}
+    engine = create_engine(url, **kwargs)
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def fake_mov_detail(vod_id: int, rnd: random.Random, content_words: int = 40) -> Dict:
+    """
+    生成一条与数据源格式一致的 movdetail 记录
+
+    Args:
+        vod_id: 数据源ID
+        rnd: 随机数生成器
+        content_words: 简介词数（控制记录大小）
+
+    Returns:
+        movdetail 字典
+    """
+    base_time = datetime.datetime(2023, 6, 1)
+    episodes = rnd.randint(1, 60)
+    return {
+        'vod_id': vod_id,
+        'type_id': rnd.choice(TYPE_IDS),
+        'type_name': rnd.choice(["日本动漫", "国产动漫", "欧美动漫", "动漫电影"]),
+        'vod_name': ''.join(rnd.sample(WORDS, 2)) + str(vod_id),
+        'vod_actor': ','.join(rnd.sample(NAMES, 3)),
+        'vod_director': rnd.choice(NAMES),
+        'vod_area': rnd.choice(AREAS),
+        'vod_year': rnd.choice(YEARS),
+        'vod_remarks': f'更新至{episodes}集',
+        'vod_pic': f'https://img.example.com/{vod_id}.jpg',
+        'vod_content': '<p>' + '，'.join(rnd.choice(WORDS) for _ in range(content_words)) + '</p>',
+        'vod_play_from': 'm3u8',
+        'vod_play_url': '#'.join(f'第{i:02d}集$https://v.example.com/{vod_id}/{i}/index.m3u8'
+                                 for i in range(1, episodes + 1)),
+        'vod_time': base_time - datetime.timedelta(minutes=vod_id * 7),
+    }
+
+
+def seed_catalogue(session, rows: int, seed: int = 42, batch_size: int = 2000) -> List[Dict]:
+    """
+    写入合成视频数据
+
+    Args:
+        session: 数据库会话
+        rows: 行数
+        seed: 随机种子
+        batch_size: 每批写入行数
+
+    Returns:
+        写入的 movdetail 字典列表
+    """
+    rnd = random.Random(seed)
+    if not session.query(MovType).first():
+        session.bulk_insert_mappings(MovType, [{'type_id': t, 'type_name': f'type{t}'} for t in TYPE_IDS])
+    docs = [normalize_mov_detail(fake_mov_detail(vod_id, rnd)) for vod_id in range(1, rows + 1)]
+    for start in range(0, rows, batch_size):
+        session.bulk_insert_mappings(MovDetail, docs[start:start + batch_size])
+    session.commit()
+    return docs
+
+
+def seed_users(session, count: int) -> List[int]:
+    """
+    写入用户（密码哈希使用固定占位值，避免 PBKDF2 拖慢数据准备）
+
+    Args:
+        session: 数据库会话
+        count: 用户数
+
+    Returns:
+        用户ID列表
+    """
+    start = (session.query(User.id).order_by(User.id.desc()).limit(1).scalar() or 0) + 1
+    session.bulk_insert_mappings(User, [{'id': uid, 'name': f'user{uid}', 'password_hash': 'x'}
+                                        for uid in range(start, start + count)])
+    session.commit()
+    return list(range(start, start + count))
+
+
+def seed_comment_tree(session, movdetail_id: int, user_ids: List[int], threads: int, replies: int,
+                      seed: int = 42) -> int:
+    """
+    为视频写入评论树：threads 条顶层评论，每条下挂 replies 条随机嵌套的回复
+
+    Args:
+        session: 数据库会话
+        movdetail_id: 视频ID（MovDetail.id）
+        user_ids: 评论用户ID
+        threads: 顶层评论数
+        replies: 每条顶层评论的回复数
+        seed: 随机种子
+
+    Returns:
+        写入的评论总数
+    """
+    rnd = random.Random(seed)
+    next_id = (session.query(Comment.id).order_by(Comment.id.desc()).limit(1).scalar() or 0) + 1
+    base_time = datetime.datetime(2023, 6, 1)
+    rows = []
+    for t in range(threads):
+        root_id = next_id
+        rows.append({'id': root_id, 'body': f'评论{root_id}', 'user_id': rnd.choice(user_ids),
+                     'movdetail_id': movdetail_id, 'timestamp': base_time - datetime.timedelta(minutes=t)})
+        next_id += 1
+        thread_ids = [root_id]
+        for r in range(replies):
+            rows.append({'id': next_id, 'body': f'回复{next_id}', 'user_id': rnd.choice(user_ids),
+                         'replied_id': rnd.choice(thread_ids), 'root_id': root_id,
+                         'timestamp': base_time + datetime.timedelta(minutes=r)})
+            thread_ids.append(next_id)
+            next_id += 1
+    session.bulk_insert_mappings(Comment, rows)
+    session.commit()
+    return len(rows)
+
+
+def seed_collections(session, user_ids: List[int], movdetail_ids: List[int], size: int, seed: int = 42,
+                     batch_size: int = 5000) -> int:
+    """
+    为每个用户写入 size 条随机收藏
+
+    Args:
+        session: 数据库会话
+        user_ids: 用户ID列表
+        movdetail_ids: 可收藏的视频ID（MovDetail.id）
+        size: 每个用户的收藏数
+        seed: 随机种子
+        batch_size: 每批写入行数
+
+    Returns:
+        写入的收藏总数
+    """
+    rnd = random.Random(seed)
+    base_time = datetime.datetime(2023, 6, 1)
+    rows = []
+    for user_id in user_ids:
+        for n, movdetail_id in enumerate(rnd.sample(movdetail_ids, min(size, len(movdetail_ids)))):
+            rows.append({'user_id': user_id, 'movdetail_id': movdetail_id,
+                         'created_at': base_time + datetime.timedelta(seconds=n)})
+    for start in range(0, len(rows), batch_size):
+        session.bulk_insert_mappings(UserCollectionItem, rows[start:start + batch_size])
+    session.commit()
+    return len(rows)
+
+
+@contextmanager
+def count_queries(engine):
+    """
+    统计代码块内执行的 SQL 语句数
+
+    Yields:
+        list，退出时其长度即为语句数，元素为语句文本
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def timeit(func: Callable, repeat: int = 20) -> Dict[str, float]:
+    """
+    多次执行并统计耗时（毫秒）
+
+    Args:
+        func: 无参函数
+        repeat: 执行次数
+
+    Returns:
+        包含 mean/p50/p95/max 的字典
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'mean': statistics.mean(samples),
+        'p50': samples[len(samples) // 2],
+        'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'max': samples[-1],
+    }
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """
+    分位数（最近秩）
+
+    Args:
+        samples: 样本
+        q: 0~1
+
+    Returns:
+        分位数，无样本时为 0
+    """
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def print_table(title: str, results: Dict[str, Dict[str, float]]) -> None:
+    """打印耗时对比表"""
+    print(f'\n{title}')
+    print(f'{"case":<32}{"mean":>10}{"p50":>10}{"p95":>10}{"max":>10}  (ms)')
+    for name, r in results.items():
+        print(f'{name:<32}{r["mean"]:>10.2f}{r["p50"]:>10.2f}{r["p95"]:>10.2f}{r["max"]:>10.2f}')
@@ -0,0 +1,258 @@
+"""
+本地模拟数据源
+在后台线程中启动 HTTP 服务，按 ?ac=list|detail&pg=N 回放录制的页面，用于在不访问真实数据源的情况下
+测试和压测抓取任务
+
+页面来源:
+    - FakeProvider.from_directory(path): 回放目录下录制的 {ac}_{page}.json
+    - FakeProvider.synthetic(rows, per_page, content_words): 用 benchmarks.common.fake_mov_detail 生成，
+      按 vod_time 倒序分页；content_words 控制简介长度（页面大小）
+
+延迟与错误注入:
+    - latency / jitter: 每次请求等待 latency + uniform(0, jitter) 秒
+    - error_rate: 按概率返回 error_statuses 中的 5xx（随机数由 seed 固定）
+    - fail: 按 (ac, page, attempt) 精确注入错误
+
+synthetic 数据源可用 publish(new_rows, updated_rows) 发布新视频和更新已有视频，用于测试增量抓取
+
+用法:
+    with FakeProvider.synthetic(1000) as provider:
+        SakuraData(api_url=provider.api_url).crawl_mov_detail_all()
+"""
+import datetime
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.common import fake_mov_detail
+
+API_PATH = '/api.php/provide/vod/'
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+Pages = Dict[Tuple[str, int], dict]
+
+
+class FakeProvider:
+    """
+    模拟数据源服务
+
+    Args:
+        pages: {(ac, page): 页面 JSON}
+        fail: 注入错误的函数，参数为 (ac, page, 该页第几次请求)，返回 HTTP 状态码表示本次失败，返回 None 表示正常
+        etags: 是否返回 ETag 并对 If-None-Match 返回 304
+        latency: 每次请求的基础延迟秒数
+        jitter: 在基础延迟上追加 0 ~ jitter 秒的随机延迟
+        error_rate: 随机返回 5xx 的概率
+        error_statuses: 随机错误使用的状态码
+        seed: 延迟与错误注入的随机种子
+    """
+
+    def __init__(self, pages: Pages, fail: Optional[Callable[[str, int, int], Optional[int]]] = None,
+                 etags: bool = False, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_statuses: Sequence[int] = (500, 502, 503), seed: int = 0):
+        self.pages = pages
+        self.fail = fail
+        self.etags = etags
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.status = Counter()
+        self.requests = Counter()
+        self.bytes_sent = 0
+        self.docs: Optional[List[dict]] = None  # synthetic 数据源的全部视频，按 vod_time 倒序
+        self.per_page = None
+        self.content_words = 40
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @classmethod
+    def from_directory(cls, path: str, **kwargs) -> 'FakeProvider':
+        """加载目录下录制的 {ac}_{page}.json"""
+        pages = {}
+        for name in os.listdir(path):
+            stem, ext = os.path.splitext(name)
+            if ext != '.json' or '_' not in stem:
+                continue
+            ac, page = stem.rsplit('_', 1)
+            with open(os.path.join(path, name), encoding='utf-8') as f:
+                pages[(ac, int(page))] = json.load(f)
+        return cls(pages, **kwargs)
+
+    @classmethod
+    def synthetic(cls, rows: int, per_page: int = 20, seed: int = 42, content_words: int = 40,
+                  **kwargs) -> 'FakeProvider':
+        """
+        生成 rows 条视频，按 vod_time 倒序分页（与真实数据源一致，最新的在第一页）
+
+        Args:
+            rows: 视频数
+            per_page: 每页条数
+            seed: 数据随机种子
+            content_words: 每条简介的词数，40 词时一页 20 条的 detail 页约 45KB
+            **kwargs: 传给构造函数的延迟、错误注入参数
+
+        Returns:
+            FakeProvider
+        """
+        rnd = random.Random(seed)
+        docs = [fake_mov_detail(vod_id, rnd, content_words) for vod_id in range(1, rows + 1)]
+        docs.sort(key=lambda doc: doc['vod_time'], reverse=True)
+        for doc in docs:
+            doc['vod_time'] = doc['vod_time'].strftime(TIME_FORMAT)
+        provider = cls(build_pages(docs, per_page), **kwargs)
+        provider.docs, provider.per_page, provider.content_words = docs, per_page, content_words
+        return provider
+
+    def publish(self, new_rows: int = 0, updated_rows: int = 0, seed: int = 7) -> List[int]:
+        """
+        模拟数据源上新: 追加 new_rows 条新视频，并给 updated_rows 条已有视频追加一集，
+        二者的 vod_time 都晚于当前最新视频，排在列表最前面；只支持 synthetic 数据源
+
+        Args:
+            new_rows: 新视频数
+            updated_rows: 更新的已有视频数
+            seed: 随机种子
+
+        Returns:
+            新增和更新的 vod_id
+        """
+        if self.docs is None:
+            raise ValueError('publish() requires a synthetic provider')
+        rnd = random.Random(seed)
+        latest = datetime.datetime.strptime(self.docs[0]['vod_time'], TIME_FORMAT) if self.docs else \
+            datetime.datetime(2023, 6, 1)
+        next_id = max((doc['vod_id'] for doc in self.docs), default=0) + 1
+        updated = rnd.sample(self.docs, min(updated_rows, len(self.docs)))
+        for i, doc in enumerate(updated):
+            episodes = doc['vod_play_url'].count('#') + 2
+            doc['vod_remarks'] = f'更新至{episodes}集'
+            doc['vod_play_url'] += f"#第{episodes:02d}集$https://v.example.com/{doc['vod_id']}/{episodes}/index.m3u8"
+            doc['vod_time'] = (latest + datetime.timedelta(seconds=i + 1)).strftime(TIME_FORMAT)
+        added = []
+        for i in range(new_rows):
+            doc = fake_mov_detail(next_id + i, rnd, self.content_words)
+            doc['vod_time'] = (latest + datetime.timedelta(seconds=len(updated) + i + 1)).strftime(TIME_FORMAT)
+            added.append(doc)
+        self.docs.extend(added)
+        self.docs.sort(key=lambda doc: doc['vod_time'], reverse=True)
+        self.pages = build_pages(self.docs, self.per_page)
+        return [doc['vod_id'] for doc in updated + added]
+
+    def reset_stats(self) -> None:
+        """清空请求、状态码与流量统计"""
+        with self._lock:
+            self.requests.clear()
+            self.status.clear()
+            self.bytes_sent = 0
+
+    @property
+    def api_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}{API_PATH}'
+
+    def start(self) -> 'FakeProvider':
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                ac = query.get('ac', ['list'])[0]
+                page = int(query.get('pg', ['1'])[0])
+                with provider._lock:
+                    provider.requests[(ac, page)] += 1
+                    attempt = provider.requests[(ac, page)]
+                    delay = provider.latency + (provider._rnd.uniform(0, provider.jitter) if provider.jitter else 0)
+                    injected = None
+                    if provider.error_rate and provider._rnd.random() < provider.error_rate:
+                        injected = provider._rnd.choice(provider.error_statuses)
+                if delay:
+                    time.sleep(delay)
+                status = provider.fail(ac, page, attempt) if provider.fail else None
+                status = status or injected
+                payload = provider.pages.get((ac, page))
+                if status is None and (url.path != API_PATH or payload is None):
+                    status = 404
+                body = json.dumps(payload if status is None else {'msg': 'error'}, ensure_ascii=False).encode()
+                etag = None
+                if status is None and provider.etags:
+                    etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                    if self.headers.get('If-None-Match') == etag:
+                        status, body = 304, b''
+                with provider._lock:
+                    provider.status[status or 200] += 1
+                    provider.bytes_sent += len(body)
+                try:
+                    self.send_response(status or 200)
+                    self.send_header('Content-Type', 'application/json; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    if etag:
+                        self.send_header('ETag', etag)
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # 客户端已超时断开
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'FakeProvider':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def build_pages(docs, per_page: int = 20) -> Pages:
+    """
+    将 movdetail 列表分页为数据源格式的 list/detail 页面
+
+    Args:
+        docs: movdetail 字典列表（vod_time 为字符串）
+        per_page: 每页条数
+
+    Returns:
+        {(ac, page): 页面 JSON}
+    """
+    total = len(docs)
+    page_count = max(1, (total + per_page - 1) // per_page)
+    classes = [{'type_id': t, 'type_pid': 0, 'type_name': f'type{t}'}
+               for t in sorted({doc['type_id'] for doc in docs})]
+    pages = {}
+    for page in range(1, page_count + 1):
+        chunk = docs[(page - 1) * per_page:page * per_page]
+        meta = {'code': 1, 'msg': '数据列表', 'page': page, 'pagecount': page_count,
+                'limit': str(per_page), 'total': total}
+        pages[('detail', page)] = dict(meta, list=chunk)
+        pages[('list', page)] = dict(meta, list=[
+            {'vod_id': doc['vod_id'], 'vod_name': doc['vod_name'], 'vod_en': f"vod{doc['vod_id']}",
+             'type_id': doc['type_id'], 'type_name': doc['type_name'], 'vod_time': doc['vod_time'], 'vod_remarks': doc['vod_remarks'],
+             'vod_play_from': doc['vod_play_from']}
+            for doc in chunk
+        ], **{'class': classes})
+    return pages
@@ -0,0 +1,60 @@
+"""
+Alembic 迁移环境
+数据库连接默认取自 app/config/config.yaml，可通过 alembic -x url=... 覆盖（如对 SQLite 测试库执行迁移）
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app.core.config import get_database_url
+from app.models.base import Base
+from app.models import models  # noqa: F401  注册全部模型
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def get_url() -> str:
+    return context.get_x_argument(as_dictionary=True).get('url') or get_database_url()
+
+
+def run_migrations_offline() -> None:
+    """离线模式：只输出 SQL 不连接数据库"""
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """在线模式：连接数据库执行迁移"""
+    section = config.get_section(config.config_ini_section, {})
+    section['sqlalchemy.url'] = get_url()
+    connectable = engine_from_config(section, prefix="sqlalchemy.", poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=True,  # SQLite 不支持 ALTER COLUMN，需要批量模式重建表
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,178 @@
+"""baseline: 与 app/config/config/create_table.sql 一致的初始表结构
+
+已按 create_table.sql 建好的库无需执行本迁移, 先标记版本再升级:
+    alembic stamp 0000
+    alembic upgrade head
+
+Revision ID: 0000
+Revises:
+Create Date: 2026-10-18 20:29:49.041504
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '0000'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _catalogue_pk() -> sa.PrimaryKeyConstraint:
+    """视频表在 MySQL 上为 (id, vod_id) 联合主键; SQLite 不支持联合主键自增, 只以 id 为主键"""
+    if op.get_bind().dialect.name == 'sqlite':
+        return sa.PrimaryKeyConstraint('id')
+    return sa.PrimaryKeyConstraint('id', 'vod_id')
+
+
+def upgrade() -> None:
+    op.create_table('sakura_movtype',
+    sa.Column('type_id', sa.Integer(), nullable=False),
+    sa.Column('type_name', sa.String(length=20), nullable=False),
+    sa.PrimaryKeyConstraint('type_id')
+    )
+    op.create_table('sakura_user',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=30), nullable=True),
+    sa.Column('password_hash', sa.String(length=128), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('sakura_movdetail',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=True),
+    sa.Column('type_id', sa.Integer(), nullable=True),
+    sa.Column('type_id_1', sa.Integer(), nullable=True),
+    sa.Column('type_name', sa.String(length=20), nullable=True),
+    sa.Column('vod_actor', sa.Text(), nullable=True),
+    sa.Column('vod_area', sa.Text(), nullable=True),
+    sa.Column('vod_author', sa.Text(), nullable=True),
+    sa.Column('vod_behind', sa.Text(), nullable=True),
+    sa.Column('vod_blurb', sa.Text(), nullable=True),
+    sa.Column('vod_class', sa.Text(), nullable=True),
+    sa.Column('vod_color', sa.Text(), nullable=True),
+    sa.Column('vod_content', sa.Text(), nullable=True),
+    sa.Column('vod_copyright', sa.Integer(), nullable=True),
+    sa.Column('vod_director', sa.Text(), nullable=True),
+    sa.Column('vod_douban_id', sa.Integer(), nullable=True),
+    sa.Column('vod_douban_score', sa.String(length=20), nullable=True),
+    sa.Column('vod_down', sa.Integer(), nullable=True),
+    sa.Column('vod_down_from', sa.Text(), nullable=True),
+    sa.Column('vod_down_note', sa.Text(), nullable=True),
+    sa.Column('vod_down_server', sa.Text(), nullable=True),
+    sa.Column('vod_down_url', sa.Text(), nullable=True),
+    sa.Column('vod_duration', sa.Text(), nullable=True),
+    sa.Column('vod_en', sa.Text(), nullable=True),
+    sa.Column('vod_hits', sa.Integer(), nullable=True),
+    sa.Column('vod_hits_day', sa.Integer(), nullable=True),
+    sa.Column('vod_hits_month', sa.Integer(), nullable=True),
+    sa.Column('vod_hits_week', sa.Integer(), nullable=True),
+    sa.Column('vod_id', sa.Integer(), nullable=False),
+    sa.Column('vod_isend', sa.Integer(), nullable=True),
+    sa.Column('vod_jumpurl', sa.Text(), nullable=True),
+    sa.Column('vod_lang', sa.Text(), nullable=True),
+    sa.Column('vod_letter', sa.Text(), nullable=True),
+    sa.Column('vod_level', sa.Integer(), nullable=True),
+    sa.Column('vod_lock', sa.Integer(), nullable=True),
+    sa.Column('vod_name', sa.Text(), nullable=True),
+    sa.Column('vod_pic', sa.Text(), nullable=True),
+    sa.Column('vod_pic_screenshot', sa.Text(), nullable=True),
+    sa.Column('vod_pic_slide', sa.Text(), nullable=True),
+    sa.Column('vod_pic_thumb', sa.Text(), nullable=True),
+    sa.Column('vod_play_from', sa.Text(), nullable=True),
+    sa.Column('vod_play_note', sa.Text(), nullable=True),
+    sa.Column('vod_play_server', sa.Text(), nullable=True),
+    sa.Column('vod_play_url', sa.Text().with_variant(mysql.LONGTEXT(), 'mysql'), nullable=True),
+    sa.Column('vod_plot', sa.Integer(), nullable=True),
+    sa.Column('vod_plot_detail', sa.Text(), nullable=True),
+    sa.Column('vod_plot_name', sa.Text(), nullable=True),
+    sa.Column('vod_points', sa.Integer(), nullable=True),
+    sa.Column('vod_points_down', sa.Integer(), nullable=True),
+    sa.Column('vod_points_play', sa.Integer(), nullable=True),
+    sa.Column('vod_pubdate', sa.Text(), nullable=True),
+    sa.Column('vod_pwd', sa.Text(), nullable=True),
+    sa.Column('vod_pwd_down', sa.Text(), nullable=True),
+    sa.Column('vod_pwd_down_url', sa.Text(), nullable=True),
+    sa.Column('vod_pwd_play', sa.Text(), nullable=True),
+    sa.Column('vod_pwd_play_url', sa.Text(), nullable=True),
+    sa.Column('vod_pwd_url', sa.Text(), nullable=True),
+    sa.Column('vod_rel_art', sa.Text(), nullable=True),
+    sa.Column('vod_rel_vod', sa.Text(), nullable=True),
+    sa.Column('vod_remarks', sa.Text(), nullable=True),
+    sa.Column('vod_reurl', sa.Text(), nullable=True),
+    sa.Column('vod_score', sa.Text(), nullable=True),
+    sa.Column('vod_score_all', sa.Integer(), nullable=True),
+    sa.Column('vod_score_num', sa.Integer(), nullable=True),
+    sa.Column('vod_serial', sa.Text(), nullable=True),
+    sa.Column('vod_state', sa.Text(), nullable=True),
+    sa.Column('vod_status', sa.Integer(), nullable=True),
+    sa.Column('vod_sub', sa.Text(), nullable=True),
+    sa.Column('vod_tag', sa.Text(), nullable=True),
+    sa.Column('vod_time', sa.DateTime(), nullable=True),
+    sa.Column('vod_time_add', sa.Integer(), nullable=True),
+    sa.Column('vod_time_hits', sa.Integer(), nullable=True),
+    sa.Column('vod_time_make', sa.Integer(), nullable=True),
+    sa.Column('vod_total', sa.Integer(), nullable=True),
+    sa.Column('vod_tpl', sa.Text(), nullable=True),
+    sa.Column('vod_tpl_down', sa.Text(), nullable=True),
+    sa.Column('vod_tpl_play', sa.Text(), nullable=True),
+    sa.Column('vod_trysee', sa.Integer(), nullable=True),
+    sa.Column('vod_tv', sa.Text(), nullable=True),
+    sa.Column('vod_up', sa.Integer(), nullable=True),
+    sa.Column('vod_version', sa.Text(), nullable=True),
+    sa.Column('vod_weekday', sa.Text(), nullable=True),
+    sa.Column('vod_writer', sa.Text(), nullable=True),
+    sa.Column('vod_year', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['type_id'], ['sakura_movtype.type_id'], ),
+    _catalogue_pk()
+    )
+    op.create_table('sakura_movinfo',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('type_id', sa.Integer(), nullable=True),
+    sa.Column('type_name', sa.String(length=20), nullable=False),
+    sa.Column('vod_en', sa.Text(), nullable=False),
+    sa.Column('vod_id', sa.Integer(), nullable=False),
+    sa.Column('vod_name', sa.Text(), nullable=False),
+    sa.Column('vod_play_from', sa.Text(), nullable=True),
+    sa.Column('vod_remarks', sa.Text(), nullable=True),
+    sa.Column('vod_time', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['type_id'], ['sakura_movtype.type_id'], ),
+    _catalogue_pk()
+    )
+    op.create_table('sakura_user_collection',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('movdetail_id_list', sa.Text().with_variant(mysql.LONGTEXT(), 'mysql'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['sakura_user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('sakura_comment',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=True),
+    sa.Column('reviewed', sa.Boolean(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('replied_id', sa.Integer(), nullable=True),
+    sa.Column('movdetail_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['movdetail_id'], ['sakura_movdetail.id'], ),
+    sa.ForeignKeyConstraint(['replied_id'], ['sakura_comment.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['sakura_user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('sakura_comment', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_sakura_comment_timestamp'), ['timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('sakura_comment', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_sakura_comment_timestamp'))
+
+    op.drop_table('sakura_comment')
+    op.drop_table('sakura_user_collection')
+    op.drop_table('sakura_movinfo')
+    op.drop_table('sakura_movdetail')
+    op.drop_table('sakura_user')
+    op.drop_table('sakura_movtype')
@@ -0,0 +1,62 @@
+"""vod_list 筛选列改为定长 VARCHAR 并添加组合索引
+
+/vod_list 按 type_id IN (...) / type_name / vod_area / vod_year 筛选并按 vod_time 倒序排序,
+vod_area、vod_year 原为 TEXT 无法建立普通索引
+
+Revision ID: 0001
+Revises: 0000
+Create Date: 2026-10-18 20:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = '0000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 列名 -> 新长度
+BOUNDED_COLUMNS = {
+    'vod_area': 32,
+    'vod_year': 16,
+}
+
+INDEXES = {
+    'ix_sakura_movdetail_type_id_vod_time': ['type_id', 'vod_time'],
+    'ix_sakura_movdetail_type_name_vod_time': ['type_name', 'vod_time'],
+    'ix_sakura_movdetail_vod_area_vod_year_vod_time': ['vod_area', 'vod_year', 'vod_time'],
+    'ix_sakura_movdetail_vod_year_vod_time': ['vod_year', 'vod_time'],
+    'ix_sakura_movdetail_vod_time': ['vod_time'],
+    'ix_sakura_movdetail_vod_id': ['vod_id'],
+}
+
+
+def upgrade() -> None:
+    # 先截断超长的历史数据, 避免 MySQL 严格模式下修改列类型失败
+    # MySQL 的 LENGTH 按字节计数, 中文会被误判超长, 需用 CHAR_LENGTH; SQLite 没有 CHAR_LENGTH, 其 LENGTH 按字符计数
+    char_length = 'CHAR_LENGTH' if op.get_bind().dialect.name == 'mysql' else 'LENGTH'
+    for column, length in BOUNDED_COLUMNS.items():
+        op.execute(
+            f"UPDATE sakura_movdetail SET {column} = SUBSTR({column}, 1, {length}) "
+            f"WHERE {char_length}({column}) > {length}"
+        )
+
+    with op.batch_alter_table('sakura_movdetail', schema=None) as batch_op:
+        for column, length in BOUNDED_COLUMNS.items():
+            batch_op.alter_column(column, existing_type=sa.Text(), type_=sa.String(length=length),
+                                  existing_nullable=True)
+        for name, columns in INDEXES.items():
+            batch_op.create_index(name, columns, unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('sakura_movdetail', schema=None) as batch_op:
+        for name in INDEXES:
+            batch_op.drop_index(name)
+        for column, length in BOUNDED_COLUMNS.items():
+            batch_op.alter_column(column, existing_type=sa.String(length=length), type_=sa.Text(),
+                                  existing_nullable=True)
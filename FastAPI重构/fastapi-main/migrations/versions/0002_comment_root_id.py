@@ -0,0 +1,53 @@
+"""评论表添加 root_id 并回填
+
+回复只记录 replied_id, 取整棵回复树需要逐层递归查询; root_id 记录所属顶层评论,
+一个视频的全部评论和回复可以一次查出
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 21:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('sakura_comment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('root_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_sakura_comment_root_id'), ['root_id'], unique=False)
+
+    # 沿 replied_id 向上找到顶层评论, 回填所有回复的 root_id
+    bind = op.get_bind()
+    comment = sa.table('sakura_comment', sa.column('id', sa.Integer), sa.column('replied_id', sa.Integer),
+                       sa.column('root_id', sa.Integer))
+    parents = dict(bind.execute(sa.select(comment.c.id, comment.c.replied_id)).fetchall())
+
+    def find_root(comment_id):
+        seen = set()
+        while parents.get(comment_id) is not None and comment_id not in seen:
+            seen.add(comment_id)
+            comment_id = parents[comment_id]
+        return comment_id
+
+    updates = [{'b_id': cid, 'b_root_id': find_root(cid)} for cid, replied_id in parents.items()
+               if replied_id is not None]
+    if updates:
+        bind.execute(
+            comment.update().where(comment.c.id == sa.bindparam('b_id')).values(root_id=sa.bindparam('b_root_id')),
+            updates
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('sakura_comment', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_sakura_comment_root_id'))
+        batch_op.drop_column('root_id')
@@ -0,0 +1,81 @@
+"""收藏改为 (user_id, movdetail_id) 规范化存储并从旧的拼接字符串回填
+
+sakura_user_collection.movdetail_id_list 以 "12;34;56;" 形式保存收藏, 增删需要整体改写,
+判断是否收藏的子串匹配还会把 "2;" 误判为 "12;" 的一部分
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 21:40:00.000000
+
+"""
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+legacy = sa.table('sakura_user_collection', sa.column('id', sa.Integer), sa.column('user_id', sa.Integer),
+                  sa.column('movdetail_id_list', sa.Text().with_variant(mysql.LONGTEXT(), 'mysql')))
+
+
+def upgrade() -> None:
+    item = op.create_table('sakura_user_collection_item',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('movdetail_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['movdetail_id'], ['sakura_movdetail.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['sakura_user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'movdetail_id', name='uq_sakura_user_collection_item_user_id_movdetail_id')
+    )
+
+    # 回填: 同一用户可能有多行旧记录, 按 (user_id, movdetail_id) 去重; 只保留仍存在的视频
+    bind = op.get_bind()
+    existing_ids = {row[0] for row in bind.execute(sa.text('SELECT id FROM sakura_movdetail'))}
+    now = datetime.datetime.utcnow()
+    seen = set()
+    rows = []
+    for user_id, id_list in bind.execute(sa.select(legacy.c.user_id, legacy.c.movdetail_id_list)):
+        if user_id is None or not id_list:
+            continue
+        for value in id_list.split(';'):
+            value = value.strip()
+            if not value.isdigit():
+                continue
+            key = (user_id, int(value))
+            if key in seen or key[1] not in existing_ids:
+                continue
+            seen.add(key)
+            rows.append({'user_id': key[0], 'movdetail_id': key[1], 'created_at': now})
+            if len(rows) >= BATCH_SIZE:
+                op.bulk_insert(item, rows)
+                rows = []
+    if rows:
+        op.bulk_insert(item, rows)
+
+
+def downgrade() -> None:
+    # 将规范化数据写回旧的拼接字符串, 每个用户一行
+    bind = op.get_bind()
+    item = sa.table('sakura_user_collection_item', sa.column('id', sa.Integer), sa.column('user_id', sa.Integer),
+                    sa.column('movdetail_id', sa.Integer))
+    id_lists = {}
+    for user_id, movdetail_id in bind.execute(
+            sa.select(item.c.user_id, item.c.movdetail_id).order_by(item.c.user_id, item.c.id)):
+        id_lists[user_id] = id_lists.get(user_id, '') + f'{movdetail_id};'
+    bind.execute(legacy.delete())
+    if id_lists:
+        op.bulk_insert(legacy, [{'user_id': user_id, 'movdetail_id_list': id_list}
+                                for user_id, id_list in id_lists.items()])
+
+    op.drop_table('sakura_user_collection_item')
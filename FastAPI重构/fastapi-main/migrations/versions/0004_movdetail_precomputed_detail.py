@@ -0,0 +1,95 @@
+"""视频表添加入库时预处理的简介与播放列表并回填
+
+详情接口每次请求都要去除 vod_content 的 HTML 标签并拆分 vod_play_url, 改为入库时计算一次,
+写入 vod_content_clean、vod_play_list
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 22:20:00.000000
+
+"""
+import json
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+# 以下为本迁移编写时 app.utils.vod_util 的清理与解析逻辑的副本, 迁移不随应用代码变化
+CONTENT_TAG_RE = re.compile(r'</?(?:p|span)(?:\s[^>]*)?>', re.IGNORECASE)
+
+
+def clean_vod_content(content):
+    """去除简介中的 <p>、<span> 标签"""
+    if not content:
+        return content
+    return CONTENT_TAG_RE.sub('', content)
+
+
+def parse_play_url(play_url, play_from):
+    """按 $$$ 拆分播放来源, 按 # 拆分剧集, 按 $ 拆分剧集名与地址"""
+    if not play_url:
+        return []
+    froms = play_from.split('$$$') if play_from else []
+    play_list = []
+    for index, source in enumerate(play_url.split('$$$')):
+        episodes = []
+        for episode in source.split('#'):
+            name, sep, url = episode.partition('$')
+            if not sep:
+                continue
+            episodes.append({"name": name, "url": url})
+        if episodes:
+            play_list.append({"from": froms[index] if index < len(froms) else '', "episodes": episodes})
+    return play_list
+
+
+movdetail = sa.table('sakura_movdetail', sa.column('id', sa.Integer), sa.column('vod_content', sa.Text),
+                     sa.column('vod_content_clean', sa.Text), sa.column('vod_play_from', sa.Text),
+                     sa.column('vod_play_url', sa.Text), sa.column('vod_play_list', sa.Text))
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('sakura_movdetail', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('vod_content_clean', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('vod_play_list', sa.Text().with_variant(mysql.LONGTEXT(), 'mysql'),
+                                      nullable=True))
+
+    # 按 id 分批回填, 避免一次读入全部 vod_play_url
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(movdetail.c.id, movdetail.c.vod_content, movdetail.c.vod_play_from, movdetail.c.vod_play_url)
+            .where(movdetail.c.id > last_id)
+            .order_by(movdetail.c.id)
+            .limit(BATCH_SIZE)
+        ).mappings().fetchall()
+        if not rows:
+            break
+        bind.execute(
+            movdetail.update()
+            .where(movdetail.c.id == sa.bindparam('b_id'))
+            .values(vod_content_clean=sa.bindparam('b_content_clean'), vod_play_list=sa.bindparam('b_play_list')),
+            [{'b_id': row['id'],
+              'b_content_clean': clean_vod_content(row['vod_content']),
+              'b_play_list': json.dumps(parse_play_url(row['vod_play_url'], row['vod_play_from']),
+                                        ensure_ascii=False, separators=(',', ':'))}
+             for row in rows]
+        )
+        last_id = rows[-1]['id']
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('sakura_movdetail', schema=None) as batch_op:
+        batch_op.drop_column('vod_play_list')
+        batch_op.drop_column('vod_content_clean')
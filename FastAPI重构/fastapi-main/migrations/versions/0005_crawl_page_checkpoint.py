@@ -0,0 +1,39 @@
+"""添加全量抓取分页检查点表
+
+全量抓取中断或个别页面失败后, 根据检查点只抓取未完成和失败的页面; 重新抓取时跳过内容未变化的页面
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 23:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sakura_crawl_page',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('crawl', sa.String(length=32), nullable=False),
+    sa.Column('page', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=True),
+    sa.Column('etag', sa.String(length=255), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('crawl', 'page', name='uq_sakura_crawl_page_crawl_page')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sakura_crawl_page')
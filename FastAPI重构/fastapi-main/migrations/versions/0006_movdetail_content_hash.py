@@ -0,0 +1,30 @@
+"""视频表添加内容摘要列
+
+入库时比较数据源记录与已入库记录的摘要, 内容未变化的记录不再写入, 变化的记录只更新变化的列.
+不回填: 摘要为空的旧记录在下一次入库时按列比较一次并写入摘要
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('sakura_movdetail', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('sakura_movdetail', schema=None) as batch_op:
+        batch_op.drop_column('content_hash')
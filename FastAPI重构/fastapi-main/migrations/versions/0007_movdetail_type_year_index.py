@@ -0,0 +1,28 @@
+"""视频表添加 (type_id, vod_year, vod_time) 组合索引
+
+一级类型 + 年份"更多"筛选时, 已有索引都只能沿 vod_time 逐行过滤, 命中率低时要走过大量行;
+有了这个索引可以按类型与年份直接定位
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_sakura_movdetail_type_id_vod_year_vod_time', 'sakura_movdetail',
+                    ['type_id', 'vod_year', 'vod_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sakura_movdetail_type_id_vod_year_vod_time', table_name='sakura_movdetail')